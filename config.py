@@ -3,10 +3,17 @@ Configuration loader for Voice Agent.
 """
 
 import os
+import re
+import json
+import time
+import atexit
+import shutil
+import tempfile
 import yaml
 from pathlib import Path
-from dataclasses import dataclass, field
-from typing import Optional
+from dataclasses import dataclass, field, fields
+from threading import Thread, Event, Condition, Lock
+from typing import Any, Callable, Optional
 
 # Base directory
 BASE_DIR = Path(__file__).parent
@@ -17,6 +24,120 @@ class AudioConfig:
     sample_rate: int = 16000
     channels: int = 1
     device_id: Optional[int] = None
+    blocksize: int = 1024
+    latency: str = "low"
+
+
+@dataclass
+class AudioProcessingConfig:
+    enabled: bool = False
+    highpass_hz: float = 80.0
+    noise_reduction: bool = True
+    reduction_db: float = 12.0
+    normalize: bool = True
+    target_db: float = -20.0
+    max_gain_db: float = 15.0
+
+
+@dataclass
+class StreamingConfig:
+    enabled: bool = False
+    segment_seconds: float = 4.0
+    adaptive: bool = True
+    min_segment_seconds: float = 2.0
+    max_segment_seconds: float = 10.0
+    max_concurrency: int = 3
+
+
+@dataclass
+class PreflightConfig:
+    enabled: bool = True
+    min_duration: float = 0.5
+    speech_db: float = -45.0
+    min_speech_ratio: float = 0.05
+
+
+@dataclass
+class DedupConfig:
+    enabled: bool = False
+    max_age_seconds: float = 10.0
+    threshold: float = 0.85
+    output_duplicates: bool = False
+
+
+@dataclass
+class HistoryConfig:
+    enabled: bool = True
+    path: str = "history.db"
+
+
+@dataclass
+class TranscriptionConfig:
+    mode: str = "single"
+    local_model: str = "base"
+
+
+@dataclass
+class PromptConfig:
+    rolling_context: bool = True
+    history_size: int = 5
+    max_age_seconds: float = 600.0
+    max_tokens: int = 224
+
+
+@dataclass
+class OutputConfig:
+    sink: str = "paste"
+    restore_clipboard: bool = False
+    chunk_size: int = 64
+    path: str = "transcriptions.txt"
+    host: str = "127.0.0.1"
+    port: int = 0
+
+
+@dataclass
+class ServerConfig:
+    enabled: bool = False
+    host: str = "127.0.0.1"
+    port: int = 8765
+    token: str = ""
+
+
+@dataclass
+class MeetingConfig:
+    enabled: bool = False
+    hotkey: str = "ctrl+shift+m"
+    devices: list = field(default_factory=list)
+    max_concurrency: int = 4
+
+
+@dataclass
+class LanguageDetectionConfig:
+    candidates: list = field(default_factory=list)
+    probe_seconds: float = 4.0
+    min_confidence: float = 0.5
+    cache_seconds: float = 1800.0
+
+
+@dataclass
+class RateLimitConfig:
+    enabled: bool = True
+    requests_per_minute: float = 20
+    requests_per_day: float = 2000
+    audio_seconds_per_hour: float = 7200
+    audio_seconds_per_day: float = 28800
+    min_billed_seconds: float = 10.0
+    usage_path: str = "usage.json"
+
+
+@dataclass
+class ProfilingConfig:
+    enabled: bool = False
+    mode: str = "sampling"  # "sampling" (folded stacks) or "cprofile"
+    interval_ms: float = 5.0
+    trace_memory: bool = True
+    output_dir: str = "profiles"
+    keep_jobs: int = 50
 
 
 @dataclass
@@ -27,35 +148,35 @@ class Config:
     hotkey: str = "ctrl+m"
     language: str = "en"
     audio: AudioConfig = field(default_factory=AudioConfig)
+    audio_processing: AudioProcessingConfig = field(default_factory=AudioProcessingConfig)
+    streaming: StreamingConfig = field(default_factory=StreamingConfig)
+    preflight: PreflightConfig = field(default_factory=PreflightConfig)
+    dedup: DedupConfig = field(default_factory=DedupConfig)
+    history: HistoryConfig = field(default_factory=HistoryConfig)
+    transcription: TranscriptionConfig = field(default_factory=TranscriptionConfig)
+    prompt: PromptConfig = field(default_factory=PromptConfig)
+    output: OutputConfig = field(default_factory=OutputConfig)
+    server: ServerConfig = field(default_factory=ServerConfig)
+    meeting: MeetingConfig = field(default_factory=MeetingConfig)
+    language_detection: LanguageDetectionConfig = field(default_factory=LanguageDetectionConfig)
+    rate_limit: RateLimitConfig = field(default_factory=RateLimitConfig)
+    profiling: ProfilingConfig = field(default_factory=ProfilingConfig)
     text_corrections: list = field(default_factory=list)
+    vocabulary: list = field(default_factory=list)
 
     def set_language(self, lang: str) -> None:
         """Set and save language preference."""
         self.language = lang
-        self._save_setting("language", f'"{lang}"')
+        self._save_setting("language", lang)
 
     def set_hotkey(self, hotkey: str) -> None:
         """Set and save hotkey preference."""
         self.hotkey = hotkey
-        self._save_setting("hotkey", f'"{hotkey}"')
+        self._save_setting("hotkey", hotkey)
 
-    def _save_setting(self, key: str, value: str) -> None:
-        """Save a setting to config file."""
-        import re
-        config_path = BASE_DIR / "config.yaml"
-        if config_path.exists():
-            with open(config_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            # Replace the setting line
-            content = re.sub(
-                rf'{key}:\s*"?[^"\n]+"?',
-                f'{key}: {value}',
-                content
-            )
-
-            with open(config_path, "w", encoding="utf-8") as f:
-                f.write(content)
+    def _save_setting(self, key: str, value: Any) -> None:
+        """Queue a setting to be saved to the config file in the background."""
+        get_settings_writer().set(key, value)
 
 
 def load_config(config_path: Optional[Path] = None) -> Config:
@@ -74,14 +195,133 @@ def load_config(config_path: Optional[Path] = None) -> Config:
         config.hotkey = yaml_config.get("hotkey", config.hotkey)
         config.language = yaml_config.get("language", config.language)
         config.text_corrections = yaml_config.get("text_corrections", [])
+        config.vocabulary = yaml_config.get("vocabulary") or []
 
         audio_cfg = yaml_config.get("audio", {})
         config.audio = AudioConfig(
             sample_rate=audio_cfg.get("sample_rate", 16000),
             channels=audio_cfg.get("channels", 1),
             device_id=audio_cfg.get("device_id"),
+            blocksize=audio_cfg.get("blocksize", 1024),
+            latency=audio_cfg.get("latency", "low"),
+        )
+
+        processing_cfg = yaml_config.get("audio_processing", {})
+        config.audio_processing = AudioProcessingConfig(
+            enabled=processing_cfg.get("enabled", False),
+            highpass_hz=processing_cfg.get("highpass_hz", 80.0),
+            noise_reduction=processing_cfg.get("noise_reduction", True),
+            reduction_db=processing_cfg.get("reduction_db", 12.0),
+            normalize=processing_cfg.get("normalize", True),
+            target_db=processing_cfg.get("target_db", -20.0),
+            max_gain_db=processing_cfg.get("max_gain_db", 15.0),
+        )
+
+        streaming_cfg = yaml_config.get("streaming", {})
+        config.streaming = StreamingConfig(
+            enabled=streaming_cfg.get("enabled", False),
+            segment_seconds=streaming_cfg.get("segment_seconds", 4.0),
+            adaptive=streaming_cfg.get("adaptive", True),
+            min_segment_seconds=streaming_cfg.get("min_segment_seconds", 2.0),
+            max_segment_seconds=streaming_cfg.get("max_segment_seconds", 10.0),
+            max_concurrency=streaming_cfg.get("max_concurrency", 3),
+        )
+
+        preflight_cfg = yaml_config.get("preflight", {})
+        config.preflight = PreflightConfig(
+            enabled=preflight_cfg.get("enabled", True),
+            min_duration=preflight_cfg.get("min_duration", 0.5),
+            speech_db=preflight_cfg.get("speech_db", -45.0),
+            min_speech_ratio=preflight_cfg.get("min_speech_ratio", 0.05),
+        )
+
+        dedup_cfg = yaml_config.get("dedup", {})
+        config.dedup = DedupConfig(
+            enabled=dedup_cfg.get("enabled", False),
+            max_age_seconds=dedup_cfg.get("max_age_seconds", 10.0),
+            threshold=dedup_cfg.get("threshold", 0.85),
+            output_duplicates=dedup_cfg.get("output_duplicates", False),
+        )
+
+        history_cfg = yaml_config.get("history", {})
+        config.history = HistoryConfig(
+            enabled=history_cfg.get("enabled", True),
+            path=history_cfg.get("path", "history.db"),
+        )
+
+        transcription_cfg = yaml_config.get("transcription", {})
+        config.transcription = TranscriptionConfig(
+            mode=transcription_cfg.get("mode", "single"),
+            local_model=transcription_cfg.get("local_model", "base"),
+        )
+
+        prompt_cfg = yaml_config.get("prompt", {})
+        config.prompt = PromptConfig(
+            rolling_context=prompt_cfg.get("rolling_context", True),
+            history_size=prompt_cfg.get("history_size", 5),
+            max_age_seconds=prompt_cfg.get("max_age_seconds", 600.0),
+            max_tokens=prompt_cfg.get("max_tokens", 224),
         )
 
+        output_cfg = yaml_config.get("output", {})
+        config.output = OutputConfig(
+            sink=output_cfg.get("sink", "paste"),
+            restore_clipboard=output_cfg.get("restore_clipboard", False),
+            chunk_size=output_cfg.get("chunk_size", 64),
+            path=output_cfg.get("path") or "transcriptions.txt",
+            host=output_cfg.get("host", "127.0.0.1"),
+            port=output_cfg.get("port", 0),
+        )
+
+        server_cfg = yaml_config.get("server", {})
+        config.server = ServerConfig(
+            enabled=server_cfg.get("enabled", False),
+            host=server_cfg.get("host", "127.0.0.1"),
+            port=server_cfg.get("port", 8765),
+            token=server_cfg.get("token", ""),
+        )
+
+        meeting_cfg = yaml_config.get("meeting", {})
+        config.meeting = MeetingConfig(
+            enabled=meeting_cfg.get("enabled", False),
+            hotkey=meeting_cfg.get("hotkey", "ctrl+shift+m"),
+            devices=meeting_cfg.get("devices") or [],
+            max_concurrency=meeting_cfg.get("max_concurrency", 4),
+        )
+
+        detection_cfg = yaml_config.get("language_detection", {})
+        config.language_detection = LanguageDetectionConfig(
+            candidates=detection_cfg.get("candidates") or [],
+            probe_seconds=detection_cfg.get("probe_seconds", 4.0),
+            min_confidence=detection_cfg.get("min_confidence", 0.5),
+            cache_seconds=detection_cfg.get("cache_seconds", 1800.0),
+        )
+
+        rate_cfg = yaml_config.get("rate_limit", {})
+        config.rate_limit = RateLimitConfig(
+            enabled=rate_cfg.get("enabled", True),
+            requests_per_minute=rate_cfg.get("requests_per_minute", 20),
+            requests_per_day=rate_cfg.get("requests_per_day", 2000),
+            audio_seconds_per_hour=rate_cfg.get("audio_seconds_per_hour", 7200),
+            audio_seconds_per_day=rate_cfg.get("audio_seconds_per_day", 28800),
+            min_billed_seconds=rate_cfg.get("min_billed_seconds", 10.0),
+            usage_path=rate_cfg.get("usage_path", "usage.json"),
+        )
+
+        profiling_cfg = yaml_config.get("profiling", {})
+        config.profiling = ProfilingConfig(
+            enabled=profiling_cfg.get("enabled", False),
+            mode=profiling_cfg.get("mode", "sampling"),
+            interval_ms=profiling_cfg.get("interval_ms", 5.0),
+            trace_memory=profiling_cfg.get("trace_memory", True),
+            output_dir=profiling_cfg.get("output_dir", "profiles"),
+            keep_jobs=profiling_cfg.get("keep_jobs", 50),
+        )
+
+    # Set by the --profile flag (overrides config.yaml)
+    if os.getenv("VOICE_AGENT_PROFILE"):
+        config.profiling.enabled = True
+
     # Load API key from environment (overrides everything)
     config.groq_api_key = os.getenv("GROQ_API_KEY", "")
 
@@ -111,3 +351,244 @@ def get_config() -> Config:
     return _config
 
 
+class SettingsWriter:
+    """
+    Write-behind saver for top-level settings in config.yaml.
+
+    set() only records the value, so callers never wait on disk I/O. A
+    background thread writes once changes have been quiet for `delay`
+    seconds (or after `max_delay` under constant changes), so rapid toggles
+    become a single write. The file is replaced atomically via a temp file
+    and rename, and only the lines of the changed keys are touched, keeping
+    comments and layout intact.
+    """
+
+    def __init__(
+        self,
+        config_path: Optional[Path] = None,
+        delay: float = 0.5,
+        max_delay: float = 2.0,
+    ):
+        """
+        Initialize writer.
+
+        Args:
+            config_path: File to update (defaults to config.yaml)
+            delay: Quiet period before writing
+            max_delay: Longest a change may wait while others keep arriving
+        """
+        self.config_path = config_path or BASE_DIR / "config.yaml"
+        self.delay = delay
+        self.max_delay = max_delay
+
+        self._pending: dict[str, Any] = {}
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._condition = Condition()
+        # Held across taking the pending changes and writing them, so the
+        # write loop and an exit-time flush() never write concurrently
+        self._write_lock = Lock()
+        self._thread = Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def set(self, key: str, value: Any) -> None:
+        """Schedule a top-level setting to be saved."""
+        with self._condition:
+            now = time.monotonic()
+            if not self._pending:
+                self._first_change = now
+            self._last_change = now
+            self._pending[key] = value
+            self._condition.notify()
+
+    def flush(self) -> None:
+        """Write pending changes now, after any write already in progress."""
+        with self._write_lock:
+            with self._condition:
+                pending, self._pending = self._pending, {}
+            if pending:
+                self._write(pending)
+
+    def _write_loop(self) -> None:
+        """Wait for changes to settle, then write them."""
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+
+                now = time.monotonic()
+                due = min(self._last_change + self.delay, self._first_change + self.max_delay)
+                if now < due:
+                    self._condition.wait(due - now)
+                    continue
+
+            self.flush()
+
+    def _write(self, settings: dict[str, Any]) -> None:
+        """Patch the given keys into the config file and replace it atomically."""
+        try:
+            content = self.config_path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            content = ""
+
+        for key, value in settings.items():
+            content = self._patch(content, key, value)
+
+        # Never write a file we couldn't load back
+        try:
+            parsed = yaml.safe_load(content) or {}
+        except yaml.YAMLError as e:
+            print(f"Settings write error: {e}")
+            return
+        if any(parsed.get(key) != value for key, value in settings.items()):
+            print(f"Settings write error: could not update {', '.join(settings)}")
+            return
+
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.config_path.parent, prefix=".config-", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates the file as 0600; keep config.yaml's own mode
+            try:
+                shutil.copymode(self.config_path, tmp_path)
+            except FileNotFoundError:
+                os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.config_path)
+        except OSError as e:
+            print(f"Settings write error: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _patch(content: str, key: str, value: Any) -> str:
+        """Replace the value of a top-level key, keeping any trailing comment."""
+        # JSON scalars are valid YAML and quote strings safely
+        encoded = json.dumps(value, ensure_ascii=False)
+
+        # Only unindented lines starting with the key: never nested keys or comments
+        pattern = re.compile(
+            rf"""^({re.escape(key)}[ \t]*:[ \t]*)("[^"\n]*"|'[^'\n]*'|[^#\n]*?)([ \t]+#[^\n]*)?[ \t]*$""",
+            re.MULTILINE,
+        )
+        match = pattern.search(content)
+        if match:
+            line = f"{match.group(1)}{encoded}{match.group(3) or ''}"
+            return content[: match.start()] + line + content[match.end():]
+
+        if content and not content.endswith("\n"):
+            content += "\n"
+        return content + f"{key}: {encoded}\n"
+
+
+# Global settings writer instance
+_settings_writer: Optional[SettingsWriter] = None
+
+
+def get_settings_writer() -> SettingsWriter:
+    """Get the global settings writer, flushed automatically at exit."""
+    global _settings_writer
+    if _settings_writer is None:
+        _settings_writer = SettingsWriter()
+        atexit.register(_settings_writer.flush)
+    return _settings_writer
+
+
+def diff_config(old: Config, new: Config) -> set[str]:
+    """Names of the top-level settings that differ between two configs."""
+    return {f.name for f in fields(Config) if getattr(old, f.name) != getattr(new, f.name)}
+
+
+class ConfigWatcher:
+    """
+    Watches config.yaml and reloads it when it changes.
+
+    Changes are detected by polling the file's mtime and size, which works
+    the same on every platform. Only the settings that actually changed are
+    reported, so callers can rebuild just the affected components.
+    """
+
+    def __init__(
+        self,
+        on_change: Callable[[Config, set[str]], bool],
+        config_path: Optional[Path] = None,
+        interval: float = 1.0,
+    ):
+        """
+        Initialize watcher.
+
+        Args:
+            on_change: Called with the new config and the changed setting names;
+                returns False if the config could not be applied, so the
+                changes are reported again on the next reload
+            config_path: File to watch (defaults to config.yaml)
+            interval: Seconds between checks
+        """
+        self.on_change = on_change
+        self.config_path = config_path or BASE_DIR / "config.yaml"
+        self.interval = interval
+
+        self._signature = self._stat()
+        self._stop_event = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        """Start watching in the background."""
+        self._stop_event.clear()
+        self._thread = Thread(target=self._watch_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def check(self) -> set[str]:
+        """Reload the config if the file changed. Returns the changed settings applied."""
+        global _config
+
+        signature = self._stat()
+        if signature == self._signature:
+            return set()
+        self._signature = signature
+
+        try:
+            new_config = load_config(self.config_path)
+        except (OSError, yaml.YAMLError) as e:
+            # Likely caught mid-edit: keep the current config
+            print(f"Config reload error: {e}")
+            return set()
+
+        changed = diff_config(get_config(), new_config)
+        if not changed:
+            return changed
+        if not self.on_change(new_config, changed):
+            # Keep diffing against the config actually in use
+            return set()
+        _config = new_config
+        return changed
+
+    def _stat(self) -> Optional[tuple[int, int]]:
+        """Modification time and size of the config file."""
+        try:
+            stat = self.config_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _watch_loop(self) -> None:
+        """Poll the config file until stopped."""
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Config watcher error: {e}")
+
+
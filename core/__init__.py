@@ -1,7 +1,57 @@
 """Core modules for Voice Agent."""
 
-from .recorder import AudioRecorder
+from .recorder import AudioRecorder, RecorderState, XrunEvent
 from .transcriber import Transcriber
+from .result import TranscriptionResult, Segment, Word
 from .processor import TextProcessor
+from .vocabulary import VocabularyIndex
+from .context import PromptContext
+from .streaming import StreamingSession
+from .adaptive import SegmentTuner
+from .meter import LevelMeter
+from .preflight import PreflightAnalyzer, PreflightResult
+from .history import HistoryStore
+from .output import OutputSink, create_sink
+from .server import ApiServer
+from .multistream import MultiStreamRecorder, Utterance
+from .local import LocalTranscriber
+from .racing import RacingTranscriber, EngineStats
+from .language import AutoLanguageTranscriber
+from .ratelimit import RateLimiter
+from .replay import ReplaySource
+from .profiling import Profiler
+from .dsp import AudioPreprocessor
+from .dedup import DuplicateDetector
 
-__all__ = ["AudioRecorder", "Transcriber", "TextProcessor"]
+__all__ = [
+    "AudioRecorder",
+    "RecorderState",
+    "XrunEvent",
+    "Transcriber",
+    "TranscriptionResult",
+    "Segment",
+    "Word",
+    "TextProcessor",
+    "VocabularyIndex",
+    "PromptContext",
+    "StreamingSession",
+    "SegmentTuner",
+    "LevelMeter",
+    "PreflightAnalyzer",
+    "PreflightResult",
+    "HistoryStore",
+    "OutputSink",
+    "create_sink",
+    "ApiServer",
+    "MultiStreamRecorder",
+    "Utterance",
+    "LocalTranscriber",
+    "RacingTranscriber",
+    "EngineStats",
+    "AutoLanguageTranscriber",
+    "RateLimiter",
+    "ReplaySource",
+    "Profiler",
+    "AudioPreprocessor",
+    "DuplicateDetector",
+]
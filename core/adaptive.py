@@ -0,0 +1,133 @@
+"""
+Adaptive segment tuning.
+Learns how transcription latency grows with segment length and picks the
+segment size and concurrency that give the fastest final text.
+"""
+
+from threading import Lock
+from typing import Optional
+
+
+class SegmentTuner:
+    """
+    Online latency model for segmented transcription.
+
+    Latency is modelled as `overhead + cost * audio_seconds`, where overhead
+    covers the network round trip and queueing and cost is server time per
+    second of audio. Both are fitted by exponentially weighted least squares
+    so the model follows changing network conditions.
+
+    While recording, a new segment is ready every `segment_seconds`; with
+    `concurrency` requests in flight the pipeline keeps up as long as
+    latency(segment) <= concurrency * segment_seconds. The tuner picks the
+    shortest segment that keeps up (with headroom), because after the user
+    stops only the last segment is left and its latency is the wait for
+    the final text.
+    """
+
+    # Assumed server cost per audio second before there is data to fit
+    PRIOR_COST = 0.1
+    # Assumed fixed overhead per request before the first observation
+    PRIOR_OVERHEAD = 0.5
+
+    def __init__(
+        self,
+        min_segment_seconds: float = 2.0,
+        max_segment_seconds: float = 10.0,
+        max_concurrency: int = 3,
+        headroom: float = 0.8,
+        decay: float = 0.9,
+    ):
+        """
+        Initialize tuner.
+
+        Args:
+            min_segment_seconds: Shortest segment allowed (short ones hurt accuracy)
+            max_segment_seconds: Longest segment allowed
+            max_concurrency: Most requests in flight at once
+            headroom: Fraction of the time budget a segment may use
+            decay: Weight kept by older observations on each update
+        """
+        self.min_segment_seconds = min_segment_seconds
+        self.max_segment_seconds = max_segment_seconds
+        self.max_concurrency = max(1, max_concurrency)
+        self.headroom = headroom
+        self.decay = decay
+
+        self._lock = Lock()
+        self._observations = 0
+        # Weighted sums for the least-squares fit
+        self._sw = self._sx = self._sy = self._sxx = self._sxy = 0.0
+
+        self.segment_seconds = max_segment_seconds
+        self.concurrency = 1
+        self._recommend()
+
+    def observe(self, audio_seconds: float, latency: float) -> None:
+        """Record how long a request for `audio_seconds` of audio took."""
+        with self._lock:
+            d = self.decay
+            self._sw = self._sw * d + 1.0
+            self._sx = self._sx * d + audio_seconds
+            self._sy = self._sy * d + latency
+            self._sxx = self._sxx * d + audio_seconds * audio_seconds
+            self._sxy = self._sxy * d + audio_seconds * latency
+            self._observations += 1
+            self._recommend()
+
+    def model(self) -> tuple[float, float]:
+        """Current (overhead, cost per audio second) estimate."""
+        if not self._sw:
+            return self.PRIOR_OVERHEAD, self.PRIOR_COST
+
+        mean_x = self._sx / self._sw
+        mean_y = self._sy / self._sw
+        var_x = self._sxx / self._sw - mean_x * mean_x
+
+        # Not enough spread in segment lengths to fit a slope yet
+        if var_x < 1e-3:
+            cost = self.PRIOR_COST
+        else:
+            cost = (self._sxy / self._sw - mean_x * mean_y) / var_x
+            cost = max(0.0, cost)
+
+        overhead = max(0.0, mean_y - cost * mean_x)
+        return overhead, cost
+
+    def predict(self, audio_seconds: float) -> float:
+        """Predicted latency for a request of `audio_seconds` of audio."""
+        overhead, cost = self.model()
+        return overhead + cost * audio_seconds
+
+    def snapshot(self) -> dict:
+        """Current model and decisions, for metrics."""
+        with self._lock:
+            overhead, cost = self.model()
+            return {
+                "segment_seconds": round(self.segment_seconds, 2),
+                "concurrency": self.concurrency,
+                "overhead_seconds": round(overhead, 3),
+                "cost_per_audio_second": round(cost, 3),
+                "predicted_final_latency": round(overhead + cost * self.segment_seconds, 3),
+                "observations": self._observations,
+            }
+
+    def _recommend(self) -> None:
+        """Pick the segment length and concurrency with the fastest final text."""
+        overhead, cost = self.model()
+
+        best: Optional[tuple[float, float, int]] = None
+        for concurrency in range(1, self.max_concurrency + 1):
+            budget = concurrency * self.headroom - cost
+            if budget <= 0:
+                segment = self.max_segment_seconds
+            else:
+                segment = overhead / budget
+            segment = min(self.max_segment_seconds, max(self.min_segment_seconds, segment))
+
+            final_latency = overhead + cost * segment
+            # Strictly better only, so ties keep the lower concurrency
+            if best is None or final_latency < best[0] - 1e-6:
+                best = (final_latency, segment, concurrency)
+
+        _, self.segment_seconds, self.concurrency = best
@@ -0,0 +1,137 @@
+"""
+Prompt context module.
+Builds the Whisper prompt from recent transcriptions and a user vocabulary.
+"""
+
+import time
+from collections import deque
+from threading import Lock
+from typing import Optional
+
+
+class PromptContext:
+    """
+    Rolling, per-language prompt builder with caching.
+
+    Whisper treats the prompt as the text that came before the audio, so
+    feeding it the tail of recent dictation keeps names, spelling and
+    punctuation consistent across recordings. Prompts are cached per
+    language and only rebuilt when new text arrives or old text expires.
+    """
+
+    # Whisper only looks at the last 224 prompt tokens
+    MAX_PROMPT_TOKENS = 224
+    # Rough characters per token; deliberately low so estimates stay on the safe side
+    CHARS_PER_TOKEN = 3
+
+    def __init__(
+        self,
+        vocabulary: Optional[list] = None,
+        history_size: int = 5,
+        max_age: float = 600.0,
+        max_tokens: int = MAX_PROMPT_TOKENS,
+    ):
+        """
+        Initialize context.
+
+        Args:
+            vocabulary: Terms to always include (names, jargon)
+            history_size: Recent transcriptions kept per language
+            max_age: Seconds after which a transcription no longer counts
+            max_tokens: Prompt token budget
+        """
+        self.history_size = history_size
+        self.max_age = max_age
+        self.max_tokens = min(max_tokens, self.MAX_PROMPT_TOKENS)
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = Lock()
+        self._recent: dict[str, deque] = {}
+        self._cache: dict[str, tuple[str, float]] = {}
+        self.set_vocabulary(vocabulary or [])
+
+    def set_vocabulary(self, vocabulary: list) -> None:
+        """Replace the vocabulary list."""
+        with self._lock:
+            self.vocabulary = [str(term) for term in vocabulary if term]
+            self._cache.clear()
+
+    def add(self, text: str, language: str) -> None:
+        """Remember a finished transcription for follow-on prompts."""
+        if not text:
+            return
+        with self._lock:
+            recent = self._recent.setdefault(language, deque(maxlen=self.history_size))
+            recent.append((time.monotonic(), text))
+            self._cache.pop(language, None)
+
+    def clear(self) -> None:
+        """Forget recent transcriptions."""
+        with self._lock:
+            self._recent.clear()
+            self._cache.clear()
+
+    def prompt(self, language: str, default: str = "") -> str:
+        """
+        Get the prompt for a language.
+
+        Args:
+            language: Language code
+            default: Style prompt used when there is no recent text
+
+        Returns:
+            Prompt text within the token budget
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(language)
+            # Valid until the oldest recent entry it includes expires
+            if cached and now < cached[1]:
+                self.hits += 1
+                return cached[0]
+
+            self.misses += 1
+            prompt, expires = self._build(language, default, now)
+            self._cache[language] = (prompt, expires)
+            return prompt
+
+    def _build(self, language: str, default: str, now: float) -> tuple[str, float]:
+        """Assemble a prompt and the time until which it stays valid."""
+        budget = self.max_tokens * self.CHARS_PER_TOKEN
+
+        # Vocabulary first, capped at half the budget so recent text still fits
+        glossary = ""
+        if self.vocabulary:
+            glossary = self._fit(", ".join(self.vocabulary), budget // 2, keep_start=True)
+            if glossary:
+                glossary += "."
+
+        recent = self._recent.get(language, ())
+        fresh = [(t, text) for t, text in recent if now - t < self.max_age]
+        expires = fresh[0][0] + self.max_age if fresh else float("inf")
+
+        # The most recent text goes last: Whisper reads it as what was just said
+        tail = " ".join(text for _, text in fresh) or default
+        remaining = budget - len(glossary) - 1
+        tail = self._fit(tail, remaining, keep_start=False)
+
+        return " ".join(part for part in (glossary, tail) if part), expires
+
+    @staticmethod
+    def _fit(text: str, max_chars: int, keep_start: bool) -> str:
+        """Trim text to max_chars at a word boundary."""
+        if max_chars <= 0:
+            return ""
+        if len(text) <= max_chars:
+            return text
+
+        if keep_start:
+            cut = text[:max_chars]
+            space = cut.rfind(" ")
+            return (cut[:space] if space > 0 else cut).rstrip(", ")
+
+        cut = text[-max_chars:]
+        space = cut.find(" ")
+        return cut[space + 1:] if space >= 0 else cut
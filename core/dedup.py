@@ -0,0 +1,246 @@
+"""
+Duplicate recording detection.
+Fingerprints each recording so that a near-identical repeat, typically
+from a double-triggered hotkey, is answered from the previous result
+instead of being transcribed and pasted again.
+"""
+
+import io
+import time
+import numpy as np
+from collections import deque
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional
+
+from scipy.io import wavfile
+
+
+@dataclass
+class AudioFingerprint:
+    """Band energy envelope of a recording, trimmed of silence."""
+
+    energy: np.ndarray  # (frames, bands) dB, floored DYNAMIC_RANGE below the peak
+    duration: float     # seconds of audio after trimming silence
+
+
+# Analysis frame and hop (seconds), and the speech band that is measured
+FRAME_SECONDS = 0.064
+HOP_SECONDS = 0.016
+BANDS = 16
+LOW_HZ = 300.0
+HIGH_HZ = 3000.0
+# Range (dB) below the loudest frame that is kept; quieter frames at the
+# start and end are trimmed, quieter values in between are floored
+DYNAMIC_RANGE = 40.0
+# Only the start of long recordings is fingerprinted, in chunks of frames,
+# so memory stays small however long the dictation
+MAX_SECONDS = 30.0
+CHUNK_FRAMES = 256
+
+
+def fingerprint(audio: np.ndarray, sample_rate: int) -> Optional[AudioFingerprint]:
+    """
+    Compute the fingerprint of int16 audio.
+
+    The energy of each frame is measured in BANDS log-spaced bands over
+    the speech range. Values are floored a fixed range below the peak, so
+    background noise in quiet bands and pauses reads as a constant rather
+    than as random detail. Only the first MAX_SECONDS are analyzed; the
+    duration still covers the whole recording.
+
+    Returns:
+        The fingerprint, or None if the audio is too short or silent
+    """
+    total = len(audio)
+    analyzed = audio[: int(MAX_SECONDS * sample_rate)]
+    mono = analyzed.reshape(len(analyzed), -1).mean(axis=1, dtype=np.float32) / 32768.0
+    frame = int(FRAME_SECONDS * sample_rate)
+    hop = int(HOP_SECONDS * sample_rate)
+    if len(mono) < frame + 2 * hop:
+        return None
+
+    high = min(HIGH_HZ, 0.45 * sample_rate)
+    edges = np.geomspace(LOW_HZ, high, BANDS + 1) * frame / sample_rate
+    edges = np.unique(np.round(edges).astype(int))
+    if len(edges) < 3:
+        return None
+
+    # Strided view, no copy; windowed and transformed a chunk at a time
+    view = np.lib.stride_tricks.sliding_window_view(mono, frame)[::hop]
+    window = np.hanning(frame).astype(np.float32)
+    energy = np.empty((len(view), len(edges) - 1), dtype=np.float32)
+    level = np.empty(len(view), dtype=np.float32)
+    for start in range(0, len(view), CHUNK_FRAMES):
+        power = np.abs(np.fft.rfft(view[start:start + CHUNK_FRAMES] * window, axis=1)) ** 2
+        bands = np.add.reduceat(power, edges[:-1], axis=1)[:, : len(edges) - 1]
+        energy[start:start + CHUNK_FRAMES] = 10 * np.log10(bands + 1e-12)
+        level[start:start + CHUNK_FRAMES] = 10 * np.log10(power.sum(axis=1) + 1e-12)
+
+    # Trim silence so a recording started a moment later still lines up
+    loud = np.flatnonzero(level > level.max() - DYNAMIC_RANGE)
+    first, last = loud[0], loud[-1] + 1
+    energy = energy[first:last]
+    if len(energy) < 3:
+        return None
+
+    # Trailing silence is only known when the whole recording was analyzed
+    end = last * hop if len(analyzed) == total else total
+    energy = np.maximum(energy, energy.max() - DYNAMIC_RANGE)
+    return AudioFingerprint(energy=energy, duration=(end - first * hop) / sample_rate)
+
+
+def similarity(a: AudioFingerprint, b: AudioFingerprint, max_offset: int = 30) -> float:
+    """
+    Correlation of the two envelopes at their best alignment.
+
+    Independent of level, so a quieter take of the same audio still
+    matches: close to 1 for the same audio, around 0.3 or less for
+    different speech.
+
+    Args:
+        a, b: Fingerprints to compare
+        max_offset: Largest shift tried, in frames
+    """
+    if a.energy.shape[1] != b.energy.shape[1]:
+        return 0.0
+    shortest = min(len(a.energy), len(b.energy))
+    best = 0.0
+    for offset in range(-max_offset, max_offset + 1):
+        x = a.energy[max(0, offset):]
+        y = b.energy[max(0, -offset):]
+        n = min(len(x), len(y))
+        # Require most of the shorter recording to overlap
+        if n < 0.8 * shortest:
+            continue
+        x = x[:n].ravel() - x[:n].mean()
+        y = y[:n].ravel() - y[:n].mean()
+        norm = np.sqrt(np.dot(x, x) * np.dot(y, y))
+        if norm > 0:
+            best = max(best, float(np.dot(x, y) / norm))
+    return best
+
+
+class DuplicateDetector:
+    """
+    Remembers the fingerprints and results of recent recordings.
+
+    A recording is a duplicate of a recent one when their lengths agree
+    and their energy envelopes correlate above `threshold`.
+    """
+
+    def __init__(
+        self,
+        max_age: float = 10.0,
+        threshold: float = 0.85,
+        max_offset: float = 0.5,
+        max_entries: int = 8,
+    ):
+        """
+        Initialize detector.
+
+        Args:
+            max_age: Seconds a result stays available for duplicates
+            threshold: Envelope correlation needed for a match (0-1)
+            max_offset: Largest time shift (seconds) between matching recordings
+            max_entries: Recent recordings kept
+        """
+        self.max_age = max_age
+        self.threshold = threshold
+        self.max_offset = max_offset
+        self._recent: deque = deque(maxlen=max_entries)
+        self._lock = Lock()
+
+        self.checks = 0
+        self.hits = 0
+
+    def fingerprint_wav(self, audio_data: bytes) -> Optional[AudioFingerprint]:
+        """Fingerprint WAV audio data; None if it can't be read or is too short."""
+        try:
+            sample_rate, audio = wavfile.read(io.BytesIO(audio_data))
+        except ValueError as e:
+            print(f"Fingerprint error: {e}")
+            return None
+        return fingerprint(audio, sample_rate)
+
+    def find(self, fp: Optional[AudioFingerprint]) -> Optional[str]:
+        """
+        Look for a recent recording that this one duplicates.
+
+        Returns:
+            That recording's result, or None
+        """
+        if fp is None:
+            return None
+        now = time.monotonic()
+        max_offset = int(round(self.max_offset / HOP_SECONDS))
+
+        with self._lock:
+            self.checks += 1
+            recent = [e for e in self._recent if now - e[0] <= self.max_age]
+        for _, other, text in reversed(recent):
+            longest = max(fp.duration, other.duration)
+            if abs(fp.duration - other.duration) > max(0.25, 0.1 * longest):
+                continue
+            if similarity(fp, other, max_offset) >= self.threshold:
+                with self._lock:
+                    self.hits += 1
+                return text
+        return None
+
+    def remember(self, fp: Optional[AudioFingerprint], text: str) -> None:
+        """Store a recording's fingerprint with its final result."""
+        if fp is None or not text:
+            return
+        with self._lock:
+            self._recent.append((time.monotonic(), fp, text))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._recent.clear()
+
+
+if __name__ == "__main__":
+    # Benchmark: fingerprint cost and similarity of repeats vs. different audio
+    rng = np.random.default_rng(0)
+    sample_rate = 16000
+
+    def utterance(seed: int, seconds: float = 3.0) -> np.ndarray:
+        """Synthetic speech: syllables with random pitch and formants."""
+        r = np.random.default_rng(seed)
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        out = np.zeros_like(t)
+        for start in np.arange(0.2, seconds - 0.4, 0.25):
+            f0 = r.uniform(100, 220)
+            mask = (t >= start) & (t < start + 0.2)
+            tt = t[mask] - start
+            env = np.sin(np.pi * tt / 0.2)
+            for formant in r.uniform(300, 3000, 3):
+                out[mask] += env * np.sin(2 * np.pi * formant * tt) * r.uniform(0.05, 0.2)
+            out[mask] += env * np.sin(2 * np.pi * f0 * tt) * 0.2
+        return out
+
+    def record(signal: np.ndarray, delay: float, gain: float) -> np.ndarray:
+        pad = np.zeros(int(delay * sample_rate))
+        noise = 0.005 * rng.standard_normal(len(signal) + len(pad))
+        return (np.concatenate([pad, signal * gain]) + noise) * 32767
+
+    speech = utterance(1)
+    first = fingerprint(record(speech, 0.0, 1.0).astype(np.int16), sample_rate)
+
+    started = time.perf_counter()
+    runs = 50
+    for _ in range(runs):
+        repeat = fingerprint(record(speech, 0.13, 0.7).astype(np.int16), sample_rate)
+    per_call = (time.perf_counter() - started) / runs
+    other = fingerprint(record(utterance(2), 0.0, 1.0).astype(np.int16), sample_rate)
+
+    started = time.perf_counter()
+    same = similarity(first, repeat)
+    compare = time.perf_counter() - started
+    print(f"fingerprint of 3 s: {per_call * 1000:.2f} ms, comparison: {compare * 1000:.2f} ms")
+    take = record(speech, 0.05, 0.3)
+    quiet = fingerprint((take + 300 * rng.standard_normal(len(take))).astype(np.int16), sample_rate)
+    print(f"repeat (shifted 130 ms, -3 dB, new noise): {same:.3f}")
+    print(f"repeat (-10 dB, louder noise):            {similarity(first, quiet):.3f}")
+    print(f"different utterance:                      {similarity(first, other):.3f}")
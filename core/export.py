@@ -0,0 +1,316 @@
+"""
+Transcript export module.
+Turns long audio files into SRT, VTT and JSONL transcripts, writing each
+part as soon as it is transcribed.
+"""
+
+import json
+import time
+import wave
+import numpy as np
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from .recorder import encode_wav
+from .result import Segment, TranscriptionResult
+from .streaming import find_quiet_cut
+
+
+def format_timestamp(seconds: float, separator: str = ",") -> str:
+    """Format seconds as HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (VTT)."""
+    millis = int(round(max(seconds, 0.0) * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+class TranscriptWriter(ABC):
+    """Base class: appends timed segments to an output file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._header()
+
+    def write(self, segment: Segment) -> None:
+        """Append one segment and flush, so the file is usable while it grows."""
+        self._write(segment)
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _header(self) -> None:
+        pass
+
+    @abstractmethod
+    def _write(self, segment: Segment) -> None:
+        """Write one segment in the file's format."""
+
+
+class SrtWriter(TranscriptWriter):
+    """SubRip subtitles."""
+
+    def _header(self) -> None:
+        self._index = 0
+
+    def _write(self, segment: Segment) -> None:
+        self._index += 1
+        self._file.write(
+            f"{self._index}\n"
+            f"{format_timestamp(segment.start)} --> {format_timestamp(segment.end)}\n"
+            f"{segment.text}\n\n"
+        )
+
+
+class VttWriter(TranscriptWriter):
+    """WebVTT subtitles."""
+
+    def _header(self) -> None:
+        self._file.write("WEBVTT\n\n")
+
+    def _write(self, segment: Segment) -> None:
+        self._file.write(
+            f"{format_timestamp(segment.start, '.')} --> {format_timestamp(segment.end, '.')}\n"
+            f"{segment.text}\n\n"
+        )
+
+
+class JsonlWriter(TranscriptWriter):
+    """One JSON object per segment, including confidence and word times."""
+
+    def _write(self, segment: Segment) -> None:
+        record = {
+            "start": round(segment.start, 3),
+            "end": round(segment.end, 3),
+            "text": segment.text,
+            "confidence": segment.confidence,
+        }
+        if segment.words:
+            record["words"] = [
+                {"word": w.word, "start": round(w.start, 3), "end": round(w.end, 3)}
+                for w in segment.words
+            ]
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+WRITERS = {
+    "srt": SrtWriter,
+    "vtt": VttWriter,
+    "jsonl": JsonlWriter,
+}
+
+
+def iter_wav_chunks(
+    path: Path, chunk_seconds: float = 30.0
+) -> Iterator[tuple[float, np.ndarray, int]]:
+    """
+    Read a 16-bit PCM WAV file in chunks cut at quiet points.
+
+    Only one chunk (plus the carry-over to the next cut) is in memory at a
+    time, whatever the length of the file.
+
+    Yields:
+        (offset in seconds, int16 samples shaped (frames, channels), sample rate)
+    """
+    with wave.open(str(path), "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(
+                f"{path}: only 16-bit PCM WAV is supported "
+                "(convert with: ffmpeg -i input -ac 1 -ar 16000 output.wav)"
+            )
+        sample_rate = wav.getframerate()
+        channels = wav.getnchannels()
+        chunk_frames = int(chunk_seconds * sample_rate)
+
+        offset = 0
+        carry = np.zeros((0, channels), dtype=np.int16)
+        while True:
+            data = wav.readframes(chunk_frames - len(carry))
+            samples = np.frombuffer(data, dtype="<i2").reshape(-1, channels)
+            audio = np.concatenate([carry, samples]) if len(carry) else samples
+
+            if len(audio) < chunk_frames:
+                # End of file: the rest is the last chunk
+                if len(audio):
+                    yield offset / sample_rate, audio, sample_rate
+                return
+
+            cut = find_quiet_cut(audio, sample_rate, chunk_frames)
+            yield offset / sample_rate, audio[:cut], sample_rate
+            offset += cut
+            carry = audio[cut:]
+
+
+def export_transcript(
+    audio_path: Path,
+    transcriber,
+    output_base: Path,
+    formats: tuple = ("srt",),
+    chunk_seconds: float = 30.0,
+    max_concurrency: int = 4,
+    word_timestamps: bool = False,
+    process_text: Optional[Callable[[str], str]] = None,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> dict:
+    """
+    Transcribe a long WAV file and write transcripts as it goes.
+
+    Chunks are transcribed in parallel, but at most max_concurrency are
+    read ahead, and results are written strictly in order as soon as the
+    oldest chunk finishes, so memory use stays flat and the output files
+    are valid at every point.
+
+    Args:
+        audio_path: 16-bit PCM WAV file
+        transcriber: Anything with transcribe_verbose(wav_bytes, word_timestamps=...)
+        output_base: Output path without extension; one file per format
+        formats: Any of "srt", "vtt", "jsonl"
+        chunk_seconds: Target length of each request
+        max_concurrency: Requests in flight at once
+        word_timestamps: Request word times (written to JSONL)
+        process_text: Applied to each segment's text (e.g. TextProcessor.process)
+        on_progress: Called with the seconds of audio written so far
+
+    Returns:
+        Output path per format
+    """
+    unknown = set(formats) - set(WRITERS)
+    if unknown:
+        raise ValueError(f"Unknown export format: {', '.join(sorted(unknown))}")
+
+    output_base = Path(output_base)
+    writers = {
+        fmt: WRITERS[fmt](output_base.parent / f"{output_base.name}.{fmt}") for fmt in formats
+    }
+    inflight: deque[tuple[float, float, Future]] = deque()
+
+    def transcribe(audio: np.ndarray, sample_rate: int) -> Optional[TranscriptionResult]:
+        wav_bytes = encode_wav(audio, sample_rate)
+        # One retry: a single failed request shouldn't leave a hole in the transcript
+        for _ in range(2):
+            result = transcriber.transcribe_verbose(wav_bytes, word_timestamps=word_timestamps)
+            if result:
+                return result
+        return None
+
+    def write_oldest() -> None:
+        offset, duration, future = inflight.popleft()
+        result = future.result()
+        if result is None:
+            print(f"Export: no text for {format_timestamp(offset)} - "
+                  f"{format_timestamp(offset + duration)}")
+        else:
+            for segment in result.shifted(offset).segments:
+                if process_text:
+                    segment.text = process_text(segment.text)
+                if not segment.text:
+                    continue
+                # Segment ends can overshoot the chunk slightly
+                segment.end = min(segment.end, offset + duration)
+                for writer in writers.values():
+                    writer.write(segment)
+        if on_progress:
+            on_progress(offset + duration)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="export") as executor:
+            for offset, audio, sample_rate in iter_wav_chunks(audio_path, chunk_seconds):
+                while len(inflight) >= max_concurrency:
+                    write_oldest()
+                duration = len(audio) / sample_rate
+                inflight.append((offset, duration, executor.submit(transcribe, audio, sample_rate)))
+            while inflight:
+                write_oldest()
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return {fmt: writer.path for fmt, writer in writers.items()}
+
+
+def run_export(args: list) -> None:
+    """
+    Command-line export: python main.py --export FILE [--format srt,vtt,jsonl]
+    [--output BASE] [--chunk SECONDS] [--jobs N] [--words]
+    """
+    import argparse
+
+    from config import BASE_DIR, get_config
+    from .language import AutoLanguageTranscriber
+    from .processor import TextProcessor
+    from .ratelimit import RateLimiter
+    from .transcriber import Transcriber
+
+    parser = argparse.ArgumentParser(prog="main.py --export")
+    parser.add_argument("file", type=Path, help="16-bit PCM WAV file")
+    parser.add_argument("--format", default="srt", help="comma-separated: srt, vtt, jsonl")
+    parser.add_argument("--output", type=Path, help="output path without extension")
+    parser.add_argument("--chunk", type=float, default=30.0, help="seconds per request")
+    parser.add_argument("--jobs", type=int, default=4, help="requests in flight")
+    parser.add_argument("--words", action="store_true", help="include word times (jsonl)")
+    options = parser.parse_args(args)
+
+    config = get_config()
+
+    # Long files are many requests: stay inside the quota shared with the app
+    rate_limiter = None
+    limits = config.rate_limit
+    if limits.enabled:
+        rate_limiter = RateLimiter(
+            requests_per_minute=limits.requests_per_minute,
+            requests_per_day=limits.requests_per_day,
+            audio_seconds_per_hour=limits.audio_seconds_per_hour,
+            audio_seconds_per_day=limits.audio_seconds_per_day,
+            min_billed_seconds=limits.min_billed_seconds,
+            usage_path=BASE_DIR / limits.usage_path,
+        )
+
+    if config.language == "auto":
+        detection = config.language_detection
+        fallback = (detection.candidates or ["en"])[0]
+        transcriber = AutoLanguageTranscriber(
+            Transcriber(api_key=config.groq_api_key, language=fallback, rate_limiter=rate_limiter),
+            fallback=fallback,
+            candidates=detection.candidates,
+            probe_seconds=detection.probe_seconds,
+            min_confidence=detection.min_confidence,
+        )
+    else:
+        transcriber = Transcriber(
+            api_key=config.groq_api_key, language=config.language, rate_limiter=rate_limiter
+        )
+    processor = TextProcessor(corrections=config.text_corrections, vocabulary=config.vocabulary)
+
+    with wave.open(str(options.file), "rb") as wav:
+        total = wav.getnframes() / wav.getframerate()
+
+    started = time.perf_counter()
+
+    def progress(done: float) -> None:
+        print(f"\r{done / total:6.1%}  {format_timestamp(done)} / {format_timestamp(total)}",
+              end="", flush=True)
+
+    paths = export_transcript(
+        options.file,
+        transcriber,
+        options.output or options.file.with_suffix(""),
+        formats=tuple(f.strip() for f in options.format.split(",") if f.strip()),
+        chunk_seconds=options.chunk,
+        max_concurrency=options.jobs,
+        word_timestamps=options.words,
+        process_text=processor.process,
+        on_progress=progress,
+    )
+
+    if rate_limiter:
+        rate_limiter.save()
+
+    elapsed = time.perf_counter() - started
+    print(f"\nDone in {elapsed:.1f}s ({total / elapsed:.1f}x real time)")
+    for path in paths.values():
+        print(f"  {path}")
@@ -0,0 +1,161 @@
+"""
+Transcription history module.
+Stores transcriptions in SQLite with a full-text index.
+"""
+
+import re
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcriptions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    text TEXT NOT NULL,
+    language TEXT,
+    duration REAL,
+    latency_ms REAL
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS transcriptions_fts USING fts5(
+    text, content='transcriptions', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS transcriptions_ai AFTER INSERT ON transcriptions BEGIN
+    INSERT INTO transcriptions_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS transcriptions_ad AFTER DELETE ON transcriptions BEGIN
+    INSERT INTO transcriptions_fts(transcriptions_fts, rowid, text)
+    VALUES ('delete', old.id, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS transcriptions_au AFTER UPDATE ON transcriptions BEGIN
+    INSERT INTO transcriptions_fts(transcriptions_fts, rowid, text)
+    VALUES ('delete', old.id, old.text);
+    INSERT INTO transcriptions_fts(rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+COLUMNS = "id, created_at, text, language, duration, latency_ms"
+
+
+class HistoryStore:
+    """Persistent, searchable transcription history."""
+
+    def __init__(self, path: Path):
+        """
+        Open (or create) the history database.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self._lock = Lock()
+
+        # Shared by the UI and pipeline threads, serialized by self._lock
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+        try:
+            self._conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: fall back to LIKE queries
+            self.has_fts = False
+        self._conn.commit()
+
+    def add(
+        self,
+        text: str,
+        language: Optional[str] = None,
+        duration: Optional[float] = None,
+        latency_ms: Optional[float] = None,
+    ) -> int:
+        """
+        Store a transcription.
+
+        Args:
+            text: Final transcribed text
+            language: Language code used for transcription
+            duration: Length of the recording in seconds
+            latency_ms: Time from end of recording to final text
+
+        Returns:
+            ID of the new entry
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO transcriptions (created_at, text, language, duration, latency_ms) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (time.time(), text, language, duration, latency_ms),
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def count(self, query: str = "") -> int:
+        """Number of entries, optionally only those matching a search."""
+        where, params = self._search_clause(query)
+        with self._lock:
+            if where and self.has_fts:
+                sql = f"SELECT count(*) FROM transcriptions_fts WHERE {where}"
+            else:
+                sql = f"SELECT count(*) FROM transcriptions {'WHERE ' + where if where else ''}"
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def page(self, offset: int = 0, limit: int = 20, query: str = "") -> list[dict]:
+        """
+        Get entries newest first.
+
+        Args:
+            offset: Number of entries to skip
+            limit: Maximum number of entries to return
+            query: Optional full-text search
+
+        Returns:
+            List of entries as dicts
+        """
+        where, params = self._search_clause(query)
+        if where and self.has_fts:
+            sql = (
+                f"SELECT {COLUMNS} FROM transcriptions WHERE id IN "
+                f"(SELECT rowid FROM transcriptions_fts WHERE {where}) "
+                "ORDER BY id DESC LIMIT ? OFFSET ?"
+            )
+        else:
+            sql = (
+                f"SELECT {COLUMNS} FROM transcriptions "
+                f"{'WHERE ' + where if where else ''} "
+                "ORDER BY id DESC LIMIT ? OFFSET ?"
+            )
+
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit, offset)).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
+
+    def _search_clause(self, query: str) -> tuple[str, tuple]:
+        """Build a WHERE clause for a user search string."""
+        words = re.findall(r"\w+", query or "")
+        if not words:
+            return "", ()
+
+        if self.has_fts:
+            # Quote each word so user input can't inject FTS syntax;
+            # prefix-match the last one for search-as-you-type
+            terms = [f'"{w}"' for w in words]
+            terms[-1] += "*"
+            return "transcriptions_fts MATCH ?", (" ".join(terms),)
+
+        clause = " AND ".join("text LIKE ?" for _ in words)
+        return clause, tuple(f"%{w}%" for w in words)
@@ -0,0 +1,239 @@
+"""
+Automatic language detection.
+Detects the spoken language from the start of a recording and remembers it,
+so later recordings skip detection until transcription confidence drops.
+"""
+
+import io
+import time
+from threading import Event, Lock
+from typing import Optional
+
+from scipy.io import wavfile
+
+from .recorder import encode_wav
+from .result import TranscriptionResult
+
+# Language names as reported by Whisper, for the most common languages
+LANGUAGE_CODES = {
+    "english": "en", "italian": "it", "spanish": "es", "french": "fr",
+    "german": "de", "portuguese": "pt", "dutch": "nl", "polish": "pl",
+    "russian": "ru", "ukrainian": "uk", "czech": "cs", "swedish": "sv",
+    "danish": "da", "norwegian": "no", "finnish": "fi", "greek": "el",
+    "turkish": "tr", "romanian": "ro", "hungarian": "hu", "catalan": "ca",
+    "arabic": "ar", "hebrew": "he", "hindi": "hi", "japanese": "ja",
+    "korean": "ko", "chinese": "zh", "vietnamese": "vi", "indonesian": "id",
+    "thai": "th", "malay": "ms",
+}
+
+
+def language_code(name: Optional[str]) -> Optional[str]:
+    """Normalize a language name or code ("English", "en") to a code."""
+    if not name:
+        return None
+    name = name.strip().lower()
+    if len(name) <= 3:
+        return name
+    return LANGUAGE_CODES.get(name)
+
+
+def trim_wav(audio_data: bytes, seconds: float) -> bytes:
+    """Keep only the first `seconds` of WAV audio data."""
+    sample_rate, audio = wavfile.read(io.BytesIO(audio_data))
+    frames = int(seconds * sample_rate)
+    if len(audio) <= frames:
+        return audio_data
+    return encode_wav(audio[:frames], sample_rate)
+
+
+class AutoLanguageTranscriber:
+    """
+    Wraps an engine and picks the transcription language per recording.
+
+    The first recording of a session is probed: its first seconds are sent
+    without a language (and without a prompt, which would bias the guess)
+    and the detected language is cached. Later recordings use the cached
+    language directly. When a result comes back with low confidence, which
+    is what a language switch looks like, the recording is probed again and
+    re-transcribed if a different language is found.
+
+    The engine needs detect_language(audio_data) -> (code, confidence) and
+    transcribe_verbose(..., language=...); Transcriber, LocalTranscriber
+    and RacingTranscriber all provide both. The language is passed per
+    call, never set on the shared engine, so concurrent recordings (live
+    segments, export jobs, meeting tracks) can't switch each other's
+    language. Concurrent recordings that all need a probe wait for the
+    first one instead of each sending their own.
+    """
+
+    # Longest wait (seconds) for another recording's probe
+    PROBE_WAIT = 30.0
+
+    def __init__(
+        self,
+        engine,
+        fallback: str = "en",
+        candidates: Optional[list] = None,
+        probe_seconds: float = 4.0,
+        min_confidence: float = 0.5,
+        cache_seconds: float = 1800.0,
+    ):
+        """
+        Initialize wrapper.
+
+        Args:
+            engine: Transcription engine
+            fallback: Language used when detection fails
+            candidates: If given, detections outside this list are ignored
+            probe_seconds: Audio used for detection
+            min_confidence: Results below this trigger a new detection
+            cache_seconds: How long a detected language stays valid
+        """
+        self.engine = engine
+        self.fallback = fallback
+        self.candidates = [c.lower() for c in candidates or []]
+        self.probe_seconds = probe_seconds
+        self.min_confidence = min_confidence
+        self.cache_seconds = cache_seconds
+
+        self.detections = 0
+        self.cache_hits = 0
+
+        self._lock = Lock()
+        # Context -> (language, detected at)
+        self._cache: dict[str, tuple[str, float]] = {}
+        # Context -> set when the probe in progress for it finishes
+        self._probes: dict[str, Event] = {}
+        self._context = "default"
+        self._language = fallback
+
+    @property
+    def language(self) -> str:
+        """Language of the most recent transcription."""
+        return self._language
+
+    def set_language(self, language: str) -> None:
+        """Ignored: the language is detected (kept for the engine interface)."""
+
+    def set_context(self, context: str) -> None:
+        """Switch the cache key, e.g. per application the text goes to."""
+        self._context = context or "default"
+
+    def close(self) -> None:
+        """Release the wrapped engine's resources, if it holds any."""
+        close = getattr(self.engine, "close", None)
+        if close:
+            close()
+
+    def forget(self) -> None:
+        """Drop cached detections."""
+        with self._lock:
+            self._cache.clear()
+
+    def transcribe(
+        self, audio_data: bytes, cancel_event: Optional[Event] = None
+    ) -> Optional[str]:
+        """
+        Transcribe audio bytes in the detected language.
+
+        Args:
+            audio_data: WAV audio data as bytes
+            cancel_event: Passed to the engine
+
+        Returns:
+            Transcribed text or None if failed
+        """
+        result = self.transcribe_verbose(audio_data, cancel_event=cancel_event)
+        return result.text if result else None
+
+    def transcribe_verbose(
+        self,
+        audio_data: bytes,
+        cancel_event: Optional[Event] = None,
+        word_timestamps: bool = False,
+    ) -> Optional[TranscriptionResult]:
+        """Like transcribe(), keeping segment timing and confidence."""
+        if not audio_data:
+            return None
+
+        context = self._context
+        language = self._cached_language(context)
+        detected_now = language is None
+        if detected_now:
+            language = self._probe(context, audio_data, cancel_event) or self.fallback
+
+        result = self._transcribe_in(language, audio_data, cancel_event, word_timestamps)
+        confidence = result.confidence if result else None
+
+        if not detected_now and (result is None or (confidence is not None and confidence < self.min_confidence)):
+            # Maybe the speaker switched language: probe this recording
+            detected = self._detect(context, audio_data, cancel_event)
+            if detected and detected != language:
+                retry = self._transcribe_in(detected, audio_data, cancel_event, word_timestamps)
+                if retry and (result is None or (retry.confidence or 0.0) > (confidence or 0.0)):
+                    result, language = retry, detected
+
+        self._language = language
+        if result is not None:
+            result.language = language
+        return result
+
+    def _transcribe_in(
+        self, language: str, audio_data: bytes, cancel_event: Optional[Event], word_timestamps: bool
+    ) -> Optional[TranscriptionResult]:
+        """Run the engine in the given language (for this call only)."""
+        return self.engine.transcribe_verbose(
+            audio_data,
+            cancel_event=cancel_event,
+            word_timestamps=word_timestamps,
+            language=language,
+        )
+
+    def _cached_language(self, context: str) -> Optional[str]:
+        """Language cached for a context, if still valid."""
+        with self._lock:
+            cached = self._cache.get(context)
+            if cached and time.monotonic() - cached[1] < self.cache_seconds:
+                self.cache_hits += 1
+                return cached[0]
+            return None
+
+    def _probe(self, context: str, audio_data: bytes, cancel_event: Optional[Event]) -> Optional[str]:
+        """Detect the language, or wait for a detection already running for the context."""
+        with self._lock:
+            running = self._probes.get(context)
+            if running is None:
+                self._probes[context] = Event()
+
+        if running is not None:
+            running.wait(self.PROBE_WAIT)
+            # The other probe may have failed; then this recording tries itself
+            return self._cached_language(context) or self._detect(context, audio_data, cancel_event)
+
+        try:
+            return self._detect(context, audio_data, cancel_event)
+        finally:
+            with self._lock:
+                self._probes.pop(context).set()
+
+    def _detect(self, context: str, audio_data: bytes, cancel_event: Optional[Event]) -> Optional[str]:
+        """Detect the language of the start of the recording and cache it."""
+        try:
+            probe = trim_wav(audio_data, self.probe_seconds)
+        except ValueError as e:
+            print(f"Language detection error: {e}")
+            return None
+
+        detection = self.engine.detect_language(probe, cancel_event=cancel_event)
+        with self._lock:
+            self.detections += 1
+        if not detection:
+            return None
+
+        language = language_code(detection[0])
+        if not language or (self.candidates and language not in self.candidates):
+            return None
+
+        with self._lock:
+            self._cache[context] = (language, time.monotonic())
+        return language
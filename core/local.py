@@ -0,0 +1,199 @@
+"""
+Local speech-to-text transcriber using faster-whisper on the CPU.
+Optional: requires the faster-whisper package.
+"""
+
+import io
+import numpy as np
+from scipy.io import wavfile
+from threading import Event, Lock
+from typing import Optional
+
+from .context import PromptContext
+from .meter import FULL_SCALE
+from .result import Segment, TranscriptionResult, Word, logprob_to_confidence
+from .transcriber import Transcriber
+
+# Loaded model by (model_size, compute_type), shared by every LocalTranscriber
+# so rebuilding one after a config reload doesn't load the model again. Only
+# the most recently requested model is kept.
+_models: dict[tuple[str, str], object] = {}
+_models_lock = Lock()
+
+
+class LocalTranscriber:
+    """Transcribes audio to text with a local Whisper model."""
+
+    def __init__(
+        self,
+        model_size: str = "base",
+        language: str = "it",
+        compute_type: str = "int8",
+        context: Optional[PromptContext] = None,
+    ):
+        """
+        Initialize transcriber. The model is loaded on first use.
+
+        Args:
+            model_size: faster-whisper model name (tiny, base, small, ...)
+            language: Language code (it, en, es, fr, de)
+            compute_type: CTranslate2 compute type
+            context: Rolling prompt context; static prompts are used without it
+        """
+        self.model_size = model_size
+        self.language = language
+        self.compute_type = compute_type
+        self.context = context
+
+        self._model = None
+        self._model_lock = Lock()
+
+    def set_language(self, language: str) -> None:
+        """Change transcription language."""
+        self.language = language
+
+    def _get_prompt(self, language: Optional[str] = None) -> Optional[str]:
+        """Get the prompt for a language (the current one by default)."""
+        language = language or self.language
+        default = Transcriber.PUNCTUATION_PROMPTS.get(language, "")
+        if self.context:
+            return self.context.prompt(language, default=default) or None
+        return default or None
+
+    def load(self) -> None:
+        """Load the model now instead of on the first transcription."""
+        with self._model_lock:
+            if self._model is None:
+                self._model = _load_model(self.model_size, self.compute_type)
+
+    def transcribe(
+        self, audio_data: bytes, cancel_event: Optional[Event] = None
+    ) -> Optional[str]:
+        """
+        Transcribe audio bytes to text.
+
+        Args:
+            audio_data: WAV audio data as bytes
+            cancel_event: If set, decoding stops at the next segment
+
+        Returns:
+            Transcribed text or None if failed or cancelled
+        """
+        result = self.transcribe_verbose(audio_data, cancel_event=cancel_event)
+        return result.text if result else None
+
+    def transcribe_verbose(
+        self,
+        audio_data: bytes,
+        cancel_event: Optional[Event] = None,
+        word_timestamps: bool = False,
+        language: Optional[str] = None,
+    ) -> Optional[TranscriptionResult]:
+        """
+        Transcribe audio bytes, keeping segment timing and confidence.
+
+        Args:
+            audio_data: WAV audio data as bytes
+            cancel_event: If set, decoding stops at the next segment
+            word_timestamps: Also compute per-word times
+            language: Language of this call only; the current one if None
+
+        Returns:
+            TranscriptionResult or None if failed or cancelled
+        """
+        if not audio_data:
+            return None
+
+        language = language or self.language
+        try:
+            self.load()
+            audio = self._read_audio(audio_data)
+
+            decoded, info = self._model.transcribe(
+                audio,
+                language=language,
+                initial_prompt=self._get_prompt(language),
+                beam_size=1,
+                word_timestamps=word_timestamps,
+            )
+
+            # Segments are decoded lazily, so cancellation takes effect between them
+            segments = []
+            for segment in decoded:
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+                segments.append(Segment(
+                    start=segment.start,
+                    end=segment.end,
+                    text=segment.text.strip(),
+                    confidence=logprob_to_confidence(segment.avg_logprob),
+                    no_speech_prob=segment.no_speech_prob,
+                    words=[
+                        Word(w.word.strip(), w.start, w.end, w.probability)
+                        for w in segment.words or []
+                    ],
+                ))
+
+            text = " ".join(s.text for s in segments if s.text)
+            if not text:
+                return None
+            return TranscriptionResult(
+                text=text,
+                language=info.language,
+                duration=info.duration,
+                segments=segments,
+            )
+
+        except Exception as e:
+            print(f"Local transcription error: {e}")
+            return None
+
+    def detect_language(
+        self, audio_data: bytes, cancel_event: Optional[Event] = None
+    ) -> Optional[tuple[str, Optional[float]]]:
+        """
+        Detect the spoken language.
+
+        Returns:
+            (language code, probability) or None if failed
+        """
+        if not audio_data:
+            return None
+
+        try:
+            self.load()
+            # Detection runs eagerly; the returned segments are lazy and never decoded
+            _, info = self._model.transcribe(
+                self._read_audio(audio_data), language=None, beam_size=1
+            )
+            return info.language, info.language_probability
+
+        except Exception as e:
+            print(f"Local language detection error: {e}")
+            return None
+
+    @staticmethod
+    def _read_audio(audio_data: bytes) -> np.ndarray:
+        """Decode WAV bytes to 16 kHz mono float32, as Whisper expects."""
+        sample_rate, audio = wavfile.read(io.BytesIO(audio_data))
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1)
+        audio = audio.astype(np.float32) / FULL_SCALE
+        if sample_rate != 16000:
+            from scipy.signal import resample_poly
+            audio = resample_poly(audio, 16000, sample_rate).astype(np.float32)
+        return audio
+
+
+def _load_model(model_size: str, compute_type: str):
+    """The shared WhisperModel for these settings, loaded if needed."""
+    key = (model_size, compute_type)
+    with _models_lock:
+        if key not in _models:
+            # Imported here so the app runs without the optional dependency
+            from faster_whisper import WhisperModel
+
+            # Transcribers still using another model keep their reference
+            _models.clear()
+            _models[key] = WhisperModel(model_size, device="cpu", compute_type=compute_type)
+        return _models[key]
@@ -0,0 +1,145 @@
+"""
+Input level meter module.
+Measures RMS and peak levels of the audio stream as it is captured.
+"""
+
+import math
+import time
+import numpy as np
+from typing import Callable, Optional
+
+
+# Full-scale amplitude of int16 samples
+FULL_SCALE = 32768.0
+
+
+def to_dbfs(amplitude: float) -> float:
+    """Convert an int16 amplitude to dBFS, floored at -96 dB."""
+    if amplitude <= 0:
+        return -96.0
+    return max(-96.0, 20.0 * math.log10(amplitude / FULL_SCALE))
+
+
+class LevelMeter:
+    """
+    Tracks the input level of an int16 audio stream.
+
+    update() is called from the audio callback, so it reuses a single
+    scratch buffer and does a fixed amount of work per block. Levels are
+    published to listeners at most once per publish interval.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        publish_interval: float = 0.05,
+        silence_db: float = -50.0,
+        silence_seconds: float = 1.5,
+        clip_ratio: float = 0.01,
+    ):
+        """
+        Initialize meter.
+
+        Args:
+            sample_rate: Sample rate of the stream
+            publish_interval: Minimum seconds between two published levels
+            silence_db: RMS level (dBFS) below which input counts as silent
+            silence_seconds: Silent input needed before warning about it
+            clip_ratio: Fraction of clipped blocks that triggers a warning
+        """
+        self.sample_rate = sample_rate
+        self.publish_interval = publish_interval
+        self.silence_db = silence_db
+        self.silence_seconds = silence_seconds
+        self.clip_ratio = clip_ratio
+
+        self._listeners: list[Callable[[dict], None]] = []
+        self._scratch = np.empty(0, dtype=np.float32)
+        self.reset()
+
+    def add_listener(self, listener: Callable[[dict], None]) -> None:
+        """
+        Register a callback for published levels.
+
+        The callback runs on the audio thread and receives a dict with
+        rms_db, peak_db and warning; it must return quickly.
+        """
+        self._listeners.append(listener)
+
+    def reset(self) -> None:
+        """Clear the statistics of the previous recording."""
+        self.frames = 0
+        self.blocks = 0
+        self.clipped_blocks = 0
+        self.loudest_rms_db = -96.0
+
+        self._interval_sumsq = 0.0
+        self._interval_frames = 0
+        self._interval_peak = 0.0
+        self._last_publish = 0.0
+
+    @property
+    def warning(self) -> Optional[str]:
+        """'clipping' or 'silence' if the input looks unusable, else None."""
+        if self.blocks and self.clipped_blocks / self.blocks > self.clip_ratio:
+            return "clipping"
+        if (
+            self.frames >= self.silence_seconds * self.sample_rate
+            and self.loudest_rms_db < self.silence_db
+        ):
+            return "silence"
+        return None
+
+    def update(self, block: np.ndarray) -> None:
+        """Measure one block of int16 samples."""
+        size = block.size
+        if not size:
+            return
+        if self._scratch.size < size:
+            self._scratch = np.empty(size, dtype=np.float32)
+
+        samples = self._scratch[:size]
+        np.copyto(samples, block.reshape(-1))
+
+        sumsq = float(np.dot(samples, samples))
+        np.abs(samples, out=samples)
+        peak = float(samples.max())
+
+        frames = len(block)
+        self.frames += frames
+        self.blocks += 1
+        if peak >= FULL_SCALE - 1:
+            self.clipped_blocks += 1
+
+        rms_db = to_dbfs(math.sqrt(sumsq / size))
+        if rms_db > self.loudest_rms_db:
+            self.loudest_rms_db = rms_db
+
+        self._interval_sumsq += sumsq
+        self._interval_frames += size
+        if peak > self._interval_peak:
+            self._interval_peak = peak
+
+        now = time.monotonic()
+        if now - self._last_publish >= self.publish_interval:
+            self._publish(now)
+
+    def _publish(self, now: float) -> None:
+        """Send the level of the current interval to listeners."""
+        rms = math.sqrt(self._interval_sumsq / self._interval_frames)
+        level = {
+            "rms_db": round(to_dbfs(rms), 1),
+            "peak_db": round(to_dbfs(self._interval_peak), 1),
+            "warning": self.warning,
+        }
+
+        self._interval_sumsq = 0.0
+        self._interval_frames = 0
+        self._interval_peak = 0.0
+        self._last_publish = now
+
+        for listener in self._listeners:
+            try:
+                listener(level)
+            except Exception as e:
+                print(f"Level listener error: {e}")
@@ -0,0 +1,303 @@
+"""
+Multi-stream capture module.
+Records several input devices at once (e.g. microphone plus loopback) and
+transcribes each one as a separate speaker channel.
+"""
+
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional
+
+from .meter import FULL_SCALE
+from .recorder import encode_wav
+from .transcriber import Transcriber
+
+try:
+    import sounddevice as sd
+except (ImportError, OSError):
+    sd = None
+
+
+@dataclass
+class Utterance:
+    """A stretch of speech from one channel, with times from the recording start."""
+
+    speaker: str
+    start: float
+    end: float
+    text: str
+
+
+class CaptureTrack:
+    """
+    One input device of a multi-stream recording.
+
+    The callback only appends to a list, which is atomic, so the audio
+    thread never waits on a lock shared with other streams.
+    """
+
+    def __init__(self, name: str, device: Optional[int], channels: int = 1):
+        self.name = name
+        self.device = device
+        self.channels = channels
+
+        self.blocks: list = []
+        # time.monotonic() of the first captured frame
+        self.first_time: Optional[float] = None
+        self.status_events = 0
+        self._sample_rate = 0
+
+    def open(self, sample_rate: int):
+        """Create (but do not start) the input stream."""
+        if sd is None:
+            raise RuntimeError("sounddevice/PortAudio is not installed")
+        self._sample_rate = sample_rate
+        self.blocks = []
+        self.first_time = None
+        self.status_events = 0
+        return sd.InputStream(
+            device=self.device,
+            samplerate=sample_rate,
+            channels=self.channels,
+            dtype=np.int16,
+            blocksize=1024,
+            callback=self._callback,
+        )
+
+    def _callback(self, indata: np.ndarray, frames: int, time_info, status) -> None:
+        if self.first_time is None:
+            # The block started `frames` samples before it was delivered
+            self.first_time = time.monotonic() - frames / self._sample_rate
+        if status:
+            self.status_events += 1
+        self.blocks.append(indata.copy())
+
+    def mono(self) -> np.ndarray:
+        """Captured audio as one int16 channel."""
+        if not self.blocks:
+            return np.zeros(0, dtype=np.int16)
+        audio = np.concatenate(self.blocks, axis=0)
+        if audio.ndim > 1 and audio.shape[1] > 1:
+            return audio.mean(axis=1).astype(np.int16)
+        return audio.reshape(-1)
+
+
+class MultiStreamRecorder:
+    """
+    Records several input devices in parallel, each in its own stream.
+
+    Streams are opened first and then started back to back; the remaining
+    start-up offset is measured from each stream's first callback and
+    removed when the tracks are aligned, so sample n of every track covers
+    the same moment.
+    """
+
+    def __init__(self, devices: list, sample_rate: int = 16000):
+        """
+        Initialize recorder.
+
+        Args:
+            devices: One dict per input: {"name": ..., "device": id or None,
+                "channels": 1}
+            sample_rate: Sample rate requested from every device
+        """
+        if not devices:
+            raise ValueError("MultiStreamRecorder needs at least one device")
+
+        self.sample_rate = sample_rate
+        self.tracks = [
+            CaptureTrack(
+                name=str(d.get("name") or f"speaker{i + 1}"),
+                device=d.get("device"),
+                channels=d.get("channels", 1),
+            )
+            for i, d in enumerate(devices)
+        ]
+
+        self._streams: list = []
+        self._lock = Lock()
+
+    @property
+    def is_recording(self) -> bool:
+        """Check if a recording is in progress."""
+        return bool(self._streams)
+
+    def start(self) -> bool:
+        """
+        Start all streams.
+
+        Returns:
+            False if a recording is already running or a device failed to open
+        """
+        with self._lock:
+            if self._streams:
+                return False
+
+            streams = []
+            try:
+                for track in self.tracks:
+                    streams.append(track.open(self.sample_rate))
+                for stream in streams:
+                    stream.start()
+            except Exception as e:
+                print(f"Multi-stream recording error: {e}")
+                for stream in streams:
+                    stream.close()
+                return False
+
+            self._streams = streams
+            return True
+
+    def stop(self) -> Optional[dict]:
+        """
+        Stop all streams.
+
+        Returns:
+            Aligned int16 audio per track name, all the same length, or None
+            if nothing was recording
+        """
+        with self._lock:
+            streams, self._streams = self._streams, []
+        if not streams:
+            return None
+
+        for stream in streams:
+            stream.stop()
+            stream.close()
+
+        return self._align()
+
+    def _align(self) -> dict:
+        """Pad every track so they share the earliest start and the same length."""
+        started = [t.first_time for t in self.tracks if t.first_time is not None]
+        origin = min(started) if started else 0.0
+
+        aligned = {}
+        for track in self.tracks:
+            audio = track.mono()
+            if track.first_time is not None:
+                offset = int(round((track.first_time - origin) * self.sample_rate))
+                audio = np.concatenate([np.zeros(offset, dtype=np.int16), audio])
+            aligned[track.name] = audio
+
+        length = max(len(a) for a in aligned.values())
+        return {
+            name: np.pad(audio, (0, length - len(audio)))
+            for name, audio in aligned.items()
+        }
+
+
+def split_utterances(
+    audio: np.ndarray,
+    sample_rate: int,
+    speech_db: float = -45.0,
+    min_silence: float = 0.6,
+    min_speech: float = 0.3,
+    max_length: float = 30.0,
+) -> list[tuple[int, int]]:
+    """
+    Find stretches of speech in a mono track by frame energy.
+
+    Args:
+        audio: int16 samples
+        sample_rate: Sample rate of the audio
+        speech_db: Frame RMS level (dBFS) above which a frame counts as speech
+        min_silence: Shorter pauses (seconds) don't split an utterance
+        min_speech: Shorter utterances (seconds) are dropped as noise
+        max_length: Longer utterances are split, to bound request size
+
+    Returns:
+        (start, end) sample indices of each utterance
+    """
+    frame = max(1, int(0.03 * sample_rate))
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return []
+
+    frames = audio[: n_frames * frame].astype(np.float32).reshape(n_frames, frame)
+    rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / frame)
+    threshold = FULL_SCALE * 10 ** (speech_db / 20)
+    speech = rms > threshold
+
+    # Rising and falling edges of the speech mask
+    edges = np.diff(np.concatenate([[False], speech, [False]]).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    gap_frames = int(min_silence / 0.03)
+    merged: list[list[int]] = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if merged and start - merged[-1][1] <= gap_frames:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    min_frames = int(min_speech / 0.03)
+    max_frames = max(1, int(max_length / 0.03))
+    # Keep a little context around the speech so words aren't clipped
+    pad = int(0.1 / 0.03)
+
+    utterances = []
+    for start, end in merged:
+        if end - start < min_frames:
+            continue
+        start, end = max(0, start - pad), min(n_frames, end + pad)
+        for piece in range(start, end, max_frames):
+            utterances.append((piece * frame, min(end, piece + max_frames) * frame))
+    return utterances
+
+
+def transcribe_tracks(
+    tracks: dict,
+    sample_rate: int,
+    transcriber: Transcriber,
+    max_workers: int = 4,
+    speech_db: float = -45.0,
+) -> list[Utterance]:
+    """
+    Transcribe each track's utterances in parallel and interleave them.
+
+    Args:
+        tracks: Aligned int16 audio per speaker name (MultiStreamRecorder.stop())
+        sample_rate: Sample rate of the tracks
+        transcriber: Anything with transcribe(wav_bytes)
+        max_workers: Requests in flight at once
+        speech_db: Speech threshold passed to split_utterances()
+
+    Returns:
+        Utterances with text, ordered by start time
+    """
+    jobs = [
+        (name, start, end)
+        for name, audio in tracks.items()
+        for start, end in split_utterances(audio, sample_rate, speech_db=speech_db)
+    ]
+    if not jobs:
+        return []
+
+    def run(job):
+        name, start, end = job
+        return transcriber.transcribe(encode_wav(tracks[name][start:end], sample_rate))
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="track") as executor:
+        texts = list(executor.map(run, jobs))
+
+    utterances = [
+        Utterance(name, start / sample_rate, end / sample_rate, text)
+        for (name, start, end), text in zip(jobs, texts)
+        if text
+    ]
+    utterances.sort(key=lambda u: u.start)
+    return utterances
+
+
+def format_utterances(utterances: list[Utterance]) -> str:
+    """Render utterances as "[mm:ss] speaker: text" lines."""
+    lines = []
+    for u in utterances:
+        minutes, seconds = divmod(int(u.start), 60)
+        lines.append(f"[{minutes:02d}:{seconds:02d}] {u.speaker}: {u.text}")
+    return "\n".join(lines)
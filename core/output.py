@@ -0,0 +1,261 @@
+"""
+Output sink module.
+Delivers the final text: pasted or typed into the active window, or
+written to stdout, a file or a socket for headless use.
+"""
+
+import socket
+import sys
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from threading import Lock, Timer
+from typing import Optional
+
+
+class OutputSink(ABC):
+    """Base class: receives each final transcription."""
+
+    @abstractmethod
+    def emit(self, text: str) -> None:
+        """Deliver text."""
+
+    def close(self) -> None:
+        """Release any resources."""
+
+
+class PasteSink(OutputSink):
+    """
+    Pastes through the clipboard into the active window.
+
+    Instead of a fixed delay, the clipboard is polled until it holds the
+    new text, so the paste fires as soon as it is safe. Optionally the
+    previous clipboard contents are put back once the paste has happened.
+    """
+
+    # Seconds between clipboard checks while waiting for it to update
+    POLL_INTERVAL = 0.01
+
+    def __init__(
+        self,
+        restore_clipboard: bool = False,
+        ready_timeout: float = 0.25,
+        restore_delay: float = 0.3,
+    ):
+        """
+        Initialize sink.
+
+        Args:
+            restore_clipboard: Put the previous clipboard contents back after pasting
+            ready_timeout: Longest wait for the clipboard to update
+            restore_delay: Seconds to wait before restoring, so the target
+                app has read the clipboard
+        """
+        self.restore_clipboard = restore_clipboard
+        self.ready_timeout = ready_timeout
+        self.restore_delay = restore_delay
+
+    def emit(self, text: str) -> None:
+        import keyboard
+        import pyperclip
+
+        previous = None
+        if self.restore_clipboard:
+            try:
+                previous = pyperclip.paste()
+            except pyperclip.PyperclipException:
+                previous = None
+
+        pyperclip.copy(text)
+
+        deadline = time.perf_counter() + self.ready_timeout
+        while pyperclip.paste() != text:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            time.sleep(min(self.POLL_INTERVAL, remaining))
+
+        keyboard.send("ctrl+v")
+
+        if previous is not None and previous != text:
+            Timer(self.restore_delay, self._restore, args=(previous, text)).start()
+
+    @staticmethod
+    def _restore(previous: str, pasted: str) -> None:
+        """Restore the clipboard unless the user copied something meanwhile."""
+        import pyperclip
+
+        if pyperclip.paste() == pasted:
+            pyperclip.copy(previous)
+
+
+class TypeSink(OutputSink):
+    """Types text into the active window without touching the clipboard."""
+
+    def __init__(self, chunk_size: int = 64, chunk_delay: float = 0.0):
+        """
+        Initialize sink.
+
+        Args:
+            chunk_size: Characters sent per keyboard.write call
+            chunk_delay: Pause between chunks, for apps that drop fast input
+        """
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_delay = chunk_delay
+
+    def emit(self, text: str) -> None:
+        import keyboard
+
+        for start in range(0, len(text), self.chunk_size):
+            keyboard.write(text[start:start + self.chunk_size], delay=0)
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+
+
+class StdoutSink(OutputSink):
+    """Prints each transcription on its own line."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def emit(self, text: str) -> None:
+        self.stream.write(text + "\n")
+        self.stream.flush()
+
+
+class FileSink(OutputSink):
+    """Appends each transcription as a line to a file."""
+
+    def __init__(self, path: Path):
+        if not str(path):
+            raise ValueError("The file output needs a path")
+        self.path = Path(path)
+        self._lock = Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def emit(self, text: str) -> None:
+        with self._lock:
+            self._file.write(text + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class SocketSink(OutputSink):
+    """Sends each transcription as a UTF-8 line over TCP, reconnecting as needed."""
+
+    def __init__(self, host: str, port: int, timeout: float = 2.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+        self._lock = Lock()
+        self._socket: Optional[socket.socket] = None
+
+    def emit(self, text: str) -> None:
+        data = (text + "\n").encode("utf-8")
+        with self._lock:
+            # One retry: the peer may have closed an idle connection
+            for attempt in range(2):
+                try:
+                    if self._socket is None:
+                        self._socket = socket.create_connection(
+                            (self.host, self.port), timeout=self.timeout
+                        )
+                        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    self._socket.sendall(data)
+                    return
+                except OSError as e:
+                    self._close_socket()
+                    if attempt:
+                        print(f"Output socket error: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_socket()
+
+    def _close_socket(self) -> None:
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+
+
+def create_sink(
+    kind: str = "paste",
+    restore_clipboard: bool = False,
+    chunk_size: int = 64,
+    path: str = "",
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> OutputSink:
+    """
+    Create an output sink by name.
+
+    Args:
+        kind: paste, type, stdout, file or socket
+        restore_clipboard: For paste: restore the previous clipboard
+        chunk_size: For type: characters per keyboard.write call
+        path: For file: output file
+        host: For socket: destination host
+        port: For socket: destination port
+    """
+    if kind == "paste":
+        return PasteSink(restore_clipboard=restore_clipboard)
+    if kind == "type":
+        return TypeSink(chunk_size=chunk_size)
+    if kind == "stdout":
+        return StdoutSink()
+    if kind == "file":
+        return FileSink(path)
+    if kind == "socket":
+        return SocketSink(host, port)
+    raise ValueError(f"Unknown output sink: {kind}")
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m core.output [--interactive]
+    # --interactive also measures paste and type, which send keystrokes
+    # to the focused window.
+    import os
+    import tempfile
+    import threading
+
+    text = "The quick brown fox jumps over the lazy dog. " * 4
+    runs = 200
+
+    def bench(name: str, sink: OutputSink, n: int = runs) -> None:
+        started = time.perf_counter()
+        for _ in range(n):
+            sink.emit(text)
+        elapsed = time.perf_counter() - started
+        sink.close()
+        print(f"{name:>7}: {elapsed / n * 1e3:.3f} ms per emit")
+
+    with open(os.devnull, "w") as devnull:
+        bench("stdout", StdoutSink(devnull))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench("file", FileSink(Path(tmp) / "out.txt"))
+
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    def drain() -> None:
+        conn, _ = server.accept()
+        while conn.recv(65536):
+            pass
+
+    threading.Thread(target=drain, daemon=True).start()
+    bench("socket", SocketSink("127.0.0.1", server.getsockname()[1]))
+
+    if "--interactive" in sys.argv:
+        print("Focus a scratch text field: typing starts in 3 seconds...")
+        time.sleep(3)
+        bench("paste", PasteSink(), n=10)
+        bench("type", TypeSink(), n=3)
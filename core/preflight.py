@@ -0,0 +1,135 @@
+"""
+Pre-flight audio analyzer.
+Rejects recordings that are too short or contain no speech before they
+are sent for transcription.
+"""
+
+import io
+import numpy as np
+from collections import Counter
+from dataclasses import dataclass
+from scipy.io import wavfile
+
+from .meter import FULL_SCALE
+
+
+def to_int16(audio: np.ndarray) -> np.ndarray:
+    """
+    Convert samples as returned by scipy's wavfile.read to int16.
+
+    Raises:
+        ValueError: For sample types a WAV file can't hold
+    """
+    if audio.dtype == np.int16:
+        return audio
+    if audio.dtype.kind == "f":
+        return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    if audio.dtype == np.int32:
+        # 24- and 32-bit PCM, left-aligned by scipy
+        return (audio >> 16).astype(np.int16)
+    if audio.dtype == np.uint8:
+        return ((audio.astype(np.int16) - 128) << 8).astype(np.int16)
+    raise ValueError(f"Unsupported sample type: {audio.dtype}")
+
+
+@dataclass
+class PreflightResult:
+    """Outcome of a pre-flight check."""
+
+    ok: bool
+    reason: str  # "passed", "too_short" or "no_speech"
+    duration: float
+    speech_ratio: float
+    peak_db: float
+
+
+class PreflightAnalyzer:
+    """Decides whether a recording is worth transcribing."""
+
+    # Frame length (seconds) for the energy analysis
+    FRAME_SECONDS = 0.03
+
+    def __init__(
+        self,
+        min_duration: float = 0.5,
+        speech_db: float = -45.0,
+        min_speech_ratio: float = 0.05,
+    ):
+        """
+        Initialize analyzer.
+
+        Args:
+            min_duration: Shortest recording (seconds) worth transcribing
+            speech_db: Frame RMS level (dBFS) above which a frame counts as speech
+            min_speech_ratio: Fraction of speech frames needed to pass
+        """
+        self.min_duration = min_duration
+        self.speech_db = speech_db
+        self.min_speech_ratio = min_speech_ratio
+
+        # Number of decisions per reason, for whole recordings and for the
+        # segments checked while streaming
+        self.stats: Counter = Counter()
+        self.segment_stats: Counter = Counter()
+
+    def analyze_wav(self, audio_data: bytes) -> PreflightResult:
+        """
+        Analyze WAV audio data of any PCM or float sample format.
+
+        Raises:
+            ValueError: If the WAV data can't be read
+        """
+        sample_rate, audio = wavfile.read(io.BytesIO(audio_data))
+        return self.analyze(to_int16(audio), sample_rate)
+
+    def analyze(
+        self, audio: np.ndarray, sample_rate: int, segment: bool = False
+    ) -> PreflightResult:
+        """
+        Analyze int16 samples in a single vectorized pass.
+
+        Args:
+            audio: Samples, shaped (frames,) or (frames, channels)
+            sample_rate: Sample rate of the audio
+            segment: A streaming segment rather than a whole recording;
+                counted in segment_stats instead of stats
+
+        Returns:
+            PreflightResult with the decision and the measured values
+        """
+        n_samples = len(audio)
+        duration = n_samples / sample_rate if sample_rate else 0.0
+
+        frame = max(1, int(self.FRAME_SECONDS * sample_rate))
+        n_frames = n_samples // frame
+
+        speech_ratio = 0.0
+        peak_db = -96.0
+        if n_frames:
+            # Squared amplitude once, then reduce per frame and overall
+            samples = audio[: n_frames * frame].astype(np.float32) / FULL_SCALE
+            power = np.square(samples).reshape(n_frames, -1)
+
+            frame_power = power.mean(axis=1)
+            threshold = 10.0 ** (self.speech_db / 10.0)
+            speech_ratio = float(np.count_nonzero(frame_power > threshold)) / n_frames
+
+            peak = float(power.max())
+            if peak > 0:
+                peak_db = round(10.0 * float(np.log10(peak)), 1)
+
+        if duration < self.min_duration:
+            reason = "too_short"
+        elif speech_ratio < self.min_speech_ratio:
+            reason = "no_speech"
+        else:
+            reason = "passed"
+
+        (self.segment_stats if segment else self.stats)[reason] += 1
+        return PreflightResult(
+            ok=reason == "passed",
+            reason=reason,
+            duration=duration,
+            speech_ratio=speech_ratio,
+            peak_db=peak_db,
+        )
@@ -6,18 +6,26 @@ Cleans and corrects transcribed text.
 import re
 from typing import Optional
 
+from .vocabulary import VocabularyIndex
+
 
 class TextProcessor:
     """Processes and cleans transcribed text."""
 
-    def __init__(self, corrections: Optional[list] = None):
+    def __init__(
+        self,
+        corrections: Optional[list] = None,
+        vocabulary: Optional[list] = None,
+    ):
         """
         Initialize processor.
 
         Args:
             corrections: List of [pattern, replacement] pairs
+            vocabulary: Known terms; near-miss words are snapped to them
         """
         self.corrections = corrections or []
+        self.vocabulary = VocabularyIndex(vocabulary) if vocabulary else None
 
     def process(self, text: str) -> str:
         """
@@ -38,6 +46,10 @@ class TextProcessor:
         for pattern, replacement in self.corrections:
             result = result.replace(pattern, replacement)
 
+        # Fix misheard names and jargon
+        if self.vocabulary:
+            result = self.vocabulary.correct(result)
+
         # Clean up extra whitespace
         result = re.sub(r"\s+", " ", result)
         result = result.strip()
@@ -0,0 +1,323 @@
+"""
+Profiling module.
+Opt-in per-job profiling of the dictation pipeline: stage timings, CPU
+profiles as folded stacks (for flamegraph.pl, speedscope or inferno) or
+cProfile stats, and tracemalloc snapshots of the recording buffers.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from itertools import count
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Callable, Optional
+
+# Numbers jobs uniquely within the process, across profiler rebuilds
+_job_ids = count(1)
+
+
+def _frame_label(code) -> str:
+    """Name a code object like "function (file.py:12)"; no ";" (folded separator)."""
+    name = getattr(code, "co_qualname", code.co_name)
+    label = f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return label.replace(";", ":")
+
+
+class ProfileJob:
+    """
+    Profile of one recording, from the start of capture to the output.
+
+    Stages are timed on the thread that runs them. In "sampling" mode a
+    background thread samples the stacks of every thread that took part in
+    the job (stages, recording loop, audio callback) and counts them as
+    folded stacks, rooted at the thread and stage they were taken in. In
+    "cprofile" mode each stage runs under cProfile instead; audio callbacks
+    are only timed, since cProfile can't follow the audio thread.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        output_dir: Path,
+        mode: str = "sampling",
+        interval: float = 0.005,
+        trace_memory: bool = True,
+        keep_jobs: int = 50,
+    ):
+        """
+        Initialize job. Sampling and memory tracing start immediately.
+
+        Args:
+            job_id: Name of the job's output folder
+            output_dir: Folder the job's folder is created in
+            mode: "sampling" or "cprofile"
+            interval: Seconds between stack samples
+            trace_memory: Take tracemalloc snapshots
+            keep_jobs: Older job folders in output_dir are deleted beyond this many
+        """
+        self.job_id = job_id
+        self.output_dir = Path(output_dir)
+        self.mode = mode
+        self.interval = interval
+        self.trace_memory = trace_memory
+        self.keep_jobs = keep_jobs
+
+        self.started = time.perf_counter()
+        self.timings: dict[str, float] = {}
+        self.callback_stats = {"calls": 0, "seconds": 0.0, "max_seconds": 0.0}
+
+        self._lock = Lock()
+        # Thread ident -> label, for the threads that belong to this job
+        self._threads: dict[int, str] = {}
+        # Thread ident -> stage it is running
+        self._stages: dict[int, str] = {}
+        self._stacks: dict[str, int] = {}
+        self._samples = 0
+        self._profile_stats: Optional[pstats.Stats] = None
+        self._snapshots: list[tuple[str, tracemalloc.Snapshot]] = []
+        self._owns_tracemalloc = False
+        self._finished = False
+
+        if trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self._owns_tracemalloc = True
+            self.snapshot("start")
+
+        self._stop_event = Event()
+        self._sampler: Optional[Thread] = None
+        if mode == "sampling":
+            self._sampler = Thread(target=self._sample_loop, name="profiler", daemon=True)
+            self._sampler.start()
+
+    def track_thread(self, label: str) -> None:
+        """Include the calling thread in the samples under this label."""
+        with self._lock:
+            self._threads[threading.get_ident()] = label
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time (and in cprofile mode, profile) the block as a pipeline stage."""
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads.setdefault(ident, threading.current_thread().name)
+            self._stages[ident] = name
+
+        profile = cProfile.Profile() if self.mode == "cprofile" else None
+        if profile is not None:
+            try:
+                profile.enable()
+            except ValueError as e:
+                # Python 3.12+: another profiler is already active
+                print(f"Profiler error: {e}")
+                profile = None
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if profile is not None:
+                profile.disable()
+            with self._lock:
+                self._stages.pop(ident, None)
+                self.timings[name] = self.timings.get(name, 0.0) + elapsed
+                if profile is not None:
+                    if self._profile_stats is None:
+                        self._profile_stats = pstats.Stats(profile)
+                    else:
+                        self._profile_stats.add(profile)
+
+    def add_timing(self, name: str, seconds: float) -> None:
+        """Record a stage that wasn't run inside stage(), e.g. the recording itself."""
+        with self._lock:
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def wrap_callback(self, callback: Callable, label: str = "audio callback") -> Callable:
+        """Wrap an audio callback to time it and sample its thread."""
+        stats = self.callback_stats
+        tracked = []
+
+        def wrapped(*args):
+            if not tracked:
+                self.track_thread(label)
+                tracked.append(True)
+            started = time.perf_counter()
+            try:
+                return callback(*args)
+            finally:
+                # Only the audio thread writes these
+                elapsed = time.perf_counter() - started
+                stats["calls"] += 1
+                stats["seconds"] += elapsed
+                if elapsed > stats["max_seconds"]:
+                    stats["max_seconds"] = elapsed
+
+        return wrapped
+
+    def snapshot(self, label: str) -> None:
+        """Take a tracemalloc snapshot (no-op without memory tracing)."""
+        if self.trace_memory and tracemalloc.is_tracing():
+            self._snapshots.append((label, tracemalloc.take_snapshot()))
+
+    def finish(self) -> Optional[Path]:
+        """
+        Stop profiling, write the job's files and prune old jobs.
+
+        Returns:
+            The job folder, or None if it was already finished or failed
+        """
+        if self._finished:
+            return None
+        self._finished = True
+
+        self._stop_event.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.snapshot("end")
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+        self.timings["total"] = time.perf_counter() - self.started
+
+        try:
+            job_dir = self.output_dir / self.job_id
+            job_dir.mkdir(parents=True, exist_ok=True)
+            self._write(job_dir)
+        except OSError as e:
+            print(f"Profile write error: {e}")
+            return None
+        print(f"Profile written to {job_dir}")
+        self._prune()
+        return job_dir
+
+    def _write(self, job_dir: Path) -> None:
+        """Write stages.json, stacks.folded / profile.pstats and memory.txt."""
+        summary = {
+            "job": self.job_id,
+            "mode": self.mode,
+            "stages": {k: round(v, 6) for k, v in self.timings.items()},
+            "audio_callback": self.callback_stats,
+            "samples": self._samples,
+            "interval": self.interval,
+        }
+        (job_dir / "stages.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+        if self._stacks:
+            lines = [f"{stack} {n}" for stack, n in sorted(self._stacks.items())]
+            (job_dir / "stacks.folded").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        if self._profile_stats is not None:
+            self._profile_stats.dump_stats(str(job_dir / "profile.pstats"))
+
+        if len(self._snapshots) > 1:
+            (job_dir / "memory.txt").write_text(self._memory_report(), encoding="utf-8")
+
+    def _prune(self) -> None:
+        """Delete the oldest job folders beyond keep_jobs."""
+        try:
+            jobs = sorted(
+                (p for p in self.output_dir.iterdir() if p.is_dir()),
+                key=lambda p: p.stat().st_mtime,
+            )
+        except OSError:
+            return
+        for old in jobs[: max(0, len(jobs) - self.keep_jobs)]:
+            shutil.rmtree(old, ignore_errors=True)
+
+    def _memory_report(self) -> str:
+        """Allocation growth from the start of the job to each later snapshot."""
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+        base = self._snapshots[0][1].filter_traces(filters)
+        lines = []
+        for label, snapshot in self._snapshots[1:]:
+            diff = snapshot.filter_traces(filters).compare_to(base, "lineno")
+            growth = sum(d.size_diff for d in diff)
+            lines.append(f"== {label}: {growth / 1024:+.1f} KiB since start ==")
+            lines.extend(str(d) for d in diff[:20])
+            lines.append("")
+        return "\n".join(lines)
+
+    def _sample_loop(self) -> None:
+        """Sample the stacks of the job's threads until finish()."""
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                threads = dict(self._threads)
+                stages = dict(self._stages)
+            for ident, frame in frames.items():
+                if ident == own or ident not in threads:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                root = [threads[ident]]
+                if ident in stages:
+                    root.append(f"[{stages[ident]}]")
+                key = ";".join(root + stack[::-1])
+                self._stacks[key] = self._stacks.get(key, 0) + 1
+            self._samples += 1
+
+
+class Profiler:
+    """
+    Creates a ProfileJob per recording with the configured settings.
+
+    Disabled profiling costs nothing: callers hold None instead of a job,
+    and profile_stage(None, ...) is a no-op context.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        mode: str = "sampling",
+        interval: float = 0.005,
+        trace_memory: bool = True,
+        keep_jobs: int = 50,
+    ):
+        """
+        Initialize profiler.
+
+        Args:
+            output_dir: Folder for the job folders
+            mode: "sampling" (folded stacks) or "cprofile" (pstats)
+            interval: Seconds between stack samples
+            trace_memory: Take tracemalloc snapshots (slows allocation-heavy code)
+            keep_jobs: Older job folders are deleted beyond this many
+        """
+        if mode not in ("sampling", "cprofile"):
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.output_dir = Path(output_dir)
+        self.mode = mode
+        self.interval = interval
+        self.trace_memory = trace_memory
+        self.keep_jobs = keep_jobs
+
+    def start_job(self, name: str = "recording") -> ProfileJob:
+        """Begin profiling a job."""
+        job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_job_ids)}-{name}"
+        return ProfileJob(
+            job_id,
+            self.output_dir,
+            mode=self.mode,
+            interval=self.interval,
+            trace_memory=self.trace_memory,
+            keep_jobs=self.keep_jobs,
+        )
+
+
+def profile_stage(job: Optional[ProfileJob], name: str):
+    """job.stage(name), or a no-op context when not profiling."""
+    return job.stage(name) if job is not None else nullcontext()
@@ -0,0 +1,223 @@
+"""
+Racing transcriber.
+Sends the same audio to several engines at once and keeps the first result.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from threading import Event, Lock
+from typing import Optional
+
+from .result import TranscriptionResult
+
+
+@dataclass
+class EngineStats:
+    """Usage statistics of one engine in a race."""
+
+    attempts: int = 0
+    wins: int = 0
+    failures: int = 0
+    total_latency: float = 0.0
+    completed: int = 0
+
+    @property
+    def mean_latency(self) -> Optional[float]:
+        """Mean latency in seconds of the requests that finished."""
+        return self.total_latency / self.completed if self.completed else None
+
+
+class RacingTranscriber:
+    """
+    Transcribes with several engines in parallel; the first valid text wins.
+
+    Engines only need the Transcriber interface: a `language` attribute,
+    set_language() and transcribe(audio_data, cancel_event=None), plus
+    transcribe_verbose() for timed results. Losers are
+    told to stop through their cancel event; engines that cannot abort a
+    request in flight finish in the background and only update the stats.
+    """
+
+    def __init__(self, engines: dict, max_concurrency: int = 1):
+        """
+        Initialize racer.
+
+        Args:
+            engines: Engines by name, e.g. {"groq": ..., "local": ...}
+            max_concurrency: Races callers may run at the same time, like
+                streaming segments in flight
+        """
+        if not engines:
+            raise ValueError("RacingTranscriber needs at least one engine")
+
+        self.engines = engines
+        self.max_concurrency = max(1, max_concurrency)
+        self.stats = {name: EngineStats() for name in engines}
+
+        self._stats_lock = Lock()
+        self._executor = self._new_executor()
+        # Races in progress, and whether close() was called
+        self._active = 0
+        self._closed = False
+
+    @property
+    def language(self) -> str:
+        """Current transcription language."""
+        return next(iter(self.engines.values())).language
+
+    def set_language(self, language: str) -> None:
+        """Change transcription language on every engine."""
+        for engine in self.engines.values():
+            engine.set_language(language)
+
+    def transcribe(
+        self, audio_data: bytes, cancel_event: Optional[Event] = None
+    ) -> Optional[str]:
+        """
+        Transcribe audio bytes with all engines and return the first result.
+
+        Args:
+            audio_data: WAV audio data as bytes
+            cancel_event: If set, the whole race is abandoned
+
+        Returns:
+            Transcribed text or None if every engine failed
+        """
+        return self._race(audio_data, cancel_event, "transcribe")
+
+    def transcribe_verbose(
+        self,
+        audio_data: bytes,
+        cancel_event: Optional[Event] = None,
+        word_timestamps: bool = False,
+        language: Optional[str] = None,
+    ) -> Optional[TranscriptionResult]:
+        """
+        Race the engines' transcribe_verbose() and return the first result.
+
+        Args:
+            audio_data: WAV audio data as bytes
+            cancel_event: If set, the whole race is abandoned
+            word_timestamps: Also request per-word times
+            language: Language of this call only; the current one if None
+
+        Returns:
+            TranscriptionResult or None if every engine failed
+        """
+        return self._race(
+            audio_data,
+            cancel_event,
+            "transcribe_verbose",
+            word_timestamps=word_timestamps,
+            language=language,
+        )
+
+    def detect_language(
+        self, audio_data: bytes, cancel_event: Optional[Event] = None
+    ) -> Optional[tuple]:
+        """Race the engines' detect_language() and return the first answer."""
+        return self._race(audio_data, cancel_event, "detect_language")
+
+    def _race(self, audio_data: bytes, cancel_event: Optional[Event], method: str, **kwargs):
+        """Call `method` on every engine and return the first non-empty result."""
+        if not audio_data:
+            return None
+
+        with self._stats_lock:
+            if self._closed and not self._active:
+                self._executor = self._new_executor()
+            self._active += 1
+            executor = self._executor
+
+        race_cancel = Event()
+        futures = {
+            executor.submit(
+                self._run, name, engine, method, audio_data, race_cancel, kwargs
+            ): name
+            for name, engine in self.engines.items()
+        }
+
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+
+                for future in done:
+                    result = future.result()
+                    if result:
+                        with self._stats_lock:
+                            self.stats[futures[future]].wins += 1
+                        return result
+            return None
+        finally:
+            # Tell the losers to stop
+            race_cancel.set()
+            for future in pending:
+                future.cancel()
+            with self._stats_lock:
+                self._active -= 1
+                if self._closed and not self._active:
+                    # Losers still running finish; their threads exit after
+                    self._executor.shutdown(wait=False)
+
+    def close(self) -> None:
+        """
+        Shut down the worker threads once the races in progress end.
+
+        A caller that still holds the racer, like a streaming session
+        started before a config reload, can keep using it: each later race
+        gets its own threads, released when it ends.
+        """
+        with self._stats_lock:
+            self._closed = True
+            if not self._active:
+                self._executor.shutdown(wait=False)
+
+    def _new_executor(self) -> ThreadPoolExecutor:
+        # Room for every concurrent race plus the losers each one leaves
+        # running, so a loser that can't be aborted never delays a later race
+        return ThreadPoolExecutor(
+            max_workers=2 * len(self.engines) * self.max_concurrency,
+            thread_name_prefix="race",
+        )
+
+    def snapshot(self) -> dict:
+        """Per-engine wins, attempts and latency, for display or metrics."""
+        with self._stats_lock:
+            return {
+                name: {
+                    "attempts": s.attempts,
+                    "wins": s.wins,
+                    "failures": s.failures,
+                    "win_rate": s.wins / s.attempts if s.attempts else 0.0,
+                    "mean_latency": s.mean_latency,
+                }
+                for name, s in self.stats.items()
+            }
+
+    def _run(
+        self, name: str, engine, method: str, audio_data: bytes, cancel_event: Event, kwargs: dict
+    ):
+        """Run one engine and record its latency."""
+        with self._stats_lock:
+            self.stats[name].attempts += 1
+
+        started = time.perf_counter()
+        try:
+            result = getattr(engine, method)(audio_data, cancel_event=cancel_event, **kwargs)
+        except Exception as e:
+            print(f"Engine {name} error: {e}")
+            result = None
+        latency = time.perf_counter() - started
+
+        with self._stats_lock:
+            stats = self.stats[name]
+            if result:
+                stats.completed += 1
+                stats.total_latency += latency
+            elif not cancel_event.is_set():
+                stats.failures += 1
+        return result
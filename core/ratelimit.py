@@ -0,0 +1,234 @@
+"""
+Client-side rate limiting.
+Keeps requests inside the API quota by queueing them, and records usage
+across restarts.
+"""
+
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Condition, Event
+from typing import Optional
+
+
+@dataclass
+class TokenBucket:
+    """
+    A quota of `capacity` units per `period` seconds.
+
+    The bucket refills continuously, so the full rate is available as a
+    steady flow and up to `capacity` can be used in a burst.
+    """
+
+    name: str
+    unit: str  # "requests" or "audio_seconds"
+    capacity: float
+    period: float
+    tokens: float = -1.0
+    updated: float = 0.0
+
+    def __post_init__(self):
+        if self.tokens < 0:
+            self.tokens = self.capacity
+
+    def refill(self, now: float) -> None:
+        """Add the tokens earned since the last update (wall-clock time)."""
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.capacity / self.period)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (after refill())."""
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing * self.period / self.capacity)
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter over requests and audio seconds.
+
+    acquire() blocks until every bucket can cover the request, then takes
+    from all of them at once, so waiting for one limit never holds tokens
+    of another. Callers queue instead of failing, and the API sees the
+    highest rate the quota can sustain.
+
+    Bucket levels and usage totals are saved to a JSON file, so a restart
+    does not forget what was already spent. Levels are stored with
+    wall-clock timestamps and keep refilling while the app is closed.
+    """
+
+    # Seconds between saves of the usage file
+    SAVE_INTERVAL = 5.0
+
+    def __init__(
+        self,
+        requests_per_minute: float = 20,
+        requests_per_day: float = 2000,
+        audio_seconds_per_hour: float = 7200,
+        audio_seconds_per_day: float = 28800,
+        min_billed_seconds: float = 10.0,
+        usage_path: Optional[Path] = None,
+    ):
+        """
+        Initialize limiter. A limit of 0 disables that bucket.
+
+        Args:
+            requests_per_minute: Request limit per minute
+            requests_per_day: Request limit per day
+            audio_seconds_per_hour: Audio limit per hour
+            audio_seconds_per_day: Audio limit per day
+            min_billed_seconds: Shortest audio length the API bills for
+            usage_path: JSON file for usage counters (not saved without it)
+        """
+        limits = [
+            ("requests_per_minute", "requests", requests_per_minute, 60),
+            ("requests_per_day", "requests", requests_per_day, 86400),
+            ("audio_seconds_per_hour", "audio_seconds", audio_seconds_per_hour, 3600),
+            ("audio_seconds_per_day", "audio_seconds", audio_seconds_per_day, 86400),
+        ]
+        now = time.time()
+        self.buckets = [
+            TokenBucket(name, unit, capacity, period, updated=now)
+            for name, unit, capacity, period in limits
+            if capacity > 0
+        ]
+        self.min_billed_seconds = min_billed_seconds
+        self.usage_path = Path(usage_path) if usage_path else None
+
+        self.usage = {
+            "requests": 0,
+            "audio_seconds": 0.0,
+            "throttled": 0,
+            "throttled_seconds": 0.0,
+            "rate_limited": 0,
+        }
+
+        self._condition = Condition()
+        self._last_save = 0.0
+        self._load()
+
+    def acquire(self, audio_seconds: float, cancel_event: Optional[Event] = None) -> bool:
+        """
+        Wait until the quota allows one request with this much audio, and take it.
+
+        Args:
+            audio_seconds: Length of the audio to send
+            cancel_event: If set while waiting, gives up
+
+        Returns:
+            True once the tokens are taken, False if cancelled
+        """
+        cost = {"requests": 1.0, "audio_seconds": max(audio_seconds, self.min_billed_seconds)}
+        started = time.monotonic()
+        waited = False
+
+        with self._condition:
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    return False
+
+                now = time.time()
+                wait = 0.0
+                for bucket in self.buckets:
+                    bucket.refill(now)
+                    wait = max(wait, bucket.wait_time(cost[bucket.unit]))
+                if wait <= 0:
+                    break
+
+                waited = True
+                # Wake up regularly to notice cancellation
+                self._condition.wait(min(wait, 0.5))
+
+            for bucket in self.buckets:
+                bucket.tokens -= min(cost[bucket.unit], bucket.capacity)
+
+            self.usage["requests"] += 1
+            self.usage["audio_seconds"] += cost["audio_seconds"]
+            if waited:
+                self.usage["throttled"] += 1
+                self.usage["throttled_seconds"] += time.monotonic() - started
+
+        self._save_soon()
+        return True
+
+    def penalize(self, retry_after: float) -> None:
+        """
+        React to a rate-limit error from the API: empty the request buckets
+        so nothing is sent for about retry_after seconds.
+        """
+        with self._condition:
+            now = time.time()
+            self.usage["rate_limited"] += 1
+            for bucket in self.buckets:
+                if bucket.unit == "requests":
+                    bucket.refill(now)
+                    # Negative tokens: this many seconds of refill before the next request
+                    bucket.tokens = min(
+                        bucket.tokens, 1 - retry_after * bucket.capacity / bucket.period
+                    )
+        self._save_soon()
+
+    def snapshot(self) -> dict:
+        """Usage totals and remaining quota per bucket."""
+        with self._condition:
+            now = time.time()
+            remaining = {}
+            for bucket in self.buckets:
+                bucket.refill(now)
+                remaining[bucket.name] = max(0.0, round(bucket.tokens, 1))
+            return {**self.usage, "remaining": remaining}
+
+    def save(self) -> None:
+        """Write bucket levels and usage to the usage file."""
+        if not self.usage_path:
+            return
+        with self._condition:
+            state = {
+                "usage": dict(self.usage),
+                "buckets": {
+                    b.name: {"tokens": b.tokens, "updated": b.updated} for b in self.buckets
+                },
+            }
+            self._last_save = time.monotonic()
+
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.usage_path.parent, prefix=".usage-", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_path, self.usage_path)
+        except OSError as e:
+            print(f"Usage save error: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _save_soon(self) -> None:
+        """Save if the last save is older than SAVE_INTERVAL."""
+        if time.monotonic() - self._last_save >= self.SAVE_INTERVAL:
+            self.save()
+
+    def _load(self) -> None:
+        """Restore bucket levels and usage saved by a previous run."""
+        if not self.usage_path or not self.usage_path.exists():
+            return
+        try:
+            state = json.loads(self.usage_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"Usage load error: {e}")
+            return
+
+        for key, value in (state.get("usage") or {}).items():
+            if key in self.usage:
+                self.usage[key] = value
+
+        saved = state.get("buckets") or {}
+        for bucket in self.buckets:
+            if bucket.name in saved:
+                bucket.tokens = min(bucket.capacity, float(saved[bucket.name]["tokens"]))
+                bucket.updated = float(saved[bucket.name]["updated"])
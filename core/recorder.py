@@ -4,36 +4,186 @@ Captures audio from microphone using sounddevice.
 """
 
 import io
+import time
+import wave
 import numpy as np
-import sounddevice as sd
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from enum import Enum
 from scipy.io import wavfile
-from typing import Optional
-from threading import Thread, Event
+from typing import Callable, Optional
+from threading import Thread, Event, Lock, current_thread
+
+from .meter import LevelMeter
+
+try:
+    import sounddevice as sd
+except (ImportError, OSError):
+    # No PortAudio (e.g. headless CI): only replayed input is available
+    sd = None
+
+
+def encode_wav(audio: np.ndarray, sample_rate: int) -> bytes:
+    """Encode an int16 sample array as WAV bytes."""
+    buffer = io.BytesIO()
+    wavfile.write(buffer, sample_rate, audio)
+    buffer.seek(0)
+    return buffer.read()
+
+
+def wav_duration(audio_data: bytes) -> float:
+    """
+    Duration in seconds of WAV audio data, read from its header.
+
+    Raises:
+        wave.Error: If the data is not a readable WAV file (e.g. mp3)
+    """
+    try:
+        with wave.open(io.BytesIO(audio_data)) as wav:
+            return wav.getnframes() / wav.getframerate()
+    except wave.Error:
+        if audio_data[:4] != b"RIFF" or audio_data[8:12] != b"WAVE":
+            raise
+    # Not integer PCM (e.g. 32-bit float), which the wave module can't open
+    try:
+        sample_rate, audio = wavfile.read(io.BytesIO(audio_data))
+    except ValueError as e:
+        raise wave.Error(str(e)) from e
+    return len(audio) / sample_rate
+
+
+class RecorderState(str, Enum):
+    """Lifecycle states of the recorder."""
+
+    IDLE = "idle"
+    ARMING = "arming"
+    RECORDING = "recording"
+    STOPPING = "stopping"
+
+
+@dataclass
+class XrunEvent:
+    """An overflow or underflow reported by PortAudio."""
+
+    time: float  # time.time() when the callback saw it
+    kind: str  # e.g. "input_overflow"
+    blocksize: int
+
+
+@dataclass
+class _StreamOpening:
+    """Outcome of opening the input stream, for one start() call."""
+
+    done: Event = field(default_factory=Event)
+    error: Optional[str] = None
 
 
 class AudioRecorder:
-    """Records audio from the microphone."""
+    """
+    Records audio from the microphone.
+
+    State changes go through a lock-protected state machine so the hotkey
+    thread, the UI thread and the audio callback always agree on whether a
+    recording is in progress:
+
+        idle -> arming -> recording -> stopping -> idle
+
+    A stop requested while arming moves straight to stopping, and the
+    pending start is then abandoned.
+
+    Over- and underflows (xruns) are counted and timestamped. A recording
+    with xruns makes the next one use bigger blocks and a higher latency;
+    after a run of clean recordings the recorder steps back down.
+    """
+
+    # PortAudio status flags that mean audio was lost or padded
+    XRUN_FLAGS = ("input_overflow", "input_underflow")
+    # Largest block size used after repeated xruns
+    MAX_BLOCKSIZE = 8192
+    # Xruns in one recording that make the next use bigger blocks
+    XRUN_THRESHOLD = 2
+    # Clean recordings before a smaller block size is tried again
+    CLEAN_RECORDINGS_TO_SHRINK = 5
+    # Seconds start() waits for the input stream to open
+    OPEN_TIMEOUT = 5.0
 
     def __init__(
         self,
         sample_rate: int = 16000,
         channels: int = 1,
         device_id: Optional[int] = None,
+        blocksize: int = 1024,
+        latency: str = "low",
+        stream_factory: Optional[Callable] = None,
+        preprocessor=None,
     ):
+        """
+        Initialize recorder.
+
+        Args:
+            sample_rate: Sample rate in Hz
+            channels: Number of input channels
+            device_id: Input device, None for the system default
+            blocksize: Frames per audio callback
+            latency: PortAudio latency setting ("low" or "high")
+            stream_factory: Creates the input stream, with the keyword
+                arguments of sounddevice.InputStream; defaults to it. Pass a
+                core.replay.ReplaySource to record from a WAV file instead.
+            preprocessor: Optional core.dsp.AudioPreprocessor applied to the
+                audio before it is encoded
+        """
         self.sample_rate = sample_rate
         self.channels = channels
         self.device_id = device_id
+        self.stream_factory = stream_factory
+        # Swappable between recordings; each recording keeps the one it started with
+        self.preprocessor = preprocessor
+
+        self.meter = LevelMeter(sample_rate=sample_rate)
+
+        # Configured values, and the ones currently in use after adapting
+        self.base_blocksize = blocksize
+        self.base_latency = latency
+        self.blocksize = blocksize
+        self.latency = latency
+
+        self.xruns: deque[XrunEvent] = deque(maxlen=200)
+        self.xrun_counts: Counter = Counter()
+        self._xrun_listeners: list[Callable[[XrunEvent], None]] = []
+        # Filled by the audio callback, drained by the record loop
+        self._status_queue: deque = deque()
+        self._clean_recordings = 0
+        # core.profiling.ProfileJob for the next recording; set before start()
+        self.profile_job = None
 
-        self._recording = False
+        self._state = RecorderState.IDLE
+        self._state_lock = Lock()
+        self._pending_settings: Optional[dict] = None
         self._audio_data: list = []
+        # Pre-processed blocks and how many raw blocks they cover
+        self._processed: list = []
+        self._processed_upto = 0
+        # The pre-processor of the current recording; fixed for its duration
+        # so readers always see a single source of blocks
+        self._preprocessing = None
+        self._preprocessing_failed = False
+        # Callbacks that reported over/underflow (read by metrics)
+        self.status_events = 0
         self._stop_event = Event()
         self._thread: Optional[Thread] = None
+        # Why the last recording's stream could not be opened
+        self.open_error: Optional[str] = None
 
     def check_microphone(self) -> tuple[bool, str]:
         """
         Check if microphone is available by actually trying to open a stream.
         Returns: (is_available, error_message)
         """
+        if self.stream_factory is not None:
+            return True, ""
+        if sd is None:
+            return False, "Audio input unavailable: sounddevice/PortAudio is not installed."
+
         try:
             # Force refresh of audio devices
             sd._terminate()
@@ -58,85 +208,417 @@ class AudioRecorder:
         except Exception as e:
             return False, f"Error: {e}"
 
+    @property
+    def state(self) -> RecorderState:
+        """Current recorder state."""
+        return self._state
+
     @property
     def is_recording(self) -> bool:
-        """Check if currently recording."""
-        return self._recording
+        """Check if a recording is starting or in progress."""
+        return self._state in (RecorderState.ARMING, RecorderState.RECORDING)
 
-    def start(self) -> None:
-        """Start recording audio."""
-        if self._recording:
-            return
+    def add_xrun_listener(self, listener: Callable[[XrunEvent], None]) -> None:
+        """Call listener(event) for each xrun (from the recording thread)."""
+        self._xrun_listeners.append(listener)
 
-        self._recording = True
-        self._audio_data = []
-        self._stop_event.clear()
+    def capture_stats(self) -> dict:
+        """Xrun counts and the block settings in use."""
+        return {
+            "xruns": dict(self.xrun_counts),
+            "last_xrun": self.xruns[-1].time if self.xruns else None,
+            "blocksize": self.blocksize,
+            "latency": self.latency,
+        }
 
-        self._thread = Thread(target=self._record_loop, daemon=True)
-        self._thread.start()
+    def configure(
+        self,
+        sample_rate: int,
+        channels: int,
+        device_id: Optional[int],
+        blocksize: Optional[int] = None,
+        latency: Optional[str] = None,
+    ) -> None:
+        """
+        Change the audio settings.
 
-    def stop(self) -> bytes:
-        """Stop recording and return WAV audio data as bytes."""
-        if not self._recording:
-            return b""
+        Applied immediately when idle; during a recording they are kept
+        until it ends, so the recording in progress is not interrupted.
+        """
+        settings = {
+            "sample_rate": sample_rate,
+            "channels": channels,
+            "device_id": device_id,
+            "blocksize": blocksize or self.base_blocksize,
+            "latency": latency or self.base_latency,
+        }
+        with self._state_lock:
+            self._pending_settings = settings
+            if self._state is RecorderState.IDLE:
+                self._apply_pending_settings()
+
+    def try_arm(self) -> bool:
+        """
+        Atomically claim the recorder for a new recording.
+
+        Moves idle -> arming so that slow preparation (like checking the
+        microphone) can run without another thread starting or stopping a
+        recording in between. Follow up with start() or cancel_arm().
+
+        Returns:
+            True if this caller now owns the arming recorder
+        """
+        with self._state_lock:
+            if self._state is not RecorderState.IDLE:
+                return False
+            self._state = RecorderState.ARMING
+            return True
+
+    def cancel_arm(self) -> None:
+        """Abandon an armed recording that was never started."""
+        with self._state_lock:
+            if self._thread is None and self._state in (
+                RecorderState.ARMING, RecorderState.STOPPING
+            ):
+                self._set_idle()
+
+    def start(self) -> bool:
+        """
+        Start recording audio.
+
+        Arms the recorder first if it is idle. Returns False if a recording
+        is already running, if a stop arrived while the recorder was armed,
+        or if the input stream could not be opened (see open_error).
+        """
+        with self._state_lock:
+            if self._state is RecorderState.IDLE:
+                self._state = RecorderState.ARMING
+            elif self._state is RecorderState.STOPPING and self._thread is None:
+                # Stopped while arming: nothing was captured, back to idle
+                self._set_idle()
+                return False
+            elif self._state is not RecorderState.ARMING or self._thread is not None:
+                return False
+
+            self._audio_data = []
+            self._processed = []
+            self._processed_upto = 0
+            self._preprocessing = self.preprocessor
+            self._preprocessing_failed = False
+            self.meter.reset()
+            self._stop_event.clear()
+            self.open_error = None
+            # Each start waits on its own outcome, not on a later start's
+            opening = _StreamOpening()
+            self._thread = Thread(target=self._record_loop, args=(opening,), daemon=True)
+            # Started under the lock so a concurrent stop() never joins it unstarted
+            self._thread.start()
+
+        # A slow device is left opening; a failed one has reset to idle
+        opening.done.wait(self.OPEN_TIMEOUT)
+        return opening.error is None
+
+    def stop(self) -> Optional[bytes]:
+        """
+        Stop recording and return WAV audio data as bytes.
+
+        Returns None if there was no recording to stop (already idle, or
+        another thread is stopping it).
+        """
+        with self._state_lock:
+            if self._state not in (RecorderState.ARMING, RecorderState.RECORDING):
+                return None
+            self._state = RecorderState.STOPPING
+            thread = self._thread
+
+        if thread is None:
+            # Stopped during arming; the pending start() resets to idle
+            return None
 
-        self._recording = False
         self._stop_event.set()
+        thread.join(timeout=2.0)
+        audio_data = self._get_wav_bytes()
 
-        if self._thread:
-            self._thread.join(timeout=2.0)
+        with self._state_lock:
+            if self._thread is not thread:
+                # The stream failed to open: the loop already reset to idle,
+                # and start() reported the failure
+                return None
             self._thread = None
+            self._set_idle()
 
-        return self._get_wav_bytes()
+        return audio_data
 
     def toggle(self) -> tuple[bool, Optional[bytes]]:
         """
         Toggle recording state.
         Returns: (is_now_recording, audio_data_if_stopped)
         """
-        if self._recording:
-            audio_data = self.stop()
-            return False, audio_data
-        else:
-            self.start()
-            return True, None
+        if self.try_arm():
+            return self.start(), None
+        return False, self.stop()
+
+    def _set_idle(self) -> None:
+        """Return to idle and apply deferred settings. Caller holds the lock."""
+        self._state = RecorderState.IDLE
+        self._apply_pending_settings()
+
+    def _apply_pending_settings(self) -> None:
+        """Apply settings saved by configure(). Caller holds the lock."""
+        if self._pending_settings is None:
+            return
+        self.sample_rate = self._pending_settings["sample_rate"]
+        self.channels = self._pending_settings["channels"]
+        self.device_id = self._pending_settings["device_id"]
+        self.meter.sample_rate = self.sample_rate
+        # New settings start over without adaptation
+        self.base_blocksize = self.blocksize = self._pending_settings["blocksize"]
+        self.base_latency = self.latency = self._pending_settings["latency"]
+        self._clean_recordings = 0
+        self._pending_settings = None
+
+    def read_chunks(self, start: int = 0) -> tuple[list, int]:
+        """
+        Read audio blocks captured so far, without stopping the recording.
+
+        Args:
+            start: Index of the first block to return
+
+        Returns:
+            (blocks since start, index to pass on the next call)
+        """
+        # Slicing the list is atomic, so this is safe against the callback
+        # and the record loop; with pre-processing these are processed blocks
+        blocks = self._processed if self._preprocessing else self._audio_data
+        chunks = blocks[start:]
+        return chunks, start + len(chunks)
 
-    def _record_loop(self) -> None:
-        """Main recording loop."""
+    def _record_loop(self, opening: _StreamOpening) -> None:
+        """Main recording loop; reports the stream opening through `opening`."""
+        blocksize, latency = self.blocksize, self.latency
+        xruns = 0
+        callback = self._audio_callback
+        job = self.profile_job
+        if job is not None:
+            job.track_thread("record loop")
+            callback = job.wrap_callback(callback)
+        preprocessor = self._preprocessing
+        if preprocessor:
+            preprocessor.reset(self.sample_rate)
+        opened = False
         try:
-            with sd.InputStream(
+            stream_factory = self.stream_factory or sd.InputStream
+            with stream_factory(
                 device=self.device_id,
                 samplerate=self.sample_rate,
                 channels=self.channels,
                 dtype=np.int16,
-                blocksize=1024,
-                callback=self._audio_callback,
+                blocksize=blocksize,
+                latency=latency,
+                callback=callback,
             ):
+                with self._state_lock:
+                    if self._state is RecorderState.ARMING:
+                        self._state = RecorderState.RECORDING
+                opened = True
+                opening.done.set()
                 while not self._stop_event.is_set():
                     self._stop_event.wait(0.1)
+                    xruns += self._drain_status(blocksize)
+                    self._preprocess()
         except Exception as e:
             print(f"Recording error: {e}")
-            self._recording = False
+            if not opened:
+                # Nothing was captured: release the recorder and wake start()
+                opening.error = str(e) or type(e).__name__
+                with self._state_lock:
+                    if self._thread is current_thread():
+                        self.open_error = opening.error
+                        self._thread = None
+                        self._set_idle()
+                opening.done.set()
+                return
+            # Otherwise leave the state alone: stop() still joins and returns
+            # what was captured before the failure
+
+        xruns += self._drain_status(blocksize)
+        self._preprocess(final=True)
+        self._adapt_blocksize(xruns)
+
+    def _preprocess(self, final: bool = False) -> None:
+        """
+        Run the pre-processor over blocks captured since the last call.
+
+        This runs on the record loop, not in the audio callback, so stop()
+        only has to process the last tenth of a second.
+        """
+        preprocessor = self._preprocessing
+        if not preprocessor:
+            return
+        end = len(self._audio_data)
+        if not self._preprocessing_failed:
+            try:
+                for block in self._audio_data[self._processed_upto:end]:
+                    out = preprocessor.process(block)
+                    if len(out):
+                        self._processed.append(out)
+                    self._processed_upto += 1
+                if final:
+                    tail = preprocessor.flush()
+                    if len(tail):
+                        self._processed.append(tail)
+            except Exception as e:
+                print(f"Audio processing error: {e}")
+                self._preprocessing_failed = True
+
+        if self._preprocessing_failed:
+            # Keep the rest of the recording raw, in the same list, so a
+            # streaming reader's index stays valid
+            self._processed.extend(self._audio_data[self._processed_upto:end])
+            self._processed_upto = end
+
+    def _drain_status(self, blocksize: int) -> int:
+        """Turn statuses queued by the callback into xrun events. Returns their number."""
+        count = 0
+        while self._status_queue:
+            when, status = self._status_queue.popleft()
+            kinds = [flag for flag in self.XRUN_FLAGS if getattr(status, flag, False)]
+            for kind in kinds:
+                event = XrunEvent(when, kind, blocksize)
+                self.xruns.append(event)
+                self.xrun_counts[kind] += 1
+                count += 1
+                for listener in self._xrun_listeners:
+                    listener(event)
+        return count
+
+    def _adapt_blocksize(self, xruns: int) -> None:
+        """Pick block size and latency for the next recording from this one's xruns."""
+        with self._state_lock:
+            if xruns >= self.XRUN_THRESHOLD:
+                self._clean_recordings = 0
+                if self.blocksize >= self.MAX_BLOCKSIZE and self.latency == "high":
+                    return
+                self.blocksize = min(self.MAX_BLOCKSIZE, self.blocksize * 2)
+                self.latency = "high"
+            elif xruns == 0 and self.blocksize > self.base_blocksize:
+                self._clean_recordings += 1
+                if self._clean_recordings < self.CLEAN_RECORDINGS_TO_SHRINK:
+                    return
+                self._clean_recordings = 0
+                self.blocksize = max(self.base_blocksize, self.blocksize // 2)
+                if self.blocksize == self.base_blocksize:
+                    self.latency = self.base_latency
+            else:
+                return
+            blocksize, latency = self.blocksize, self.latency
+        print(f"Audio: next recording uses blocksize {blocksize}, latency {latency}")
 
     def _audio_callback(
         self, indata: np.ndarray, frames: int, time_info, status
     ) -> None:
         """Callback for audio stream."""
-        if status:
-            print(f"Audio status: {status}")
-        if self._recording:
+        if status and (status.input_overflow or status.input_underflow):
+            # No printing here: slow work in the callback causes more xruns.
+            # Other flags (e.g. priming_output) are not lost audio.
+            self.status_events += 1
+            self._status_queue.append((time.time(), status))
+        # Lock-free read: a single attribute load is atomic
+        if self._state is RecorderState.RECORDING:
             self._audio_data.append(indata.copy())
+            self.meter.update(indata)
 
     def _get_wav_bytes(self) -> bytes:
         """Convert recorded audio to WAV bytes."""
-        if not self._audio_data:
+        blocks = self._processed if self._preprocessing else self._audio_data
+        if not blocks:
             return b""
 
         # Concatenate all audio chunks
-        audio = np.concatenate(self._audio_data, axis=0)
+        audio = np.concatenate(blocks, axis=0)
+
+        return encode_wav(audio, self.sample_rate)
+
+
+if __name__ == "__main__":
+    # Stress test: python -m core.recorder [--threads N] [--toggles N] [--fail-every N]
+    # Threads hammer toggle() on a replayed input whose every n-th open fails,
+    # checking that the state machine never wedges or loses a recording.
+    import argparse
+    import random
+
+    from .replay import ReplaySource
+
+    parser = argparse.ArgumentParser(prog="python -m core.recorder")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--toggles", type=int, default=100, help="per thread")
+    parser.add_argument("--fail-every", type=int, default=5, help="0 = opens never fail")
+    options = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Unpaced, so each recording captures frames however soon it is stopped
+    replay = ReplaySource(
+        encode_wav((rng.standard_normal(16000) * 3000).astype(np.int16), 16000), speed=0
+    )
+    opens = Counter()
+    open_lock = Lock()
+
+    def flaky_factory(**kwargs):
+        with open_lock:
+            opens["total"] += 1
+            if options.fail_every and opens["total"] % options.fail_every == 0:
+                opens["failed"] += 1
+                raise OSError("simulated device error")
+        return replay(**kwargs)
+
+    recorder = AudioRecorder(sample_rate=16000, blocksize=256, stream_factory=flaky_factory)
+    replay.ready = lambda: recorder.state is RecorderState.RECORDING
+    results = Counter()
+    errors = []
+    valid = set(RecorderState)
+
+    def hammer(seed: int) -> None:
+        r = random.Random(seed)
+        for _ in range(options.toggles):
+            try:
+                started, audio = recorder.toggle()
+            except Exception as e:
+                errors.append(repr(e))
+                continue
+            results["started" if started else "stopped" if audio is not None else "no-op"] += 1
+            if audio:
+                results["audio"] += 1
+            if recorder.state not in valid:
+                errors.append(f"invalid state {recorder.state!r}")
+            # Long enough apart that most recordings capture some frames
+            time.sleep(r.uniform(0.005, 0.04))
+
+    started_at = time.perf_counter()
+    workers = [Thread(target=hammer, args=(i,)) for i in range(options.threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started_at
+
+    # Finish a recording left running by the last toggle
+    if recorder.is_recording:
+        recorder.stop()
 
-        # Write to WAV bytes
-        buffer = io.BytesIO()
-        wavfile.write(buffer, self.sample_rate, audio)
-        buffer.seek(0)
-        return buffer.read()
+    options.fail_every = 0
+    checks = {
+        "no exceptions": not errors,
+        "ends idle": recorder.state is RecorderState.IDLE,
+        "no record thread left": recorder._thread is None,
+        "stops <= starts": results["stopped"] <= results["started"],
+        "starts <= successful opens": results["started"] <= opens["total"] - opens["failed"],
+        "recordings captured audio": results["audio"] > 0,
+        "can start again": recorder.start() and recorder.stop() is not None,
+    }
+    print(f"{options.threads} threads x {options.toggles} toggles in {elapsed:.2f} s: "
+          f"{dict(results)}, opens {dict(opens)}")
+    for name, ok in checks.items():
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}")
+    for error in errors[:10]:
+        print(f"  {error}")
+    raise SystemExit(0 if all(checks.values()) else 1)
@@ -0,0 +1,351 @@
+"""
+Audio replay module.
+A virtual input that plays WAV files through the recorder's normal
+callback path, for headless benchmarks and regression tests.
+"""
+
+import io
+import time
+import numpy as np
+from pathlib import Path
+from scipy.io import wavfile
+from threading import Event, Thread
+from types import SimpleNamespace
+from typing import Callable, Optional, Union
+
+
+class ReplayStatus:
+    """Stand-in for sounddevice.CallbackFlags; truthy when a flag is set."""
+
+    def __init__(self, input_overflow: bool = False):
+        self.input_overflow = input_overflow
+        self.input_underflow = False
+
+    def __bool__(self) -> bool:
+        return self.input_overflow or self.input_underflow
+
+    def __str__(self) -> str:
+        return "input overflow" if self.input_overflow else ""
+
+
+class ReplayInputStream:
+    """
+    Drop-in for sounddevice.InputStream that reads from an array.
+
+    A thread calls the callback with blocks of `blocksize` frames, paced to
+    real time divided by `speed` (0 means as fast as possible). Until
+    `ready()` is true, and after the audio runs out, it delivers silence
+    like an idle microphone (nothing at all when unpaced).
+    """
+
+    def __init__(
+        self,
+        audio: np.ndarray,
+        samplerate: int,
+        channels: int = 1,
+        blocksize: int = 1024,
+        callback=None,
+        speed: float = 1.0,
+        xrun_every: int = 0,
+        finished: Optional[Event] = None,
+        ready: Optional[Callable[[], bool]] = None,
+        **_ignored,
+    ):
+        """
+        Initialize stream.
+
+        Args:
+            audio: int16 samples, shaped (frames, channels)
+            samplerate: Rate the blocks are paced at
+            channels: Channels delivered to the callback
+            blocksize: Frames per callback (0 picks 1024)
+            callback: Called as callback(indata, frames, time_info, status)
+            speed: Playback speed; 0 means no pacing
+            xrun_every: If set, every n-th block reports an input overflow
+            finished: Set once all of `audio` has been delivered
+            ready: Playback of `audio` waits until this returns True
+        """
+        self.audio = audio
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize or 1024
+        self.callback = callback
+        self.speed = speed
+        self.xrun_every = xrun_every
+        self.finished = finished or Event()
+        self.ready = ready
+
+        self._stop_event = Event()
+        self._thread: Optional[Thread] = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        self.close()
+
+    def start(self) -> None:
+        if self._thread is None and self.callback is not None:
+            self._stop_event.clear()
+            self._thread = Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self) -> None:
+        pass
+
+    def _run(self) -> None:
+        frames = self.blocksize
+        silence = np.zeros((frames, self.channels), dtype=np.int16)
+        started = time.perf_counter()
+        position = 0
+        index = 0
+
+        while not self._stop_event.is_set():
+            idle = (self.ready is not None and not self.ready()) or position >= len(self.audio)
+            if idle and self.speed <= 0:
+                # Unpaced replay has no timeline to fill with silence
+                self._stop_event.wait(0.001)
+                continue
+
+            block = silence if idle else self.audio[position:position + frames]
+            if not idle:
+                position += len(block)
+                if len(block) < frames:
+                    block = np.concatenate([block, silence[: frames - len(block)]])
+
+            index += 1
+            status = ReplayStatus(
+                input_overflow=bool(self.xrun_every) and index % self.xrun_every == 0
+            )
+            now = time.perf_counter() - started
+            time_info = SimpleNamespace(inputBufferAdcTime=now, currentTime=now)
+            self.callback(block, frames, time_info, status)
+            if position >= len(self.audio):
+                self.finished.set()
+
+            if self.speed > 0:
+                due = started + index * frames / self.samplerate / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    self._stop_event.wait(delay)
+
+
+class ReplaySource:
+    """
+    Stream factory for AudioRecorder(stream_factory=...) that replays a WAV file.
+
+    Each recording starts the file from the beginning. The file is converted
+    once to the sample rate and channel count the recorder asks for.
+    """
+
+    def __init__(
+        self,
+        source: Union[str, Path, bytes],
+        speed: float = 1.0,
+        xrun_every: int = 0,
+    ):
+        """
+        Initialize source.
+
+        Args:
+            source: WAV file path, or WAV data as bytes
+            speed: Playback speed; 0 means as fast as possible
+            xrun_every: If set, every n-th block reports an input overflow
+        """
+        if isinstance(source, bytes):
+            self.sample_rate, audio = wavfile.read(io.BytesIO(source))
+        else:
+            self.sample_rate, audio = wavfile.read(str(source))
+        if audio.dtype != np.int16:
+            raise ValueError("Replay needs 16-bit PCM WAV")
+        self.audio = audio.reshape(len(audio), -1)
+        self.speed = speed
+        self.xrun_every = xrun_every
+        # Set when the current recording has played the whole file
+        self.finished = Event()
+        # Optional gate, e.g. "the recorder is capturing", before the file starts
+        self.ready: Optional[Callable[[], bool]] = None
+
+        self._converted: dict[tuple, np.ndarray] = {}
+
+    @property
+    def duration(self) -> float:
+        """Length of the file in seconds."""
+        return len(self.audio) / self.sample_rate
+
+    def __call__(self, samplerate: int, channels: int = 1, blocksize: int = 1024,
+                 callback=None, **kwargs) -> ReplayInputStream:
+        """Create a stream, with the keyword arguments of sounddevice.InputStream."""
+        self.finished.clear()
+        return ReplayInputStream(
+            self._convert(int(samplerate), channels),
+            samplerate=int(samplerate),
+            channels=channels,
+            blocksize=blocksize,
+            callback=callback,
+            speed=self.speed,
+            xrun_every=self.xrun_every,
+            finished=self.finished,
+            ready=self.ready,
+        )
+
+    def _convert(self, sample_rate: int, channels: int) -> np.ndarray:
+        """The file's audio at the requested rate and channel count (cached)."""
+        key = (sample_rate, channels)
+        if key not in self._converted:
+            audio = self.audio
+            if sample_rate != self.sample_rate:
+                from scipy.signal import resample_poly
+                audio = resample_poly(audio.astype(np.float32), sample_rate, self.sample_rate)
+                audio = np.clip(audio, -32768, 32767).astype(np.int16)
+            if audio.shape[1] != channels:
+                mono = audio.mean(axis=1, keepdims=True).astype(np.int16)
+                audio = np.repeat(mono, channels, axis=1)
+            self._converted[key] = np.ascontiguousarray(audio)
+        return self._converted[key]
+
+
+class StubTranscriber:
+    """
+    Offline stand-in for Transcriber with a fixed, configurable latency.
+
+    Returns a predictable text derived from the audio length, so a replayed
+    pipeline can be checked end to end without network access.
+    """
+
+    def __init__(self, latency: float = 0.0, text: Optional[str] = None, language: str = "en"):
+        self.latency = latency
+        self.text = text
+        self.language = language
+        self.calls = 0
+
+    def set_language(self, language: str) -> None:
+        self.language = language
+
+    def transcribe(self, audio_data: bytes, cancel_event: Optional[Event] = None) -> Optional[str]:
+        from .recorder import wav_duration
+
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        return self.text or f"Stub transcription of {wav_duration(audio_data):.2f} seconds."
+
+
+def run_pipeline(
+    source: ReplaySource,
+    transcriber=None,
+    sample_rate: int = 16000,
+    preflight=None,
+    processor=None,
+    output=None,
+) -> dict:
+    """
+    Record one replayed file and run it through the dictation pipeline.
+
+    Stages mirror the app: capture, pre-flight check, transcription, text
+    processing and output.
+
+    Args:
+        source: Replayed input
+        transcriber: Defaults to StubTranscriber()
+        sample_rate: Recording sample rate
+        preflight: Optional PreflightAnalyzer
+        processor: Optional TextProcessor
+        output: Optional OutputSink
+
+    Returns:
+        Final text (or None) and seconds spent per stage
+    """
+    from .recorder import AudioRecorder, RecorderState, wav_duration
+
+    transcriber = transcriber or StubTranscriber()
+    recorder = AudioRecorder(sample_rate=sample_rate, stream_factory=source)
+    # Blocks delivered before the recorder leaves ARMING would be dropped
+    source.ready = lambda: recorder.state is RecorderState.RECORDING
+    timings = {}
+
+    started = time.perf_counter()
+    if not recorder.start():
+        return {"text": None, "timings": timings, "error": recorder.open_error}
+    # Bounded, in case the recording stops early
+    playback = source.duration / source.speed if source.speed > 0 else source.duration
+    source.finished.wait(playback + 10.0)
+    audio_data = recorder.stop()
+    timings["capture"] = time.perf_counter() - started
+    result = {"text": None, "timings": timings, "xruns": dict(recorder.xrun_counts)}
+    if not audio_data:
+        return result
+    result["duration"] = wav_duration(audio_data)
+
+    stage = time.perf_counter()
+    if preflight:
+        check = preflight.analyze_wav(audio_data)
+        timings["preflight"] = time.perf_counter() - stage
+        if not check.ok:
+            result["rejected"] = check.reason
+            return result
+
+    stage = time.perf_counter()
+    text = transcriber.transcribe(audio_data)
+    timings["transcribe"] = time.perf_counter() - stage
+
+    if text and processor:
+        stage = time.perf_counter()
+        text = processor.process(text)
+        timings["process"] = time.perf_counter() - stage
+
+    if text and output:
+        stage = time.perf_counter()
+        output.emit(text)
+        timings["output"] = time.perf_counter() - stage
+
+    # Like the app's end-to-end latency: from the end of the audio to output
+    timings["after_stop"] = time.perf_counter() - started - timings["capture"]
+    result["text"] = text
+    return result
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m core.replay [file.wav] [--speed N] [--runs N]
+    # Without a file, five seconds of synthetic speech-like noise are used.
+    import argparse
+
+    from .preflight import PreflightAnalyzer
+    from .processor import TextProcessor
+    from .recorder import encode_wav
+
+    parser = argparse.ArgumentParser(prog="python -m core.replay")
+    parser.add_argument("file", nargs="?", help="16-bit PCM WAV file")
+    parser.add_argument("--speed", type=float, default=0.0, help="1 = real time, 0 = unpaced")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="stub transcriber latency")
+    options = parser.parse_args()
+
+    if options.file:
+        replay = ReplaySource(options.file, speed=options.speed)
+    else:
+        rng = np.random.default_rng(0)
+        t = np.arange(5 * 16000) / 16000
+        envelope = (np.sin(2 * np.pi * 3 * t) > 0).astype(np.float32)
+        synthetic = (rng.standard_normal(len(t)) * 3000 * envelope).astype(np.int16)
+        replay = ReplaySource(encode_wav(synthetic, 16000), speed=options.speed)
+
+    for run in range(options.runs):
+        outcome = run_pipeline(
+            replay,
+            transcriber=StubTranscriber(latency=options.latency),
+            preflight=PreflightAnalyzer(),
+            processor=TextProcessor(corrections=[]),
+        )
+        stages = "  ".join(f"{k} {v * 1e3:.1f}ms" for k, v in outcome["timings"].items())
+        print(f"run {run + 1}: {stages}  -> {outcome['text']!r}")
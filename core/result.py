@@ -0,0 +1,88 @@
+"""
+Transcription result types.
+Keep the timing and confidence information returned by the engines.
+"""
+
+import math
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+
+@dataclass
+class Word:
+    """A single word with its time span in seconds."""
+
+    word: str
+    start: float
+    end: float
+    probability: Optional[float] = None
+
+
+@dataclass
+class Segment:
+    """A decoded segment with its time span in seconds."""
+
+    start: float
+    end: float
+    text: str
+    # Mean token probability (exp of Whisper's avg_logprob)
+    confidence: Optional[float] = None
+    no_speech_prob: Optional[float] = None
+    words: list[Word] = field(default_factory=list)
+
+
+@dataclass
+class TranscriptionResult:
+    """Full transcription of one piece of audio."""
+
+    text: str
+    language: Optional[str] = None
+    duration: Optional[float] = None
+    segments: list[Segment] = field(default_factory=list)
+
+    @property
+    def words(self) -> list[Word]:
+        """All words of all segments, in order."""
+        return [word for segment in self.segments for word in segment.words]
+
+    @property
+    def confidence(self) -> Optional[float]:
+        """Duration-weighted mean confidence of the segments."""
+        scored = [s for s in self.segments if s.confidence is not None]
+        if not scored:
+            return None
+        weights = [max(s.end - s.start, 1e-3) for s in scored]
+        return sum(s.confidence * w for s, w in zip(scored, weights)) / sum(weights)
+
+    def shifted(self, offset: float) -> "TranscriptionResult":
+        """Copy with every time moved by offset seconds (for stitching segments)."""
+        return TranscriptionResult(
+            text=self.text,
+            language=self.language,
+            duration=self.duration,
+            segments=[
+                Segment(
+                    start=s.start + offset,
+                    end=s.end + offset,
+                    text=s.text,
+                    confidence=s.confidence,
+                    no_speech_prob=s.no_speech_prob,
+                    words=[
+                        Word(w.word, w.start + offset, w.end + offset, w.probability)
+                        for w in s.words
+                    ],
+                )
+                for s in self.segments
+            ],
+        )
+
+    def to_dict(self) -> dict:
+        """JSON-serializable form."""
+        return asdict(self)
+
+
+def logprob_to_confidence(avg_logprob: Optional[float]) -> Optional[float]:
+    """Convert Whisper's mean token log-probability to a 0..1 confidence."""
+    if avg_logprob is None:
+        return None
+    return min(1.0, math.exp(avg_logprob))
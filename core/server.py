@@ -0,0 +1,265 @@
+"""
+Local API server.
+Lets editors, scripts and other processes use the running app's engines
+over HTTP on localhost, with results streamed back as JSON lines.
+"""
+
+import json
+import queue
+import secrets
+from urllib.parse import parse_qs, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Iterator, Optional
+
+
+class ApiServer:
+    """
+    Small HTTP server in front of the app's pipeline.
+
+    Every response is newline-delimited JSON (one event object per line),
+    sent with chunked encoding so long-running requests stream their
+    progress. The handler object does the actual work and must provide:
+
+        api_status() -> dict
+        api_metrics() -> str                     (Prometheus text format)
+        api_transcribe(audio_data: bytes, verbose: bool, words: bool) -> Iterator[dict]
+        api_start_recording() -> Optional[str]   (error message or None)
+        api_stop_recording() -> Optional[str]    (error message or None)
+
+    Every request needs the bearer token, a Host header naming this machine
+    and, from a browser, a same-origin Origin header, so web pages can't
+    reach the server through DNS rebinding or cross-site requests.
+
+    Endpoints:
+        GET  /status            current state
+        GET  /metrics           counters and histograms for a Prometheus scraper
+        GET  /events            live events (status, partial, transcription, error)
+        POST /transcribe        body is an audio file; streams the result
+                                (?verbose=1 adds timed segments, ?words=1 word times)
+        POST /recording/start   start capturing from the microphone
+        POST /recording/stop    stop and stream the result of that recording
+    """
+
+    # Events that end the stream of POST /recording/stop
+    FINAL_EVENTS = ("transcription", "error")
+    # Events queued per /events client before the oldest are dropped
+    SUBSCRIBER_QUEUE_SIZE = 256
+    # Largest accepted upload (bytes)
+    MAX_UPLOAD = 100 * 1024 * 1024
+    # Idle seconds before a ping is sent, so closed clients are noticed
+    KEEPALIVE_SECONDS = 15.0
+    # Host names always accepted in the Host and Origin headers
+    LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+    def __init__(self, handler, host: str = "127.0.0.1", port: int = 8765, token: str = ""):
+        """
+        Initialize server. Call start() to begin serving.
+
+        Args:
+            handler: Object implementing the api_* methods
+            host: Interface to bind; keep it on localhost
+            port: TCP port (0 picks a free one)
+            token: Requests need "Authorization: Bearer <token>"; if empty,
+                a random token is generated (read it from the token attribute)
+        """
+        self.handler = handler
+        self.token = token or secrets.token_urlsafe(24)
+        self.allowed_hosts = set(self.LOCAL_HOSTS)
+        if host not in ("", "0.0.0.0", "::"):
+            self.allowed_hosts.add(host)
+
+        self._subscribers: list[queue.Queue] = []
+        self._subscribers_lock = Lock()
+        self._thread: Optional[Thread] = None
+
+        self._httpd = ThreadingHTTPServer((host, port), self._make_request_handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def address(self) -> tuple:
+        """Bound (host, port)."""
+        return self._httpd.server_address[:2]
+
+    def start(self) -> None:
+        """Serve requests in a background thread."""
+        if self._thread is None:
+            self._thread = Thread(target=self._httpd.serve_forever, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and end all event streams."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread = None
+        self._httpd.server_close()
+        with self._subscribers_lock:
+            for subscriber in self._subscribers:
+                self._offer(subscriber, None)
+
+    def publish(self, event: str, **data) -> None:
+        """Send an event to every connected /events client and pending stop."""
+        message = {"event": event, **data}
+        with self._subscribers_lock:
+            for subscriber in self._subscribers:
+                self._offer(subscriber, message)
+
+    def _subscribe(self) -> queue.Queue:
+        subscriber = queue.Queue(maxsize=self.SUBSCRIBER_QUEUE_SIZE)
+        with self._subscribers_lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def _unsubscribe(self, subscriber: queue.Queue) -> None:
+        with self._subscribers_lock:
+            self._subscribers.remove(subscriber)
+
+    @staticmethod
+    def _offer(subscriber: queue.Queue, message: Optional[dict]) -> None:
+        """Queue a message, dropping the oldest one for a client that lags behind."""
+        while True:
+            try:
+                subscriber.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    subscriber.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _events(self, subscriber: queue.Queue, until_final: bool) -> Iterator[dict]:
+        """Yield published events; None from stop() ends the stream."""
+        while True:
+            try:
+                message = subscriber.get(timeout=self.KEEPALIVE_SECONDS)
+            except queue.Empty:
+                yield {"event": "ping"}
+                continue
+            if message is None:
+                return
+            yield message
+            if until_final and message["event"] in self.FINAL_EVENTS:
+                return
+
+    def _allowed_host(self, value: Optional[str]) -> bool:
+        """Whether a Host header, or the authority of an Origin, names this server."""
+        if not value:
+            return False
+        host = urlsplit(f"//{value}").hostname
+        return host is not None and host in self.allowed_hosts
+
+    def _make_request_handler(self):
+        server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if not self._authorized():
+                    return
+                path = urlsplit(self.path).path
+                if path == "/status":
+                    self._stream([server.handler.api_status()])
+                elif path == "/metrics":
+                    self._text(server.handler.api_metrics(), "text/plain; version=0.0.4")
+                elif path == "/events":
+                    subscriber = server._subscribe()
+                    try:
+                        self._stream(server._events(subscriber, until_final=False))
+                    finally:
+                        server._unsubscribe(subscriber)
+                else:
+                    self._error(404, "Not found")
+
+            def do_POST(self):
+                if not self._authorized():
+                    return
+                url = urlsplit(self.path)
+                path = url.path
+                if path == "/transcribe":
+                    length = int(self.headers.get("Content-Length") or 0)
+                    if not 0 < length <= server.MAX_UPLOAD:
+                        self._error(400, "Send the audio file as the request body")
+                        return
+                    audio_data = self.rfile.read(length)
+                    query = parse_qs(url.query)
+                    self._stream(server.handler.api_transcribe(
+                        audio_data,
+                        verbose=self._flag(query, "verbose"),
+                        words=self._flag(query, "words"),
+                    ))
+                elif path == "/recording/start":
+                    error = server.handler.api_start_recording()
+                    if error:
+                        self._error(409, error)
+                    else:
+                        self._stream([{"event": "started"}])
+                elif path == "/recording/stop":
+                    # Subscribe first so the result can't be published before we listen
+                    subscriber = server._subscribe()
+                    try:
+                        error = server.handler.api_stop_recording()
+                        if error:
+                            self._error(409, error)
+                        else:
+                            self._stream(server._events(subscriber, until_final=True))
+                    finally:
+                        server._unsubscribe(subscriber)
+                else:
+                    self._error(404, "Not found")
+
+            @staticmethod
+            def _flag(query: dict, name: str) -> bool:
+                return query.get(name, ["0"])[-1].lower() in ("1", "true", "yes")
+
+            def _authorized(self) -> bool:
+                if not server._allowed_host(self.headers.get("Host")):
+                    self._error(403, "Host not allowed")
+                    return False
+                origin = self.headers.get("Origin")
+                if origin is not None and not server._allowed_host(urlsplit(origin).netloc):
+                    self._error(403, "Cross-origin requests are not allowed")
+                    return False
+                expected = f"Bearer {server.token}"
+                given = self.headers.get("Authorization", "")
+                if not secrets.compare_digest(given.encode("utf-8"), expected.encode("utf-8")):
+                    self._error(401, "Missing or wrong token")
+                    return False
+                return True
+
+            def _error(self, code: int, message: str) -> None:
+                body = (json.dumps({"event": "error", "message": message}) + "\n").encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _text(self, text: str, content_type: str) -> None:
+                body = text.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, events) -> None:
+                """Write events as JSON lines, one chunk each."""
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                try:
+                    for event in events:
+                        line = (json.dumps(event) + "\n").encode("utf-8")
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                        self.wfile.flush()
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass  # Keep the console for the app's own messages
+
+        return RequestHandler
@@ -0,0 +1,236 @@
+"""
+Streaming transcription module.
+Transcribes a recording segment by segment while it is still in progress.
+"""
+
+import time
+import numpy as np
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+from threading import Thread, Event, Lock
+
+from .adaptive import SegmentTuner
+from .preflight import PreflightAnalyzer
+from .recorder import AudioRecorder, encode_wav
+from .transcriber import Transcriber
+
+
+def find_quiet_cut(
+    audio: np.ndarray,
+    sample_rate: int,
+    segment_frames: int,
+    search_seconds: float = 0.5,
+    frame_seconds: float = 0.02,
+) -> int:
+    """
+    Pick the quietest point shortly before segment_frames, to avoid splitting words.
+
+    Args:
+        audio: int16 samples, at least segment_frames long
+        sample_rate: Sample rate of the audio
+        segment_frames: Target segment length in samples
+        search_seconds: How far back from the target to look
+        frame_seconds: Frame length used to measure energy
+
+    Returns:
+        Sample index to cut at
+    """
+    frame = max(1, int(frame_seconds * sample_rate))
+    search = min(int(search_seconds * sample_rate), segment_frames // 2)
+
+    start = segment_frames - search
+    window = audio[start:segment_frames].astype(np.float32)
+    n_frames = len(window) // frame
+    if n_frames == 0:
+        return segment_frames
+
+    # Energy per frame, summed over channels
+    frames = window[: n_frames * frame].reshape(n_frames, -1)
+    energy = np.einsum("ij,ij->i", frames, frames)
+    # On ties prefer the latest frame so segments stay close to full length
+    quietest = n_frames - 1 - int(np.argmin(energy[::-1]))
+    return start + (quietest + 1) * frame
+
+
+class StreamingSession:
+    """Transcribes the audio of one recording in segments as it arrives."""
+
+    # Window (seconds) searched for a quiet cut point at the end of a segment
+    CUT_SEARCH_SECONDS = 0.5
+    # Frame length (seconds) used to measure energy when looking for a cut
+    CUT_FRAME_SECONDS = 0.02
+
+    def __init__(
+        self,
+        recorder: AudioRecorder,
+        transcriber: Transcriber,
+        segment_seconds: float = 4.0,
+        on_partial: Optional[Callable[[str], None]] = None,
+        preflight: Optional[PreflightAnalyzer] = None,
+        tuner: Optional[SegmentTuner] = None,
+    ):
+        """
+        Initialize session.
+
+        Args:
+            recorder: Recorder whose current recording is transcribed
+            transcriber: Transcriber used for each segment
+            segment_seconds: Target length of each segment
+            on_partial: Called with each new piece of text as it arrives
+            preflight: If given, segments without speech are not sent
+            tuner: If given, picks segment length and concurrency instead
+                of segment_seconds, and learns from each request
+        """
+        self.recorder = recorder
+        self.transcriber = transcriber
+        self.segment_seconds = segment_seconds
+        self.on_partial = on_partial
+        self.preflight = preflight
+        self.tuner = tuner
+
+        # Fixed for the recording: stop() may apply new audio settings
+        # before finish() transcribes the tail
+        self.sample_rate = recorder.sample_rate
+        # Segments with speech whose transcription came back empty
+        self.failed_segments = 0
+        self._failed_lock = Lock()
+
+        self._segments: list[str] = []
+        self._pending: list = []
+        self._pending_frames = 0
+        self._chunk_index = 0
+        self._stop_event = Event()
+        self._thread: Optional[Thread] = None
+
+        # Segments in flight, oldest first, so text is published in order
+        self._inflight: deque[Future] = deque()
+        max_workers = tuner.max_concurrency if tuner else 1
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="segment"
+        )
+
+    @property
+    def text(self) -> str:
+        """Text transcribed so far."""
+        return " ".join(self._segments)
+
+    def start(self) -> None:
+        """Start transcribing segments in the background."""
+        self.sample_rate = self.recorder.sample_rate
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def finish(self) -> Optional[str]:
+        """
+        Transcribe the remaining audio and return the full text.
+        Call after the recorder has been stopped.
+
+        If failed_segments is then non-zero, the text has gaps: transcribe
+        the whole recording instead.
+        """
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+        self._drain(final=True)
+        while self._inflight:
+            self._publish(self._inflight.popleft().result())
+
+        self._executor.shutdown(wait=False)
+        return self.text or None
+
+    def cancel(self) -> None:
+        """
+        Stop the session without transcribing the remaining audio.
+
+        Waits for the background loop, which may be submitting a segment,
+        before the executor is shut down.
+        """
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self) -> None:
+        """Background loop: transcribe each segment once it is long enough."""
+        while not self._stop_event.wait(0.1):
+            self._drain(final=False)
+
+    def _drain(self, final: bool) -> None:
+        """Collect new audio and submit every complete segment."""
+        self._publish_ready()
+
+        chunks, self._chunk_index = self.recorder.read_chunks(self._chunk_index)
+        for chunk in chunks:
+            self._pending.append(chunk)
+            self._pending_frames += len(chunk)
+
+        while True:
+            segment_seconds = self.tuner.segment_seconds if self.tuner else self.segment_seconds
+            segment_frames = int(segment_seconds * self.sample_rate)
+            if not (self._pending_frames >= segment_frames or (final and self._pending_frames)):
+                return
+            if self._stop_event.is_set() and not final:
+                return
+
+            audio = np.concatenate(self._pending, axis=0)
+            cut = len(audio) if final else self._find_cut(audio, segment_frames)
+
+            rest = audio[cut:]
+            self._pending = [rest] if len(rest) else []
+            self._pending_frames = len(rest)
+
+            self._submit(audio[:cut])
+
+    def _submit(self, audio: np.ndarray) -> None:
+        """Queue a segment, waiting while the concurrency limit is reached."""
+        concurrency = self.tuner.concurrency if self.tuner else 1
+        while len(self._inflight) >= concurrency:
+            self._publish(self._inflight.popleft().result())
+        self._inflight.append(self._executor.submit(self._transcribe_segment, audio))
+
+    def _publish_ready(self) -> None:
+        """Publish finished segments, stopping at the first one still running."""
+        while self._inflight and self._inflight[0].done():
+            self._publish(self._inflight.popleft().result())
+
+    def _find_cut(self, audio: np.ndarray, segment_frames: int) -> int:
+        """Pick the quietest point near the segment end to avoid splitting words."""
+        return find_quiet_cut(
+            audio,
+            self.sample_rate,
+            segment_frames,
+            search_seconds=self.CUT_SEARCH_SECONDS,
+            frame_seconds=self.CUT_FRAME_SECONDS,
+        )
+
+    def _transcribe_segment(self, audio: np.ndarray) -> Optional[str]:
+        """Transcribe one segment (runs on the executor)."""
+        sample_rate = self.sample_rate
+        if self.preflight:
+            # Only skip silence: a short final segment can still be a word
+            check = self.preflight.analyze(audio, sample_rate, segment=True)
+            if check.reason == "no_speech":
+                return None
+
+        started = time.perf_counter()
+        text = self.transcriber.transcribe(encode_wav(audio, sample_rate))
+        if not text:
+            with self._failed_lock:
+                self.failed_segments += 1
+        elif self.tuner:
+            self.tuner.observe(len(audio) / sample_rate, time.perf_counter() - started)
+        return text
+
+    def _publish(self, text: Optional[str]) -> None:
+        """Add a segment's text to the transcript and notify the UI."""
+        if not text:
+            return
+
+        delta = f" {text}" if self._segments else text
+        self._segments.append(text)
+        if self.on_partial:
+            self.on_partial(delta)
@@ -3,13 +3,23 @@ Speech-to-Text transcriber using Groq API (Whisper).
 """
 
 import io
+import time
+import wave
 import warnings
+from threading import Event
 from typing import Optional
 
 # Suppress httpx deprecation warning (groq dependency issue)
 warnings.filterwarnings("ignore", message="URL.raw is deprecated")
 
-from groq import Groq
+from groq import Groq, RateLimitError
+
+from .context import PromptContext
+from .language import language_code
+from .metrics import API_LATENCY, ERRORS, UPLOAD_BYTES
+from .ratelimit import RateLimiter
+from .recorder import wav_duration
+from .result import Segment, TranscriptionResult, Word, logprob_to_confidence
 
 
 class Transcriber:
@@ -24,48 +34,66 @@ class Transcriber:
         "de": "Hallo, wie geht es dir? Gut, danke. Heute ist das Wetter schön, aber morgen wird es regnen.",
     }
 
-    def __init__(self, api_key: str, language: str = "it"):
+    # Retries after the API answers "rate limited" (only with a rate limiter)
+    RATE_LIMIT_RETRIES = 2
+
+    def __init__(
+        self,
+        api_key: str,
+        language: str = "it",
+        context: Optional[PromptContext] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
         """
         Initialize transcriber.
 
         Args:
             api_key: Groq API key
             language: Language code (it, en, es, fr, de)
+            context: Rolling prompt context; static prompts are used without it
+            rate_limiter: If given, requests wait for quota instead of failing
         """
         self.client = Groq(api_key=api_key)
         self.language = language
+        self.context = context
+        self.rate_limiter = rate_limiter
         self.model = "whisper-large-v3"
 
     def set_language(self, language: str) -> None:
         """Change transcription language."""
         self.language = language
 
-    def _get_prompt(self) -> str:
-        """Get punctuation prompt for current language."""
-        return self.PUNCTUATION_PROMPTS.get(self.language, self.PUNCTUATION_PROMPTS["en"])
+    def _get_prompt(self, language: Optional[str] = None) -> str:
+        """Get the prompt for a language (the current one by default)."""
+        language = language or self.language
+        default = self.PUNCTUATION_PROMPTS.get(language, self.PUNCTUATION_PROMPTS["en"])
+        if self.context:
+            return self.context.prompt(language, default=default)
+        return default
 
-    def transcribe(self, audio_data: bytes) -> Optional[str]:
+    def transcribe(
+        self, audio_data: bytes, cancel_event: Optional[Event] = None
+    ) -> Optional[str]:
         """
         Transcribe audio bytes to text.
 
         Args:
             audio_data: WAV audio data as bytes
+            cancel_event: If already set, no request is made
 
         Returns:
             Transcribed text or None if failed
         """
         if not audio_data:
             return None
+        if cancel_event is not None and cancel_event.is_set():
+            return None
 
         try:
-            # Create a file-like object from bytes
-            audio_file = io.BytesIO(audio_data)
-            audio_file.name = "recording.wav"
-
             # Call Groq API with punctuation prompt
-            transcription = self.client.audio.transcriptions.create(
-                file=audio_file,
-                model=self.model,
+            transcription = self._request(
+                audio_data,
+                cancel_event,
                 language=self.language,
                 prompt=self._get_prompt(),
                 response_format="text",
@@ -77,3 +105,193 @@ class Transcriber:
             print(f"Transcription error: {e}")
             return None
 
+    def transcribe_verbose(
+        self,
+        audio_data: bytes,
+        cancel_event: Optional[Event] = None,
+        word_timestamps: bool = False,
+        language: Optional[str] = None,
+    ) -> Optional[TranscriptionResult]:
+        """
+        Transcribe audio bytes, keeping segment timing and confidence.
+
+        Args:
+            audio_data: WAV audio data as bytes
+            cancel_event: If already set, no request is made
+            word_timestamps: Also request per-word times
+            language: Language of this request only; the current one if None
+
+        Returns:
+            TranscriptionResult or None if failed
+        """
+        if not audio_data:
+            return None
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+
+        granularities = ["segment", "word"] if word_timestamps else ["segment"]
+        language = language or self.language
+        try:
+            transcription = self._request(
+                audio_data,
+                cancel_event,
+                language=language,
+                prompt=self._get_prompt(language),
+                response_format="verbose_json",
+                timestamp_granularities=granularities,
+            )
+            if transcription is None:
+                return None
+            data = transcription.model_dump() if hasattr(transcription, "model_dump") else dict(transcription)
+            result = self._parse_verbose(data, language)
+            return result if result.text else None
+
+        except Exception as e:
+            print(f"Transcription error: {e}")
+            return None
+
+    def detect_language(
+        self, audio_data: bytes, cancel_event: Optional[Event] = None
+    ) -> Optional[tuple[str, Optional[float]]]:
+        """
+        Detect the spoken language with a request that leaves the language open.
+
+        No prompt is sent, since its language would bias the guess.
+
+        Returns:
+            (language code, confidence of the decoded text) or None if failed
+        """
+        if not audio_data:
+            return None
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+
+        try:
+            transcription = self._request(audio_data, cancel_event, response_format="verbose_json")
+            if transcription is None:
+                return None
+            data = transcription.model_dump() if hasattr(transcription, "model_dump") else dict(transcription)
+            language = language_code(data.get("language"))
+            if not language:
+                return None
+            return language, self._parse_verbose(data).confidence
+
+        except Exception as e:
+            print(f"Language detection error: {e}")
+            return None
+
+    def _request(self, audio_data: bytes, cancel_event: Optional[Event], **params):
+        """
+        Send one transcription request, waiting for rate-limit quota first.
+
+        Returns None if cancelled while waiting; API errors are raised.
+        """
+        audio_seconds = self._audio_seconds(audio_data)
+        for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+            if self.rate_limiter and not self.rate_limiter.acquire(audio_seconds, cancel_event):
+                return None
+
+            # Create a file-like object from bytes
+            audio_file = io.BytesIO(audio_data)
+            audio_file.name = "recording.wav"
+            UPLOAD_BYTES.inc(len(audio_data))
+            started = time.perf_counter()
+            try:
+                response = self.client.audio.transcriptions.create(
+                    file=audio_file, model=self.model, **params
+                )
+            except RateLimitError as e:
+                ERRORS.inc(type="RateLimitError")
+                if not self.rate_limiter or attempt == self.RATE_LIMIT_RETRIES:
+                    raise
+                # Queue behind the server's limit rather than failing
+                self.rate_limiter.penalize(self._retry_after(e))
+                continue
+            except Exception as e:
+                ERRORS.inc(type=type(e).__name__)
+                raise
+            API_LATENCY.observe(time.perf_counter() - started)
+            return response
+
+    @staticmethod
+    def _audio_seconds(audio_data: bytes) -> float:
+        """Duration of WAV audio; 0 for other formats (billed at the minimum)."""
+        try:
+            return wav_duration(audio_data)
+        except (wave.Error, EOFError, ValueError):
+            return 0.0
+
+    @staticmethod
+    def _retry_after(error: RateLimitError) -> float:
+        """Seconds the API asked us to wait, 10 if it didn't say."""
+        try:
+            return float(error.response.headers.get("retry-after", 10))
+        except (AttributeError, TypeError, ValueError):
+            return 10.0
+
+    def _parse_verbose(self, data: dict, language: Optional[str] = None) -> TranscriptionResult:
+        """Build a TranscriptionResult from a verbose_json response."""
+        segments = [
+            Segment(
+                start=float(s["start"]),
+                end=float(s["end"]),
+                text=s.get("text", "").strip(),
+                confidence=logprob_to_confidence(s.get("avg_logprob")),
+                no_speech_prob=s.get("no_speech_prob"),
+            )
+            for s in data.get("segments") or []
+        ]
+
+        # Words come as one flat list; hand each to the segment it starts in
+        index = 0
+        for w in data.get("words") or []:
+            word = Word(word=w["word"].strip(), start=float(w["start"]), end=float(w["end"]))
+            while index + 1 < len(segments) and word.start >= segments[index].end:
+                index += 1
+            if segments:
+                segments[index].words.append(word)
+
+        return TranscriptionResult(
+            text=(data.get("text") or "").strip(),
+            language=language_code(data.get("language")) or language or self.language,
+            duration=data.get("duration"),
+            segments=segments,
+        )
+
+
+if __name__ == "__main__":
+    # Check: python -m core.transcriber
+    # WAV and non-WAV uploads both reach the API (stubbed, no network)
+    from types import SimpleNamespace
+
+    import numpy as np
+    from scipy.io import wavfile
+
+    from .recorder import encode_wav
+
+    sent = []
+
+    def create(file, model, **params):
+        sent.append(file.read()[:4])
+        return "hello"
+
+    transcriber = Transcriber(api_key="test", language="en")
+    transcriber.client = SimpleNamespace(
+        audio=SimpleNamespace(transcriptions=SimpleNamespace(create=create))
+    )
+    float_wav = io.BytesIO()
+    wavfile.write(float_wav, 16000, np.zeros(16000, dtype=np.float32))
+    uploads = {
+        "wav": encode_wav(np.zeros(16000, dtype=np.int16), 16000),
+        "float wav": float_wav.getvalue(),
+        "mp3": b"ID3\x04\x00\x00\x00\x00\x00\x00" + bytes(1000),
+        "ogg": b"OggS" + bytes(1000),
+    }
+    failed = 0
+    for name, body in uploads.items():
+        text = transcriber.transcribe(body)
+        ok = text == "hello"
+        failed += not ok
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}: {text!r}")
+    raise SystemExit(1 if failed else 0)
+
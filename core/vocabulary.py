@@ -0,0 +1,342 @@
+"""
+Vocabulary index module.
+Snaps near-miss words in a transcript to known vocabulary terms.
+Optional: correcting single misspelled words requires the wordfreq
+package, to tell them apart from ordinary words.
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Iterable, Optional
+
+try:
+    from wordfreq import zipf_frequency
+except ImportError:
+    zipf_frequency = None
+
+# Zipf frequency (log10 of uses per billion words) from which a word counts
+# as an ordinary word rather than a misspelling, in any of these languages
+COMMON_ZIPF = 3.0
+COMMON_LANGUAGES = ("en", "it", "es", "fr", "de")
+
+
+@lru_cache(maxsize=4096)
+def is_common_word(word: str) -> bool:
+    """Whether a word is in everyday use (requires wordfreq)."""
+    word = word.lower()
+    return any(zipf_frequency(word, lang) >= COMMON_ZIPF for lang in COMMON_LANGUAGES)
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Damerau-Levenshtein (optimal string alignment) distance.
+
+    Gives up early and returns max_distance + 1 once the distance is known
+    to exceed max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if a == b:
+        return 0
+
+    previous2: Optional[list] = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (
+                previous2 is not None
+                and j > 1
+                and a[i - 1] == b[j - 2]
+                and a[i - 2] == b[j - 1]
+            ):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+
+    return previous[-1]
+
+
+class VocabularyIndex:
+    """
+    Fuzzy lookup of vocabulary terms with a SymSpell-style deletion index.
+
+    Every term is indexed under all strings obtained by deleting up to
+    max_distance characters from its first prefix_length characters. A
+    query generates its own deletions the same way, so candidates are found
+    with a handful of dict lookups instead of comparing against every term;
+    only those candidates get a real edit-distance check.
+    """
+
+    # Tokens: words, keeping inner apostrophes and hyphens
+    TOKEN_PATTERN = re.compile(r"\w+(?:['’-]\w+)*")
+    # Endings that make a word an inflected term, not a misspelling of it
+    INFLECTIONS = ("s", "es", "'s", "’s", "ed", "ing")
+    # Shortest length ratio between a word and the term it is snapped to
+    MIN_LENGTH_RATIO = 0.8
+
+    def __init__(
+        self,
+        terms: Iterable[str],
+        max_distance: int = 2,
+        prefix_length: int = 7,
+        is_common: Optional[Callable[[str], bool]] = None,
+    ):
+        """
+        Build the index.
+
+        Args:
+            terms: Vocabulary terms in their preferred spelling; multi-word
+                terms also match when transcribed as two words
+            max_distance: Largest edit distance snapped to a term
+            prefix_length: Characters of each term that are indexed
+            is_common: Tells ordinary words, which are never corrected, from
+                misspellings; defaults to is_common_word when wordfreq is
+                installed. Without it, single words are only fixed up when
+                they match a term exactly (e.g. its capitalization).
+        """
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        if is_common is None and zipf_frequency is not None:
+            is_common = is_common_word
+        self.is_common = is_common
+
+        self._terms: list[str] = []
+        self._keys: list[str] = []
+        self._exact: dict[str, int] = {}
+        # Deletion -> term id, or a list of ids when several terms share it
+        self._deletes: dict[str, object] = {}
+
+        for term in terms:
+            self._add(term)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def lookup(self, word: str) -> Optional[str]:
+        """
+        Find the vocabulary term closest to a word.
+
+        Args:
+            word: Word (or two words) as transcribed
+
+        Returns:
+            Preferred spelling of the closest term, or None if none is close enough
+        """
+        key = self._normalize(word)
+        if not key:
+            return None
+
+        term_id = self._exact.get(key)
+        if term_id is not None:
+            return self._terms[term_id]
+
+        allowed = self._allowed_distance(len(key))
+        if allowed == 0:
+            return None
+
+        # Ties with a second term are ambiguous and not corrected
+        best_id, best_distance = None, allowed + 1
+        runner_up = best_distance
+        seen: set[int] = set()
+        for delete in self._prefix_deletes(key[: self.prefix_length], allowed):
+            posting = self._deletes.get(delete)
+            if posting is None:
+                continue
+            for candidate in posting if isinstance(posting, list) else (posting,):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                other = self._keys[candidate]
+                # Misheard words keep their first letter and roughly their length
+                if other[0] != key[0]:
+                    continue
+                if min(len(key), len(other)) < self.MIN_LENGTH_RATIO * max(len(key), len(other)):
+                    continue
+                distance = edit_distance(key, other, best_distance)
+                if distance < best_distance:
+                    best_id, runner_up, best_distance = candidate, best_distance, distance
+                elif distance == best_distance:
+                    runner_up = distance
+
+        if best_id is None or runner_up == best_distance:
+            return None
+        return self._terms[best_id]
+
+    def correct(self, text: str) -> str:
+        """
+        Replace near-miss words in text with vocabulary terms.
+
+        Pairs of adjacent words are tried first, so a term split in two by
+        the transcriber ("type script" -> "TypeScript") is joined back.
+        Ordinary words ("clause" next to a term "Claude") and inflected
+        terms ("Anthropic's") are left alone.
+        """
+        if not self._terms or not text:
+            return text
+
+        tokens = list(self.TOKEN_PATTERN.finditer(text))
+        parts = []
+        last = 0
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+
+            if i + 1 < len(tokens):
+                following = tokens[i + 1]
+                gap = text[token.end():following.start()]
+                if gap == " ":
+                    pair = token.group() + following.group()
+                    # Only join pairs long enough not to be ordinary short words
+                    match = self.lookup(pair) if len(pair) >= 6 else None
+                    if match:
+                        parts.append(text[last:token.start()])
+                        parts.append(match)
+                        last = following.end()
+                        i += 2
+                        continue
+
+            match = self._lookup_word(token.group())
+            if match:
+                parts.append(text[last:token.start()])
+                parts.append(match)
+                last = token.end()
+            i += 1
+
+        parts.append(text[last:])
+        return "".join(parts)
+
+    def _lookup_word(self, word: str) -> Optional[str]:
+        """lookup() for a single transcribed word, which may be an ordinary one."""
+        key = self._normalize(word)
+        term_id = self._exact.get(key)
+        if term_id is not None:
+            return self._terms[term_id]
+        if self.is_common is None or self.is_common(word):
+            return None
+        for ending in self.INFLECTIONS:
+            if key.endswith(ending) and key[: -len(ending)] in self._exact:
+                return None
+        return self.lookup(word)
+
+    def _add(self, term: str) -> None:
+        """Index one term."""
+        term = str(term).strip()
+        key = self._normalize(term)
+        if not key or key in self._exact:
+            return
+
+        term_id = len(self._terms)
+        self._terms.append(term)
+        self._keys.append(key)
+        self._exact[key] = term_id
+
+        for delete in self._prefix_deletes(key[: self.prefix_length], self.max_distance):
+            posting = self._deletes.get(delete)
+            if posting is None:
+                self._deletes[delete] = term_id
+            elif isinstance(posting, list):
+                if posting[-1] != term_id:
+                    posting.append(term_id)
+            elif posting != term_id:
+                self._deletes[delete] = [posting, term_id]
+
+    def _allowed_distance(self, length: int) -> int:
+        """Edit distance tolerated for a word of this length."""
+        # Short words are too easy to confuse with other short words
+        if length <= 4:
+            return 0
+        if length <= 8:
+            return min(1, self.max_distance)
+        return self.max_distance
+
+    @staticmethod
+    def _normalize(word: str) -> str:
+        """Lowercase and drop spaces, so multi-word terms have one key."""
+        return "".join(word.lower().split())
+
+    @staticmethod
+    def _prefix_deletes(prefix: str, distance: int) -> set[str]:
+        """All strings made by deleting up to `distance` characters."""
+        deletes = {prefix}
+        frontier = {prefix}
+        for _ in range(distance):
+            next_frontier = set()
+            for item in frontier:
+                for k in range(len(item)):
+                    next_frontier.add(item[:k] + item[k + 1:])
+            next_frontier -= deletes
+            deletes |= next_frontier
+            frontier = next_frontier
+        return deletes
+
+
+if __name__ == "__main__":
+    # Checks and benchmark: python -m core.vocabulary
+    import random
+    import string
+    import time
+
+    # Ordinary words must survive; a fixed list stands in for wordfreq here
+    ordinary = {"clause", "the", "type", "script", "cloud", "to", "deploy"}
+    checks = VocabularyIndex(
+        ["Claude", "Anthropic", "TypeScript", "Kubernetes", "PostgreSQL"],
+        is_common=lambda word: word.lower() in ordinary,
+    )
+    cases = {
+        "the clause": "the clause",
+        "Anthropic's anthropics": "Anthropic's anthropics",
+        "type script": "TypeScript",
+        "deploy to kubernets": "deploy to Kubernetes",
+        "postgresql": "PostgreSQL",
+        "claude": "Claude",
+    }
+    failed = 0
+    for text, expected in cases.items():
+        corrected = checks.correct(text)
+        failed += corrected != expected
+        print(f"  {'ok  ' if corrected == expected else 'FAIL'} {text!r} -> {corrected!r}")
+    # Equally close to two terms: ambiguous, left alone
+    tied = VocabularyIndex(["Dockers", "Dockerz"], is_common=lambda word: False)
+    failed += tied.lookup("dockerx") is not None
+    print(f"  {'ok  ' if tied.lookup('dockerx') is None else 'FAIL'} tie is not corrected")
+    if zipf_frequency is not None:
+        default = VocabularyIndex(["Claude", "Anthropic"])
+        corrected = default.correct("a clause about anthropics")
+        ok = corrected == "a clause about anthropics"
+        failed += not ok
+        print(f"  {'ok  ' if ok else 'FAIL'} with wordfreq: {corrected!r}")
+    if failed:
+        raise SystemExit(1)
+
+    random.seed(0)
+
+    def random_word() -> str:
+        return "".join(random.choices(string.ascii_lowercase, k=random.randint(5, 12)))
+
+    terms = [random_word() for _ in range(100_000)]
+
+    started = time.perf_counter()
+    index = VocabularyIndex(terms)
+    print(f"Indexed {len(index)} terms in {time.perf_counter() - started:.2f}s")
+
+    def misspell(word: str) -> str:
+        k = random.randrange(len(word))
+        return word[:k] + random.choice(string.ascii_lowercase) + word[k + 1:]
+
+    queries = [misspell(random.choice(terms)) for _ in range(5_000)]
+    queries += [random_word() for _ in range(5_000)]
+
+    started = time.perf_counter()
+    found = sum(1 for q in queries if index.lookup(q))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{len(queries)} lookups: {elapsed / len(queries) * 1e6:.1f} us per lookup, "
+        f"{found} matched"
+    )
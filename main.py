@@ -3,15 +3,27 @@ Voice Agent - Voice-to-Clipboard Tool
 
 Launch the GUI application.
 Use --cli flag for command-line mode.
+Use --export FILE to write SRT/VTT/JSONL transcripts of an audio file.
+Use --profile to write a profile of every recording (see config.yaml).
 """
 
+import os
 import sys
 
 
 def main():
     """Entry point."""
+    if "--profile" in sys.argv:
+        sys.argv.remove("--profile")
+        os.environ["VOICE_AGENT_PROFILE"] = "1"
+
     # Check for CLI flag
-    if "--cli" in sys.argv:
+    if "--export" in sys.argv:
+        from core.export import run_export
+        args = sys.argv[1:]
+        args.remove("--export")
+        run_export(args)
+    elif "--cli" in sys.argv:
         from cli import run_cli
         run_cli()
     else:
@@ -4,13 +4,39 @@ A sleek, modern voice recording interface with glassmorphism design.
 """
 
 import time
+import wave
 import webview
 import keyboard
 import pyperclip
 from threading import Thread
-
-from config import get_config
-from core import AudioRecorder, Transcriber, TextProcessor
+from typing import Optional
+
+from config import BASE_DIR, ConfigWatcher, get_config
+from core import (
+    AudioRecorder,
+    Transcriber,
+    TextProcessor,
+    PromptContext,
+    StreamingSession,
+    SegmentTuner,
+    PreflightAnalyzer,
+    HistoryStore,
+    LocalTranscriber,
+    create_sink,
+    ApiServer,
+    MultiStreamRecorder,
+    RacingTranscriber,
+    AutoLanguageTranscriber,
+    RateLimiter,
+    Profiler,
+    AudioPreprocessor,
+    DuplicateDetector,
+)
+from core.metrics import AUDIO_SECONDS, END_TO_END, RECORDINGS, REGISTRY
+from core.multistream import format_utterances, transcribe_tracks
+from core.profiling import profile_stage
+from core.recorder import wav_duration
+from .bridge import UiBridge
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -411,6 +437,37 @@ HTML_CONTENT = """
             letter-spacing: 0.1px;
         }
 
+        .status-subtitle.warning {
+            color: var(--accent-amber);
+        }
+
+        /* Input Level Meter */
+        .level-meter {
+            width: 120px;
+            height: 3px;
+            margin: 10px auto 0;
+            border-radius: 2px;
+            background: var(--border-subtle);
+            overflow: hidden;
+            opacity: 0;
+            transition: opacity 0.3s ease;
+        }
+
+        .level-meter.active {
+            opacity: 1;
+        }
+
+        .level-fill {
+            height: 100%;
+            width: 0%;
+            background: var(--accent-teal);
+            transition: width 0.05s linear;
+        }
+
+        .level-fill.clipping {
+            background: var(--accent-red);
+        }
+
         /* Transcription Card */
         .transcript-card {
             flex: 1;
@@ -453,6 +510,30 @@ HTML_CONTENT = """
             color: var(--text-tertiary);
         }
 
+        .history-search {
+            flex: 1;
+            min-width: 0;
+            margin: 0 10px;
+            padding: 3px 8px;
+            border: 1px solid var(--border-subtle);
+            border-radius: 5px;
+            background: rgba(0, 0, 0, 0.2);
+            font-family: inherit;
+            font-size: 10px;
+            color: var(--text-secondary);
+            outline: none;
+            transition: border-color 0.2s ease;
+        }
+
+        .history-search:focus {
+            border-color: var(--border-medium);
+            color: var(--text-primary);
+        }
+
+        .history-search::placeholder {
+            color: var(--text-tertiary);
+        }
+
         .copy-badge {
             font-size: 10px;
             font-weight: 600;
@@ -491,6 +572,22 @@ HTML_CONTENT = """
             font-style: normal;
         }
 
+        .transcript-text.live {
+            color: var(--text-secondary);
+            font-style: normal;
+        }
+
+        .transcript-text.live::after {
+            content: '';
+            display: inline-block;
+            width: 6px;
+            height: 12px;
+            margin-left: 2px;
+            vertical-align: -1px;
+            background: var(--accent-red);
+            animation: breathe 1.2s ease-in-out infinite;
+        }
+
         /* History Navigation */
         .transcript-footer {
             display: flex;
@@ -636,6 +733,7 @@ HTML_CONTENT = """
                     <button class="lang-option" data-lang="es" onclick="selectLang('es')">Español</button>
                     <button class="lang-option" data-lang="fr" onclick="selectLang('fr')">Français</button>
                     <button class="lang-option" data-lang="de" onclick="selectLang('de')">Deutsch</button>
+                    <button class="lang-option" data-lang="auto" onclick="selectLang('auto')">Auto</button>
                 </div>
             </div>
         </header>
@@ -651,11 +749,16 @@ HTML_CONTENT = """
         <section class="status-section">
             <h2 class="status-title" id="statusTitle">Ready</h2>
             <p class="status-subtitle" id="statusSubtitle">Tap to start recording</p>
+            <div class="level-meter" id="levelMeter">
+                <div class="level-fill" id="levelFill"></div>
+            </div>
         </section>
 
         <div class="transcript-card" id="transcriptCard">
             <div class="transcript-header">
                 <span class="transcript-label">Transcription</span>
+                <input class="history-search" id="historySearch" type="text"
+                       placeholder="Search history" oninput="searchHistory(this.value)">
                 <span class="copy-badge" id="copyBadge">Copied!</span>
             </div>
             <div class="transcript-content" onclick="copyTranscription()">
@@ -695,9 +798,52 @@ HTML_CONTENT = """
 
     <script>
         let state = 'idle';
-        let history = [];
+        // History lives in Python; only the pages being viewed are cached here
+        const HISTORY_PAGE = 20;
+        const HISTORY_CACHE_LIMIT = 200;
+        let historyCache = new Map();
+        let historyTotal = 0;
         let historyIndex = -1;
-        const MAX_HISTORY = 20;
+        let historyQuery = '';
+        let searchTimer = null;
+
+        function loadHistory(index) {
+            if (historyCache.has(index)) {
+                return Promise.resolve(historyCache.get(index));
+            }
+            if (historyCache.size > HISTORY_CACHE_LIMIT) historyCache.clear();
+
+            const query = historyQuery;
+            const offset = Math.floor(index / HISTORY_PAGE) * HISTORY_PAGE;
+            return pywebview.api.get_history(offset, HISTORY_PAGE, query).then(page => {
+                if (query !== historyQuery) return undefined;  // Stale search
+                historyTotal = page.total;
+                page.items.forEach((text, i) => historyCache.set(offset + i, text));
+                return historyCache.get(index);
+            });
+        }
+
+        function resetHistory() {
+            historyCache = new Map();
+            historyIndex = -1;
+            return loadHistory(0).then(text => {
+                if (historyTotal > 0) {
+                    historyIndex = 0;
+                    displayCurrentTranscription();
+                }
+                updateHistoryUI();
+            });
+        }
+
+        function searchHistory(query) {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => {
+                historyQuery = query.trim();
+                resetHistory();
+            }, 150);
+        }
+
+        window.addEventListener('pywebviewready', resetHistory);
 
         function handleRecord() {
             if (state === 'processing') return;
@@ -728,8 +874,8 @@ HTML_CONTENT = """
         });
 
         function copyTranscription() {
-            if (history.length === 0 || historyIndex < 0) return;
-            pywebview.api.copy_text(history[historyIndex]);
+            if (!historyCache.has(historyIndex)) return;
+            pywebview.api.copy_text(historyCache.get(historyIndex));
             const badge = document.getElementById('copyBadge');
             badge.classList.add('show');
             setTimeout(() => badge.classList.remove('show'), 2000);
@@ -737,16 +883,18 @@ HTML_CONTENT = """
 
         function navigateHistory(dir) {
             const newIndex = historyIndex + dir;
-            if (newIndex < 0 || newIndex >= history.length) return;
+            if (newIndex < 0 || newIndex >= historyTotal) return;
             historyIndex = newIndex;
-            displayCurrentTranscription();
             updateHistoryUI();
+            loadHistory(newIndex).then(() => {
+                if (historyIndex === newIndex) displayCurrentTranscription();
+            });
         }
 
         function displayCurrentTranscription() {
             const el = document.getElementById('transcriptText');
-            if (historyIndex >= 0 && historyIndex < history.length) {
-                el.textContent = history[historyIndex];
+            if (historyCache.has(historyIndex)) {
+                el.textContent = historyCache.get(historyIndex);
                 el.className = 'transcript-text filled';
             }
         }
@@ -756,13 +904,13 @@ HTML_CONTENT = """
             const btnNext = document.getElementById('btnNext');
             const indicator = document.getElementById('historyIndicator');
 
-            if (history.length === 0) {
+            if (historyTotal === 0) {
                 indicator.textContent = '0 / 0';
                 btnPrev.disabled = true;
                 btnNext.disabled = true;
             } else {
-                indicator.textContent = `${historyIndex + 1} / ${history.length}`;
-                btnPrev.disabled = historyIndex >= history.length - 1;
+                indicator.textContent = `${historyIndex + 1} / ${historyTotal}`;
+                btnPrev.disabled = historyIndex >= historyTotal - 1;
                 btnNext.disabled = historyIndex <= 0;
             }
         }
@@ -778,6 +926,8 @@ HTML_CONTENT = """
             const subtitle = document.getElementById('statusSubtitle');
 
             indicator.className = 'status-indicator ' + newState;
+            subtitle.classList.remove('warning');
+            document.getElementById('levelMeter').classList.toggle('active', newState === 'recording');
             ring.className = 'rec-ring ' + newState;
             btn.className = 'rec-btn ' + newState;
 
@@ -806,12 +956,19 @@ HTML_CONTENT = """
             const card = document.getElementById('transcriptCard');
 
             if (!isError) {
-                // Add to history
-                history.unshift(text);
-                if (history.length > MAX_HISTORY) {
-                    history.pop();
-                }
+                // Python already stored it: show the newest entry of the full history
+                const wasSearching = historyQuery !== '';
+                document.getElementById('historySearch').value = '';
+                historyQuery = '';
+                historyCache = new Map([[0, text]]);
                 historyIndex = 0;
+                if (wasSearching) {
+                    // The total was for the search results, refetch the full count
+                    historyCache.clear();
+                    loadHistory(0).then(updateHistoryUI);
+                } else {
+                    historyTotal += 1;
+                }
 
                 el.textContent = text;
                 el.className = 'transcript-text filled';
@@ -826,6 +983,46 @@ HTML_CONTENT = """
             }
         }
 
+        function showDuplicate(text, pasted) {
+            // Reused result: already in the history, so the count stays the same
+            const el = document.getElementById('transcriptText');
+            const card = document.getElementById('transcriptCard');
+            el.textContent = pasted ? text : `Repeated recording, not pasted again: ${text}`;
+            el.className = 'transcript-text filled';
+            card.classList.add('has-text');
+        }
+
+        const LEVEL_WARNINGS = {
+            silence: 'No input detected - check your microphone',
+            clipping: 'Input is clipping - move away from the mic',
+        };
+
+        function updateLevel(rmsDb, peakDb, warning) {
+            if (state !== 'recording') return;
+
+            // Map -60..0 dBFS onto the bar width
+            const percent = Math.max(0, Math.min(100, (rmsDb + 60) / 60 * 100));
+            const fill = document.getElementById('levelFill');
+            fill.style.width = percent + '%';
+            fill.classList.toggle('clipping', peakDb > -1);
+
+            const subtitle = document.getElementById('statusSubtitle');
+            subtitle.textContent = LEVEL_WARNINGS[warning] || 'Tap again to finish';
+            subtitle.classList.toggle('warning', !!warning);
+        }
+
+        function beginLiveTranscript() {
+            const el = document.getElementById('transcriptText');
+            el.textContent = '';
+            el.className = 'transcript-text live';
+        }
+
+        function appendPartial(delta) {
+            // Append only the new text instead of re-rendering the whole transcript
+            const el = document.getElementById('transcriptText');
+            el.appendChild(document.createTextNode(delta));
+        }
+
         function setHotkey(key) {
             document.getElementById('hotkeyDisplay').textContent = key;
         }
@@ -900,6 +1097,26 @@ HTML_CONTENT = """
                 opt.classList.toggle('active', opt.dataset.lang === lang);
             });
         }
+
+        // Handlers Python may call through the UI bridge
+        const EVENT_HANDLERS = {
+            updateStatus,
+            showTranscription,
+            showDuplicate,
+            beginLiveTranscript,
+            appendPartial,
+            updateLevel,
+            setHotkey,
+            setInitialLanguage,
+        };
+
+        function dispatchEvents(batch) {
+            // One call per frame: batch is a list of [event, args] pairs
+            for (const [event, args] of batch) {
+                const handler = EVENT_HANDLERS[event];
+                if (handler) handler(...args);
+            }
+        }
     </script>
 </body>
 </html>
@@ -913,29 +1130,305 @@ HTML_CONTENT = """
 class Api:
     """Python API exposed to JavaScript."""
 
+    PREFLIGHT_ERRORS = {
+        "too_short": "Recording too short",
+        "no_speech": "No speech detected, check your microphone",
+    }
+
+    # Components apply_config may replace, restored if the rebuild fails
+    _RELOADABLE = (
+        "processor", "prompt_context", "rate_limiter", "transcriber", "segment_tuner",
+        "preflight", "deduplicator", "output", "profiler", "meeting", "history",
+    )
+
     def __init__(self):
         self.config = get_config()
         self._validate_config()
 
         self._status = "idle"
-        self._window = None
+        self.ui = UiBridge()
+        self._stream: Optional[StreamingSession] = None
 
         # Initialize components
         self.recorder = AudioRecorder(
             sample_rate=self.config.audio.sample_rate,
             channels=self.config.audio.channels,
             device_id=self.config.audio.device_id,
+            blocksize=self.config.audio.blocksize,
+            latency=self.config.audio.latency,
+            preprocessor=self._create_preprocessor(),
         )
+        self.recorder.meter.add_listener(self._show_level)
+        self.recorder.add_xrun_listener(self._on_xrun)
 
-        self.transcriber = Transcriber(
-            api_key=self.config.groq_api_key,
-            language=self.config.language,
-        )
+        self.prompt_context = self._create_prompt_context()
+        self.rate_limiter = self._create_rate_limiter()
+        self.transcriber = self._create_transcriber()
 
         self.processor = TextProcessor(
             corrections=self.config.text_corrections,
+            vocabulary=self.config.vocabulary,
+        )
+
+        self.history = self._create_history()
+        self.preflight = self._create_preflight()
+        self.deduplicator = self._create_deduplicator()
+        self.segment_tuner = self._create_segment_tuner()
+        self.output = self._create_output()
+        self.server = self._create_server()
+        self.meeting = self._create_meeting()
+        self._active_meeting: Optional[MultiStreamRecorder] = None
+        self.profiler = self._create_profiler()
+        self._profile_job = None
+
+        REGISTRY.add_collector(self._collect_metrics)
+
+    def _create_transcriber(self):
+        """
+        Create the Groq transcriber, raced against a local model if configured,
+        and wrapped for language detection when the language is "auto".
+        """
+        detection = self.config.language_detection
+        auto = self.config.language == "auto"
+        language = (detection.candidates or ["en"])[0] if auto else self.config.language
+
+        engine = Transcriber(
+            api_key=self.config.groq_api_key,
+            language=language,
+            context=self.prompt_context,
+            rate_limiter=self.rate_limiter,
+        )
+        if self.config.transcription.mode == "race":
+            local = LocalTranscriber(
+                model_size=self.config.transcription.local_model,
+                language=language,
+                context=self.prompt_context,
+            )
+            # Load the model now so the first race isn't won by default
+            Thread(target=local.load, daemon=True).start()
+            # Streaming segments and meeting tracks race concurrently
+            engine = RacingTranscriber(
+                {"groq": engine, "local": local},
+                max_concurrency=max(
+                    self.config.streaming.max_concurrency,
+                    self.config.meeting.max_concurrency,
+                ),
+            )
+
+        if not auto:
+            return engine
+        return AutoLanguageTranscriber(
+            engine,
+            fallback=language,
+            candidates=detection.candidates,
+            probe_seconds=detection.probe_seconds,
+            min_confidence=detection.min_confidence,
+            cache_seconds=detection.cache_seconds,
+        )
+
+    def _create_rate_limiter(self):
+        """Create the API quota limiter, if enabled."""
+        limits = self.config.rate_limit
+        if not limits.enabled:
+            return None
+        return RateLimiter(
+            requests_per_minute=limits.requests_per_minute,
+            requests_per_day=limits.requests_per_day,
+            audio_seconds_per_hour=limits.audio_seconds_per_hour,
+            audio_seconds_per_day=limits.audio_seconds_per_day,
+            min_billed_seconds=limits.min_billed_seconds,
+            usage_path=BASE_DIR / limits.usage_path,
+        )
+
+    def _create_prompt_context(self):
+        """Create the prompt builder (vocabulary plus recent text)."""
+        prompt = self.config.prompt
+        return PromptContext(
+            vocabulary=self.config.vocabulary,
+            history_size=prompt.history_size if prompt.rolling_context else 0,
+            max_age=prompt.max_age_seconds,
+            max_tokens=prompt.max_tokens,
+        )
+
+    def get_metrics(self):
+        """Pipeline decisions and statistics."""
+        metrics = {}
+        engine = self.transcriber
+        if isinstance(engine, AutoLanguageTranscriber):
+            metrics["language"] = {
+                "current": engine.language,
+                "detections": engine.detections,
+                "cache_hits": engine.cache_hits,
+            }
+            engine = engine.engine
+        if isinstance(engine, RacingTranscriber):
+            metrics["engines"] = engine.snapshot()
+        if self.segment_tuner:
+            metrics["segments"] = self.segment_tuner.snapshot()
+        if self.preflight:
+            metrics["preflight"] = dict(self.preflight.stats)
+            metrics["preflight_segments"] = dict(self.preflight.segment_stats)
+        if self.deduplicator:
+            metrics["dedup"] = {
+                "checks": self.deduplicator.checks,
+                "hits": self.deduplicator.hits,
+            }
+        metrics["capture"] = self.recorder.capture_stats()
+        if self.rate_limiter:
+            metrics["usage"] = self.rate_limiter.snapshot()
+        metrics["prompt_cache"] = {
+            "hits": self.prompt_context.hits,
+            "misses": self.prompt_context.misses,
+        }
+        return metrics
+
+    def api_metrics(self):
+        """Metrics in the Prometheus text format, for the local API."""
+        return REGISTRY.render()
+
+    def _collect_metrics(self):
+        """Values read at scrape time, so hot paths don't update them."""
+        samples = [
+            ("voice_agent_audio_status_events_total", "counter",
+             "Audio callbacks that reported overflow or underflow",
+             self.recorder.status_events, {}),
+            ("voice_agent_audio_blocksize", "gauge", "Frames per audio callback in use",
+             self.recorder.blocksize, {}),
+            ("voice_agent_prompt_cache_total", "counter", "Prompt cache lookups",
+             self.prompt_context.hits, {"result": "hit"}),
+            ("voice_agent_prompt_cache_total", "counter", "Prompt cache lookups",
+             self.prompt_context.misses, {"result": "miss"}),
+        ]
+        for kind, count in self.recorder.xrun_counts.items():
+            samples.append(("voice_agent_audio_xruns_total", "counter",
+                            "Audio overflows and underflows, by kind", count, {"kind": kind}))
+        if isinstance(self.transcriber, AutoLanguageTranscriber):
+            samples += [
+                ("voice_agent_language_cache_total", "counter", "Language lookups",
+                 self.transcriber.cache_hits, {"result": "hit"}),
+                ("voice_agent_language_cache_total", "counter", "Language lookups",
+                 self.transcriber.detections, {"result": "detected"}),
+            ]
+        if self.rate_limiter:
+            usage = self.rate_limiter.snapshot()
+            samples.append(("voice_agent_throttled_seconds_total", "counter",
+                            "Time requests waited for rate-limit quota",
+                            usage["throttled_seconds"], {}))
+            for bucket, remaining in usage["remaining"].items():
+                samples.append(("voice_agent_quota_remaining", "gauge",
+                                "Rate-limit quota left per bucket",
+                                remaining, {"bucket": bucket}))
+        return samples
+
+    def _create_segment_tuner(self):
+        """Create the adaptive segment tuner, if enabled."""
+        streaming = self.config.streaming
+        if not streaming.adaptive:
+            return None
+        return SegmentTuner(
+            min_segment_seconds=streaming.min_segment_seconds,
+            max_segment_seconds=streaming.max_segment_seconds,
+            max_concurrency=streaming.max_concurrency,
         )
 
+    def _create_output(self):
+        """Create the sink that receives the final text."""
+        output = self.config.output
+        return create_sink(
+            output.sink,
+            restore_clipboard=output.restore_clipboard,
+            chunk_size=output.chunk_size,
+            path=str(BASE_DIR / output.path),
+            host=output.host,
+            port=output.port,
+        )
+
+    def _create_preprocessor(self):
+        """Create the noise reduction / normalization stage, if enabled."""
+        processing = self.config.audio_processing
+        if not processing.enabled:
+            return None
+        return AudioPreprocessor(
+            sample_rate=self.config.audio.sample_rate,
+            highpass_hz=processing.highpass_hz,
+            noise_reduction=processing.noise_reduction,
+            reduction_db=processing.reduction_db,
+            normalize=processing.normalize,
+            target_db=processing.target_db,
+            max_gain_db=processing.max_gain_db,
+        )
+
+    def _create_profiler(self):
+        """Create the per-recording profiler, if profiling is enabled."""
+        profiling = self.config.profiling
+        if not profiling.enabled:
+            return None
+        try:
+            return Profiler(
+                BASE_DIR / profiling.output_dir,
+                mode=profiling.mode,
+                interval=profiling.interval_ms / 1000,
+                trace_memory=profiling.trace_memory,
+                keep_jobs=profiling.keep_jobs,
+            )
+        except ValueError as e:
+            print(f"Profiling disabled: {e}")
+            return None
+
+    def _create_server(self):
+        """Create the local API server, if enabled. Started by the app."""
+        server = self.config.server
+        if not server.enabled:
+            return None
+        # Without a configured token, a generated one is kept in a file
+        # that only local users can read
+        token_file = BASE_DIR / "api_token"
+        token = server.token
+        if not token and token_file.exists():
+            token = token_file.read_text(encoding="utf-8").strip()
+        try:
+            api_server = ApiServer(self, host=server.host, port=server.port, token=token)
+        except OSError as e:
+            print(f"API server error: {e}")
+            return None
+        if api_server.token != token:
+            try:
+                token_file.write_text(api_server.token, encoding="utf-8")
+                token_file.chmod(0o600)
+            except OSError as e:
+                print(f"API token error: {e}")
+        return api_server
+
+    def _create_meeting(self):
+        """Create the multi-device recorder, if meeting capture is enabled."""
+        meeting = self.config.meeting
+        if not meeting.enabled or not meeting.devices:
+            return None
+        return MultiStreamRecorder(meeting.devices, sample_rate=self.config.audio.sample_rate)
+
+    def _create_history(self):
+        """Open the history store, if enabled."""
+        if not self.config.history.enabled:
+            return None
+        return HistoryStore(BASE_DIR / self.config.history.path)
+
+    def _create_preflight(self):
+        """Create the pre-flight analyzer, if enabled."""
+        if not self.config.preflight.enabled:
+            return None
+        return PreflightAnalyzer(
+            min_duration=self.config.preflight.min_duration,
+            speech_db=self.config.preflight.speech_db,
+            min_speech_ratio=self.config.preflight.min_speech_ratio,
+        )
+
+    def _create_deduplicator(self):
+        """Create the repeated-recording detector, if enabled."""
+        dedup = self.config.dedup
+        if not dedup.enabled:
+            return None
+        return DuplicateDetector(max_age=dedup.max_age_seconds, threshold=dedup.threshold)
+
     def _validate_config(self):
         if not self.config.groq_api_key:
             raise ValueError(
@@ -945,36 +1438,276 @@ class Api:
             )
 
     def set_window(self, window):
-        self._window = window
+        self.ui.attach(window)
 
     def toggle_recording(self):
         """Toggle recording state."""
-        if self._status == "processing":
+        if self._status == "processing" or self._active_meeting:
             return
 
-        if not self.recorder.is_recording:
-            # Check microphone before starting
+        if self.recorder.try_arm():
+            # Check microphone while armed so no other toggle can slip in
             mic_ok, error_msg = self.recorder.check_microphone()
             if not mic_ok:
+                self.recorder.cancel_arm()
                 self._show_error(error_msg)
                 return
 
+            # Publish the session before starting so a concurrent stop sees it
+            stream = self._create_stream()
+            self._stream = stream
+
+            # Profile this recording from capture to output
+            job = self.profiler.start_job() if self.profiler else None
+            self._profile_job = job
+            self.recorder.profile_job = job
+
             self._set_status("recording")
-            self.recorder.start()
+            if not self.recorder.start():
+                # The stream failed to open, or a stop arrived while the
+                # microphone was being checked
+                self._abandon_recording()
+                return
+
+            if stream:
+                self.ui.emit("beginLiveTranscript")
+                stream.start()
         else:
-            audio_data = self.recorder.stop()
+            job = self._profile_job
+            with profile_stage(job, "stop"):
+                audio_data = self.recorder.stop()
+            if audio_data is None:
+                if self.recorder.open_error and self._status == "recording":
+                    # The stream failed to open after start() had returned
+                    self._abandon_recording()
+                return  # Otherwise already stopped by another thread
+
+            self._profile_job = self.recorder.profile_job = None
+            if job:
+                job.add_timing("record", time.perf_counter() - job.started)
+                # The recorded blocks are still held: this measures the buffers
+                job.snapshot("recorded")
+
+            stream, self._stream = self._stream, None
+            self._set_status("processing")
+            Thread(target=self._process_audio, args=(audio_data, stream, job), daemon=True).start()
+
+    def _abandon_recording(self):
+        """Release the session and profile job of a recording that captured nothing."""
+        stream, self._stream = self._stream, None
+        job, self._profile_job = self._profile_job, None
+        self.recorder.profile_job = None
+        if stream:
+            stream.cancel()
+        if job:
+            job.finish()
+        self._set_status("idle")
+        if self.recorder.open_error:
+            self._show_error(f"Microphone error: {self.recorder.open_error}")
+
+    def toggle_meeting(self):
+        """Start or stop a multi-device meeting recording."""
+        meeting = self._active_meeting
+        if meeting:
+            self._active_meeting = None
+            tracks = meeting.stop()
+            if tracks is None:
+                return
             self._set_status("processing")
-            Thread(target=self._process_audio, args=(audio_data,), daemon=True).start()
+            Thread(
+                target=self._process_meeting, args=(tracks, meeting.sample_rate), daemon=True
+            ).start()
+            return
+
+        meeting = self.meeting
+        if not meeting or self._status != "idle":
+            return
+        if not meeting.start():
+            self._show_error("Could not open the meeting inputs")
+            return
+        self._active_meeting = meeting
+        self._set_status("recording")
+
+    def _create_stream(self) -> Optional[StreamingSession]:
+        """Create a live transcription session if streaming is enabled."""
+        if not self.config.streaming.enabled:
+            return None
+        return StreamingSession(
+            self.recorder,
+            self.transcriber,
+            segment_seconds=self.config.streaming.segment_seconds,
+            on_partial=self._show_partial,
+            preflight=self.preflight,
+            tuner=self.segment_tuner,
+        )
 
     def set_language(self, lang):
         """Set transcription language and save preference."""
         self.config.set_language(lang)
-        self.transcriber.set_language(lang)
+        self._apply_language()
+
+    def _apply_language(self):
+        """Switch the transcriber to the configured language."""
+        auto = isinstance(self.transcriber, AutoLanguageTranscriber)
+        if (self.config.language == "auto") != auto:
+            # Turning detection on or off changes the transcriber itself
+            self.transcriber = self._create_transcriber()
+        elif not auto:
+            self.transcriber.set_language(self.config.language)
 
     def set_hotkey(self, hotkey):
         """Set new hotkey and save preference."""
-        old_hotkey = self.config.hotkey
+        self._register_hotkey(self.config.hotkey, hotkey)
 
+        # Save to config
+        self.config.set_hotkey(hotkey)
+
+    def apply_config(self, config, changed):
+        """
+        Swap in settings reloaded from config.yaml.
+
+        Only components whose settings changed are rebuilt. All of them are
+        built before anything is applied, so a failure leaves the previous
+        settings in place; each is then replaced with a single attribute
+        assignment, so a job already running keeps the instance it started
+        with.
+
+        Returns:
+            False if the new settings could not be applied
+        """
+        old_config = self.config
+        previous = {name: getattr(self, name) for name in self._RELOADABLE}
+        old_preprocessor = self.recorder.preprocessor
+
+        try:
+            # The factories read self.config and the components built before them
+            self.config = config
+            self._rebuild_components(config, changed)
+        except Exception as e:
+            print(f"Config reload error: {e}")
+            for name in ("output", "history"):
+                built = getattr(self, name)
+                if built is not None and built is not previous[name]:
+                    built.close()
+            for name, old in previous.items():
+                setattr(self, name, old)
+            self.recorder.preprocessor = old_preprocessor
+            self.config = old_config
+            return False
+
+        if "audio" in changed:
+            # Deferred by the recorder until the current recording ends
+            self.recorder.configure(
+                sample_rate=config.audio.sample_rate,
+                channels=config.audio.channels,
+                device_id=config.audio.device_id,
+                blocksize=config.audio.blocksize,
+                latency=config.audio.latency,
+            )
+
+        if "language" in changed:
+            if config.language != "auto":
+                self.transcriber.set_language(config.language)
+            self.ui.emit("setInitialLanguage", config.language)
+
+        if "hotkey" in changed:
+            self._register_hotkey(old_config.hotkey, config.hotkey)
+            self.ui.emit("setHotkey", config.hotkey)
+
+        if "vocabulary" in changed and "prompt" not in changed:
+            self.prompt_context.set_vocabulary(config.vocabulary)
+
+        if self.transcriber is not previous["transcriber"]:
+            # Racing engines keep worker threads; the local model is shared
+            close = getattr(previous["transcriber"], "close", None)
+            if close:
+                close()
+
+        if "rate_limit" in changed and previous["rate_limiter"]:
+            previous["rate_limiter"].save()
+
+        if "output" in changed:
+            previous["output"].close()
+
+        if "server" in changed:
+            # The new server binds its port when created, so the old one goes first
+            if self.server:
+                self.server.stop()
+            self.server = self._create_server()
+            if self.server:
+                self.server.start()
+
+        if "meeting" in changed:
+            if old_config.meeting.enabled:
+                try:
+                    keyboard.remove_hotkey(old_config.meeting.hotkey)
+                except (KeyError, ValueError):
+                    pass
+            if config.meeting.enabled:
+                keyboard.add_hotkey(config.meeting.hotkey, self.toggle_meeting, suppress=False)
+
+        # A replaced history store is not closed here: a recording still being
+        # processed may write to it, and it closes when no longer referenced
+
+        print(f"Config reloaded: {', '.join(sorted(changed))}")
+        return True
+
+    def _rebuild_components(self, config, changed):
+        """Build the components whose settings changed and assign them."""
+        if "text_corrections" in changed or "vocabulary" in changed:
+            self.processor = TextProcessor(
+                corrections=config.text_corrections,
+                vocabulary=config.vocabulary,
+            )
+
+        if "audio_processing" in changed:
+            # Used from the next recording on
+            self.recorder.preprocessor = self._create_preprocessor()
+
+        if "prompt" in changed:
+            self.prompt_context = self._create_prompt_context()
+
+        if "rate_limit" in changed:
+            self.rate_limiter = self._create_rate_limiter()
+
+        auto = config.language == "auto"
+        if (
+            changed & {"transcription", "prompt", "rate_limit"}
+            or ("language_detection" in changed and auto)
+            # The racer's pool is sized for streaming and meeting concurrency
+            or (
+                changed & {"streaming", "meeting"}
+                and config.transcription.mode == "race"
+            )
+            # Turning detection on or off changes the transcriber itself
+            or auto != isinstance(self.transcriber, AutoLanguageTranscriber)
+        ):
+            self.transcriber = self._create_transcriber()
+
+        if "streaming" in changed:
+            self.segment_tuner = self._create_segment_tuner()
+
+        if "preflight" in changed:
+            self.preflight = self._create_preflight()
+
+        if "dedup" in changed:
+            self.deduplicator = self._create_deduplicator()
+
+        if "output" in changed:
+            self.output = self._create_output()
+
+        if "profiling" in changed:
+            self.profiler = self._create_profiler()
+
+        if "meeting" in changed or "audio" in changed:
+            # A meeting in progress finishes with the recorder it started on
+            self.meeting = self._create_meeting()
+
+        if "history" in changed:
+            self.history = self._create_history()
+
+    def _register_hotkey(self, old_hotkey, hotkey):
+        """Replace the global hotkey binding."""
         # Remove old hotkey
         try:
             keyboard.remove_hotkey(old_hotkey)
@@ -988,61 +1721,302 @@ class Api:
             suppress=False
         )
 
-        # Save to config
-        self.config.set_hotkey(hotkey)
-
     def get_hotkey(self):
         """Get current hotkey."""
         return self.config.hotkey
 
+    def get_history(self, offset, limit, query=""):
+        """Get a page of history entries (newest first) and the total count."""
+        if not self.history:
+            return {"total": 0, "items": []}
+        return {
+            "total": self.history.count(query),
+            "items": [entry["text"] for entry in self.history.page(offset, limit, query)],
+        }
+
     def copy_text(self, text):
         """Copy text to clipboard."""
         pyperclip.copy(text)
 
+    def api_status(self):
+        """Current state, for the local API."""
+        return {
+            "event": "status",
+            "status": self._status,
+            "language": self.transcriber.language,
+        }
+
+    def api_transcribe(self, audio_data, verbose=False, words=False):
+        """
+        Transcribe an uploaded audio file for the local API.
+
+        The text goes back to the caller only: it is not pasted, and the
+        window is not updated. With verbose, the event also carries the
+        timed segments (their text as returned by the engine).
+        """
+        started = time.perf_counter()
+        is_wav = audio_data[:4] == b"RIFF"
+
+        if self.preflight and is_wav:
+            try:
+                check = self.preflight.analyze_wav(audio_data)
+            except ValueError as e:
+                # Left to the engine, which reads more formats than scipy
+                print(f"Pre-flight skipped: {e}")
+                check = None
+            if check and not check.ok:
+                yield {"event": "error", "message": self.PREFLIGHT_ERRORS[check.reason]}
+                return
+
+        transcriber = self.transcriber
+        result = None
+        if verbose or words:
+            result = transcriber.transcribe_verbose(audio_data, word_timestamps=words)
+            text = result.text if result else None
+        else:
+            text = transcriber.transcribe(audio_data)
+        # Read afterwards: with detection it is the language just detected
+        language = (result.language if result else None) or transcriber.language
+        if text:
+            text = self.processor.process(text)
+        if not text:
+            yield {"event": "error", "message": "Transcription failed"}
+            return
+
+        if self.history:
+            self.history.add(
+                text,
+                language=language,
+                duration=self._upload_duration(audio_data) if is_wav else None,
+                latency_ms=(time.perf_counter() - started) * 1000,
+            )
+
+        event = {"event": "transcription", "text": text, "language": language}
+        if result:
+            event["duration"] = result.duration
+            event["confidence"] = result.confidence
+            event["segments"] = result.to_dict()["segments"]
+        yield event
+
+    @staticmethod
+    def _upload_duration(audio_data):
+        """Duration of an uploaded WAV file, or None if it can't be read."""
+        try:
+            return wav_duration(audio_data)
+        except (wave.Error, EOFError):
+            return None
+
+    def api_start_recording(self):
+        """Start a recording for the local API. Returns an error message or None."""
+        if self._status != "idle":
+            return f"Cannot start while {self._status}"
+        self.toggle_recording()
+        if not self.recorder.is_recording:
+            return "Could not start recording"
+        return None
+
+    def api_stop_recording(self):
+        """Stop the recording for the local API. Returns an error message or None."""
+        if not self.recorder.is_recording:
+            return "Not recording"
+        self.toggle_recording()
+        return None
+
+    def _publish(self, event, **data):
+        """Send an event to local API clients."""
+        if self.server:
+            self.server.publish(event, **data)
+
     def _set_status(self, status):
         """Update status and notify UI."""
         self._status = status
-        if self._window:
-            self._window.evaluate_js(f"updateStatus('{status}')")
+        self.ui.emit("updateStatus", status, coalesce=True)
+        self._publish("status", status=status)
+
+    def _process_audio(self, audio_data, stream=None, job=None):
+        """Process recorded audio, profiling each stage when a job is given."""
+        try:
+            self._run_pipeline(audio_data, stream, job)
+        except Exception as e:
+            print(f"Processing error: {e}")
+            RECORDINGS.inc(result="error")
+            self._show_error("Processing failed")
+            self._set_status("idle")
+        finally:
+            if job:
+                job.finish()
+
+    def _run_pipeline(self, audio_data, stream, job):
+        """Pre-flight check, transcription, text processing and output."""
+        started = time.perf_counter()
 
-    def _process_audio(self, audio_data):
-        """Process recorded audio."""
         if not audio_data:
+            if stream:
+                stream.cancel()
+            RECORDINGS.inc(result="no_audio")
             self._show_error("No audio recorded")
             self._set_status("idle")
             return
 
-        text = self.transcriber.transcribe(audio_data)
+        AUDIO_SECONDS.inc(wav_duration(audio_data))
+
+        # Skip the API for taps and silence: Whisper hallucinates on them
+        if self.preflight:
+            with profile_stage(job, "preflight"):
+                check = self.preflight.analyze_wav(audio_data)
+            if not check.ok:
+                if stream:
+                    stream.cancel()
+                RECORDINGS.inc(result=check.reason)
+                self._show_error(self.PREFLIGHT_ERRORS[check.reason])
+                self._set_status("idle")
+                return
+
+        # A repeat of a recent recording gets that recording's result
+        deduplicator = self.deduplicator
+        fingerprint = None
+        if deduplicator:
+            with profile_stage(job, "dedup"):
+                fingerprint = deduplicator.fingerprint_wav(audio_data)
+                duplicate = deduplicator.find(fingerprint)
+            if duplicate:
+                if stream:
+                    stream.cancel()
+                RECORDINGS.inc(result="duplicate")
+                self._emit_duplicate(duplicate)
+                return
+
+        # With streaming, only the tail after the last segment is left to transcribe
+        with profile_stage(job, "transcribe"):
+            if stream:
+                text = stream.finish()
+                if stream.failed_segments:
+                    # A segment's text is missing: don't output a transcript with gaps
+                    print(f"Streaming: {stream.failed_segments} segment(s) failed, "
+                          "transcribing the whole recording")
+                    text = self.transcriber.transcribe(audio_data)
+            else:
+                text = self.transcriber.transcribe(audio_data)
 
         if not text:
+            RECORDINGS.inc(result="failed")
             self._show_error("Transcription failed")
             self._set_status("idle")
             return
 
-        text = self.processor.process(text)
-        text = self.processor.format_for_terminal(text)
+        with profile_stage(job, "process"):
+            text = self.processor.process(text)
+            text = self.processor.format_for_terminal(text)
 
         if not text:
+            RECORDINGS.inc(result="empty")
             self._show_error("Empty result")
             self._set_status("idle")
             return
 
-        # Copy to clipboard and auto-paste
-        pyperclip.copy(text)
-        time.sleep(0.05)  # Small delay to ensure clipboard is ready
-        keyboard.send('ctrl+v')
+        # Paste (or type, or write) into the target
+        with profile_stage(job, "output"):
+            try:
+                self.output.emit(text)
+            except Exception as e:
+                print(f"Output error: {e}")
+        RECORDINGS.inc(result="ok")
+        END_TO_END.observe(time.perf_counter() - started)
+
+        # Feeds the prompt of the next recording
+        self.prompt_context.add(text, self.transcriber.language)
+        if deduplicator:
+            deduplicator.remember(fingerprint, text)
+
+        if self.history:
+            with profile_stage(job, "history"):
+                self.history.add(
+                    text,
+                    language=self.transcriber.language,
+                    duration=wav_duration(audio_data),
+                    latency_ms=(time.perf_counter() - started) * 1000,
+                )
 
         # Update UI with full text (JS will handle display)
-        escaped = text.replace("\\", "\\\\").replace("'", "\\'").replace("\n", " ")
-        if self._window:
-            self._window.evaluate_js(f"showTranscription('{escaped}')")
+        self.ui.emit("showTranscription", text)
+        self._publish("transcription", text=text, language=self.transcriber.language)
+
+        self._set_status("idle")
+
+    def _emit_duplicate(self, text):
+        """Show (and optionally output again) the result reused for a repeated recording."""
+        pasted = self.config.dedup.output_duplicates
+        if pasted:
+            try:
+                self.output.emit(text)
+            except Exception as e:
+                print(f"Output error: {e}")
+        # Not stored again, so not shown as a new history entry
+        self.ui.emit("showDuplicate", text, pasted)
+        self._publish("transcription", text=text, language=self.transcriber.language, duplicate=True)
+        self._set_status("idle")
+
+    def _process_meeting(self, tracks, sample_rate):
+        """Transcribe a meeting recording, one speaker per input."""
+        started = time.perf_counter()
+
+        utterances = transcribe_tracks(
+            tracks,
+            sample_rate,
+            self.transcriber,
+            max_workers=self.config.meeting.max_concurrency,
+            speech_db=self.config.preflight.speech_db,
+        )
+        for utterance in utterances:
+            utterance.text = self.processor.process(utterance.text)
+        utterances = [u for u in utterances if u.text]
+
+        if not utterances:
+            self._show_error("No speech detected")
+            self._set_status("idle")
+            return
+
+        text = format_utterances(utterances)
+
+        try:
+            self.output.emit(text)
+        except Exception as e:
+            print(f"Output error: {e}")
+
+        if self.history:
+            self.history.add(
+                text,
+                language=self.transcriber.language,
+                duration=len(next(iter(tracks.values()))) / sample_rate,
+                latency_ms=(time.perf_counter() - started) * 1000,
+            )
+
+        self.ui.emit("showTranscription", text)
+        self._publish("transcription", text=text, language=self.transcriber.language)
 
         self._set_status("idle")
 
+    def _show_level(self, level):
+        """Publish the input level (called from the audio thread)."""
+        self.ui.emit(
+            "updateLevel", level["rms_db"], level["peak_db"], level["warning"],
+            coalesce=True,
+        )
+
+    def _on_xrun(self, event):
+        """Log an audio dropout and tell API clients (called from the recording thread)."""
+        print(f"Audio {event.kind} (blocksize {event.blocksize})")
+        self._publish("xrun", kind=event.kind, time=event.time, blocksize=event.blocksize)
+
+    def _show_partial(self, delta):
+        """Append newly transcribed text to the live transcript."""
+        self.ui.emit("appendPartial", delta)
+        self._publish("partial", text=delta)
+
     def _show_error(self, message):
         """Show error in UI."""
-        if self._window:
-            self._window.evaluate_js(f"showTranscription('Error: {message}', true)")
+        self.ui.emit("showTranscription", f"Error: {message}", True)
+        self._publish("error", message=message)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -1054,6 +2028,7 @@ class VoiceAgentApp:
 
     def __init__(self):
         self.api = Api()
+        self.config_watcher = ConfigWatcher(on_change=self.api.apply_config)
 
     def run(self):
         """Run the application."""
@@ -1073,8 +2048,8 @@ class VoiceAgentApp:
 
         def on_loaded():
             # Set initial values
-            window.evaluate_js(f"setHotkey('{self.api.config.hotkey}')")
-            window.evaluate_js(f"setInitialLanguage('{self.api.config.language}')")
+            self.api.ui.emit("setHotkey", self.api.config.hotkey)
+            self.api.ui.emit("setInitialLanguage", self.api.config.language)
 
             # Register hotkey
             keyboard.add_hotkey(
@@ -1082,16 +2057,42 @@ class VoiceAgentApp:
                 self.api.toggle_recording,
                 suppress=False
             )
+            if self.api.config.meeting.enabled:
+                keyboard.add_hotkey(
+                    self.api.config.meeting.hotkey,
+                    self.api.toggle_meeting,
+                    suppress=False
+                )
 
         window.events.loaded += on_loaded
 
+        # Pick up edits to config.yaml without a restart
+        self.config_watcher.start()
+
+        if self.api.server:
+            self.api.server.start()
+            host, port = self.api.server.address
+            print(f"Local API on http://{host}:{port}")
+            if not self.api.config.server.token:
+                print(f"API token in {BASE_DIR / 'api_token'}")
+
         # Start webview
         webview.start()
 
         # Cleanup
+        self.config_watcher.stop()
+        if self.api.server:
+            self.api.server.stop()
+        self.api.ui.close()
         keyboard.unhook_all()
         if self.api.recorder.is_recording:
             self.api.recorder.stop()
+        if self.api._profile_job:
+            self.api._profile_job.finish()
+        if self.api._active_meeting:
+            self.api._active_meeting.stop()
+        if self.api.rate_limiter:
+            self.api.rate_limiter.save()
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -0,0 +1,96 @@
+"""
+UI event bridge.
+Delivers Python-side events to the webview in batched, JSON-encoded frames.
+"""
+
+import json
+import time
+from itertools import count
+from threading import Thread, Condition
+from typing import Optional
+
+
+class UiBridge:
+    """
+    Queues UI events and dispatches them to the webview once per frame.
+
+    emit() never touches the webview: it only queues the event, so worker
+    threads are never blocked by evaluate_js. A dispatcher thread collects
+    everything emitted during a frame and delivers it with a single call to
+    the JS dispatchEvents() function.
+    """
+
+    FRAME_SECONDS = 1 / 60
+
+    def __init__(self, frame_seconds: float = FRAME_SECONDS):
+        """
+        Initialize bridge.
+
+        Args:
+            frame_seconds: Minimum interval between two dispatches
+        """
+        self.frame_seconds = frame_seconds
+
+        self._window = None
+        self._pending: dict = {}
+        self._sequence = count()
+        self._condition = Condition()
+        self._closed = False
+        self._thread: Optional[Thread] = None
+
+    def attach(self, window) -> None:
+        """Start delivering events to a loaded webview window."""
+        with self._condition:
+            self._window = window
+            if self._thread is None:
+                self._thread = Thread(target=self._dispatch_loop, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def emit(self, event: str, *args, coalesce: bool = False) -> None:
+        """
+        Queue a call to a JS event handler.
+
+        Args:
+            event: Name of the handler registered in the page
+            *args: JSON-serializable arguments for the handler
+            coalesce: Keep only the latest pending event with this name
+        """
+        key = event if coalesce else next(self._sequence)
+        with self._condition:
+            if self._closed:
+                return
+            # Re-insert so a coalesced event keeps its place relative to others
+            self._pending.pop(key, None)
+            self._pending[key] = [event, list(args)]
+            self._condition.notify()
+
+    def close(self) -> None:
+        """Stop the dispatcher and drop any undelivered events."""
+        with self._condition:
+            self._closed = True
+            self._pending.clear()
+            self._condition.notify()
+
+    def _dispatch_loop(self) -> None:
+        """Deliver pending events, at most once per frame."""
+        while True:
+            with self._condition:
+                while not self._closed and not (self._pending and self._window):
+                    self._condition.wait()
+                if self._closed:
+                    return
+                batch = list(self._pending.values())
+                self._pending.clear()
+                window = self._window
+
+            started = time.perf_counter()
+            try:
+                window.evaluate_js(f"dispatchEvents({json.dumps(batch)})")
+            except Exception as e:
+                print(f"UI dispatch error: {e}")
+
+            # Let bursts accumulate into the next frame
+            remaining = self.frame_seconds - (time.perf_counter() - started)
+            if remaining > 0:
+                time.sleep(remaining)